@@ -1,9 +1,15 @@
 from fastapi import FastAPI, HTTPException, Security, Depends
 from fastapi.security.api_key import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import os
+import json
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Učitaj environment pre svega
@@ -13,10 +19,49 @@ from core.orchestrator import SecureOrchestrator
 from core.sentinel import SecuritySentinel
 from tools.package_manager import PackageManager
 from tools.dependency_detector import DependencyDetector
+from tools.install_queue import InstallQueue
 from tools.git_manager import GitManager
 from tools.supabase_manager import SupabaseManager
-
-app = FastAPI(title="AI Factory API", version="3.0")
+from tools.search_index import SearchIndex
+from tools.file_watcher import get_watcher, stop_watcher
+from core.executor import execution_pools, run_blocking, PoolFullError
+from core.project_audit import ProjectAuditor
+from core.status_feed import StatusFeed
+from core.metrics import metrics
+
+# Servisi se prave pri startu servera (init_services), ne pri importu modula
+orchestrator: Optional[SecureOrchestrator] = None
+package_manager: Optional[PackageManager] = None
+dependency_detector: Optional[DependencyDetector] = None
+install_queue: Optional[InstallQueue] = None
+git_manager: Optional[GitManager] = None
+supabase_manager: Optional[SupabaseManager] = None
+
+
+def init_services() -> None:
+    """
+    Inicijalizuje orkestrator i menadžere (jednom po procesu).
+    SR: Namerno nije na nivou modula - radni procesi 'cpu'/'audit' pool-a (spawn na Windows-u,
+    'python api.py') ponovo importuju api.py i ne smeju da dižu orkestrator, watcher-e i keševe.
+    """
+    global orchestrator, package_manager, dependency_detector, install_queue, git_manager, supabase_manager
+    if orchestrator is not None:
+        return
+    orchestrator = SecureOrchestrator()
+    package_manager = PackageManager(str(orchestrator.file_manager.BASE_DIR))
+    dependency_detector = DependencyDetector(str(orchestrator.file_manager.BASE_DIR))
+    install_queue = InstallQueue(package_manager)
+    git_manager = GitManager(str(orchestrator.file_manager.BASE_DIR))
+    supabase_manager = SupabaseManager()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_services()
+    yield
+
+
+app = FastAPI(title="AI Factory API", version="3.0", lifespan=lifespan)
 
 # SR: Bezbedna CORS konfiguracija - dozvoljavamo samo lokalne portove
 # Uključujemo i localhost i 127.0.0.1 jer browser može koristiti bilo koji
@@ -45,19 +90,10 @@ async def get_api_key(api_key: str = Depends(api_key_header)):
         raise HTTPException(status_code=401, detail="Neautorizovan pristup: Nevažeći API Token")
     return api_key
 
-# Initialize Orchestrator, PackageManager, DependencyDetector, GitManager, and SupabaseManager
-orchestrator = SecureOrchestrator()
-package_manager = PackageManager(str(orchestrator.file_manager.BASE_DIR))
-dependency_detector = DependencyDetector(str(orchestrator.file_manager.BASE_DIR))
-git_manager = GitManager(str(orchestrator.file_manager.BASE_DIR))
-supabase_manager = SupabaseManager()
-
-class GenerateRequest(BaseModel):
-    prompt: str
-    filename: str
-
 class StatusResponse(BaseModel):
     total_tokens: int
+    cache_hits: int
+    cache_misses: int
     project_dir: str
     roots: List[str]
     model: str
@@ -67,37 +103,133 @@ class StatusResponse(BaseModel):
 async def get_status():
     project_dir = str(orchestrator.file_manager.BASE_DIR)
     # SR: Koristimo optimizovanu list_files metodu koja ignoriše node_modules i sl.
-    files = orchestrator.file_manager.list_files(max_depth=2)
+    files = await run_blocking('io', orchestrator.file_manager.list_files, max_depth=2)
+    
+    cache_stats = orchestrator.get_cache_stats()
     
     return StatusResponse(
         total_tokens=orchestrator.get_token_usage(),
+        cache_hits=cache_stats["hits"],
+        cache_misses=cache_stats["misses"],
         project_dir=project_dir,
         roots=[str(r) for r in orchestrator.file_manager.roots],
         model=orchestrator.model,
         files=files
     )
 
+@app.get("/status/stream", dependencies=[Depends(get_api_key)])
+async def status_stream():
+    """
+    Jedna konekcija umesto pollinga /status i /git/status: prvo 'snapshot', zatim samo
+    razlike ('files', 'git', 'tokens', 'project') i 'ping' kada nema promena.
+    """
+    feed = StatusFeed(orchestrator, git_manager)
+
+    async def _stream():
+        async for event in feed.stream():
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
 @app.get("/read-file", dependencies=[Depends(get_api_key)])
 async def read_file(path: str):
     try:
-        content = orchestrator.file_manager.safe_read(path)
+        content = await run_blocking('io', orchestrator.file_manager.safe_read, path)
         return {"content": content}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@app.get("/read-file/raw", dependencies=[Depends(get_api_key)])
+async def read_file_raw(path: str):
+    # SR: Veliki fajlovi idu kao stream bajtova (bez dekodiranja u string)
+    try:
+        safe_path, size = await run_blocking('io', orchestrator.file_manager.open_for_streaming, path)
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return FileResponse(safe_path, media_type="application/octet-stream")
+
+class ReadFilesRequest(BaseModel):
+    paths: List[str]
+
+# Broj fajlova po jednom pozivu read_many u io pool-u
+READ_CHUNK_FILES = 32
+
+@app.post("/read-files", dependencies=[Depends(get_api_key)])
+async def read_files(req: ReadFilesRequest):
+    """
+    Čita više fajlova jednim zahtevom. Fajlovi veći od INLINE_READ_LIMIT vraćaju samo
+    {'size', 'stream': True} - sadržaj se preuzima preko /read-file/raw.
+    """
+    paths = list(dict.fromkeys(req.paths))
+    chunks = [paths[i:i + READ_CHUNK_FILES] for i in range(0, len(paths), READ_CHUNK_FILES)]
+    try:
+        parts = await asyncio.gather(*(run_blocking('io', orchestrator.file_manager.read_many, chunk)
+                                       for chunk in chunks))
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    files = {}
+    for part in parts:
+        files.update(part)
+    return {"files": files}
+
+class FileContent(BaseModel):
+    path: str
+    content: str
+
+class WriteFilesRequest(BaseModel):
+    files: List[FileContent]
+
+@app.post("/write-files", dependencies=[Depends(get_api_key)])
+async def write_files(req: WriteFilesRequest):
+    """Proverava sve fajlove Sentinel-om, pa ih upisuje atomski - svi ili nijedan."""
+    try:
+        scans = await orchestrator.scan_files([(f.path, f.content) for f in req.files])
+        threats = {path: found for path, found in scans.items()
+                   if any(t['severity'] == 'CRITICAL' for t in found)}
+        if threats:
+            return {"success": False, "message": "Bezbednosna provera nije prošla", "threats": threats}
+
+        await run_blocking('io', orchestrator.file_manager.write_many, [(f.path, f.content) for f in req.files])
+        return {"success": True, "message": f"Sačuvano fajlova: {len(req.files)}", "written": [f.path for f in req.files]}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/save-file", dependencies=[Depends(get_api_key)])
 async def save_file(path: str, content: str):
-    # Proveri kod pre čuvanja
-    is_safe, threats = orchestrator.sentinel.scan_code(content)
-    if not is_safe:
-        return {"success": False, "message": "Bezbednosna provera nije prošla", "threats": threats}
-    
     try:
-        orchestrator.file_manager.safe_write(path, content)
+        # Proveri kod pre čuvanja
+        is_safe, threats = await run_blocking('io', orchestrator.sentinel.scan_code, content,
+                                            orchestrator.sentinel.language_from_filename(path))
+        if not is_safe:
+            return {"success": False, "message": "Bezbednosna provera nije prošla", "threats": threats}
+        
+        await run_blocking('io', orchestrator.file_manager.safe_write, path, content)
         return {"success": True, "message": "Fajl uspešno sačuvan"}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/executor/stats", dependencies=[Depends(get_api_key)])
+async def executor_stats():
+    # SR: Zauzetost i dubina redova po pool-u i po LLM modelu (RPM/TPM, 429)
+    return {"pools": execution_pools.stats(), "llm": orchestrator.llm_scheduler.stats()}
+
+@app.get("/metrics", dependencies=[Depends(get_api_key)])
+async def metrics_endpoint():
+    # SR: Prometheus text format (scrape sa X-API-Key header-om)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/metrics/traces", dependencies=[Depends(get_api_key)])
+async def metrics_traces(limit: int = 100):
+    return {"enabled": metrics.enabled, "spans": metrics.recent_spans(limit)}
+
 @app.get("/models", dependencies=[Depends(get_api_key)])
 async def get_models():
     # SR: Lista popularnih modela podržanih preko litellm
@@ -136,11 +268,19 @@ async def set_project_dir(path: str):
         # U budućnosti uvesti listu "dozvoljenih" roditeljskih foldera u .env
         
         # Re-initialize FileManager with the NEW base directory
+        old_roots = list(orchestrator.file_manager.roots)
         orchestrator.file_manager = FileManager(str(p))
+        # SR: Watcher-i (i indeksi pretrage) starog workspace-a se gase - inače se gomilaju
+        for root in old_roots:
+            if root not in orchestrator.file_manager.roots:
+                stop_watcher(root)
+                index = search_indexes.pop(str(root), None)
+                if index:
+                    index.close()
         print(f"[Orchestrator] Workspace promenjen na: {p}")
         
         # Return the new list of files immediately for UI refresh
-        files = orchestrator.file_manager.list_files()
+        files = await run_blocking('io', orchestrator.file_manager.list_files)
         return {
             "success": True, 
             "project_dir": str(p),
@@ -154,9 +294,12 @@ async def set_project_dir(path: str):
 async def add_project_dir(path: str):
     try:
         if orchestrator.file_manager.add_root(path):
-            return {"success": True, "roots": [str(r) for r in orchestrator.file_manager.roots], "files": orchestrator.file_manager.list_files()}
+            files = await run_blocking('io', orchestrator.file_manager.list_files)
+            return {"success": True, "roots": [str(r) for r in orchestrator.file_manager.roots], "files": files}
         else:
             return {"success": False, "message": "Nevalidna putanja ili folder ne postoji"}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -164,9 +307,12 @@ async def add_project_dir(path: str):
 async def remove_project_dir(path: str):
     try:
         if orchestrator.file_manager.remove_root(path):
-            return {"success": True, "roots": [str(r) for r in orchestrator.file_manager.roots], "files": orchestrator.file_manager.list_files()}
+            files = await run_blocking('io', orchestrator.file_manager.list_files)
+            return {"success": True, "roots": [str(r) for r in orchestrator.file_manager.roots], "files": files}
         else:
             return {"success": False, "message": "Neuspešno uklanjanje. Možda je to primarni folder?"}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -174,8 +320,6 @@ async def run_native_picker_logic():
     import ctypes
     from ctypes import wintypes
     import platform
-    import asyncio
-    from concurrent.futures import ThreadPoolExecutor
 
     def run_picker_thread():
         try:
@@ -279,9 +423,7 @@ async def run_native_picker_logic():
             print(f"[PickerThread] Error: {e}")
             return ""
 
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as pool:
-        return await loop.run_in_executor(pool, run_picker_thread)
+    return await run_blocking('dialog', run_picker_thread)
 
 @app.get("/pick-dir", dependencies=[Depends(get_api_key)])
 async def pick_dir():
@@ -305,7 +447,7 @@ async def pick_file():
     import sys
     try:
         cmd = [sys.executable, '-c', "import tkinter as tk; from tkinter import filedialog; root = tk.Tk(); root.withdraw(); root.wm_attributes('-topmost', 1); print(filedialog.askopenfilename());"]
-        res = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        res = await run_blocking('dialog', subprocess.run, cmd, capture_output=True, text=True, timeout=60)
         path = res.stdout.strip()
         
         if path:
@@ -314,35 +456,66 @@ async def pick_file():
     except Exception as e:
         return {"success": False, "detail": str(e)}
 
+# SR: Trigram indeks po korenu projekta - gradi se jednom i čuva u .agent/
+search_indexes: Dict[str, SearchIndex] = {}
+# SR: Istovremeni prvi upiti čekaju isti build umesto da svaki gradi i upisuje ceo indeks
+search_indexes_lock = threading.Lock()
+
+def get_search_index(root) -> SearchIndex:
+    key = str(root)
+    index = search_indexes.get(key)
+    if index is None:
+        with search_indexes_lock:
+            index = search_indexes.get(key)
+            if index is None:
+                index = SearchIndex(root, Path(root) / ".agent" / "search_index.sqlite", refresh_interval=300.0)
+                # SR: Watcher javlja promene, pa je periodično osvežavanje (u pozadini) samo sigurnosna mreža
+                index.start(get_watcher(root))
+                search_indexes[key] = index
+    return index
+
 @app.get("/search", dependencies=[Depends(get_api_key)])
-async def search_files(query: str):
+async def search_files(query: str, offset: int = 0, limit: int = 100):
     if not query:
-        return {"results": []}
-    
-    results = []
-    base_dir = orchestrator.file_manager.BASE_DIR
+        return {"results": [], "next_offset": None}
     
     try:
-        for file_path in base_dir.rglob('*'):
-            if file_path.is_file() and not any(part in str(file_path) for part in ['.git', 'node_modules', '__pycache__', '.venv']):
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = f.readlines()
-                        for i, line in enumerate(lines):
-                            if query.lower() in line.lower():
-                                results.append({
-                                    "file": str(file_path.relative_to(base_dir)),
-                                    "line": i + 1,
-                                    "content": line.strip()
-                                })
-                                if len(results) > 100: # Limit results
-                                    return {"results": results}
-                except:
-                    continue
-        return {"results": results}
+        def _search():
+            index = get_search_index(orchestrator.file_manager.BASE_DIR)
+            return index.search(query, offset=max(offset, 0), limit=max(1, min(limit, 1000)))
+        return await run_blocking('io', _search)
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+auditors: Dict[str, ProjectAuditor] = {}
+
+def get_auditor() -> ProjectAuditor:
+    base_dir = orchestrator.file_manager.BASE_DIR
+    key = str(base_dir)
+    auditor = auditors.get(key)
+    if auditor is None:
+        auditor = ProjectAuditor(orchestrator.file_manager, Path(base_dir) / ".agent" / "audit_cache.sqlite")
+        auditors[key] = auditor
+    # SR: FileManager se menja pri promeni workspace-a - auditor uvek koristi aktuelni (sa svim korenima)
+    auditor.file_manager = orchestrator.file_manager
+    return auditor
+
+@app.get("/audit", dependencies=[Depends(get_api_key)])
+async def audit_project():
+    """Bezbednosni pregled svih fajlova projekta - nalazi se šalju kao NDJSON tok."""
+    auditor = await run_blocking('io', get_auditor)
+
+    async def _stream():
+        try:
+            async for event in auditor.audit():
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except PoolFullError as e:
+            yield json.dumps({"type": "error", "content": str(e)}) + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
 class GenerateRequest(BaseModel):
     prompt: str
     target_file: str
@@ -376,8 +549,10 @@ async def toggle_agent(agent_id: str, active: bool):
 @app.post("/generate", dependencies=[Depends(get_api_key)])
 async def generate_code(req: GenerateRequest):
     try:
-        result = orchestrator.generate_and_validate_code(req.prompt, req.filename, req.attachments)
+        result = await run_blocking('llm', orchestrator.generate_and_validate_code, req.prompt, req.target_file, req.attachments)
         return result
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -406,20 +581,62 @@ class ApplyRequest(BaseModel):
 @app.post("/apply-changes", dependencies=[Depends(get_api_key)])
 async def apply_changes(req: ApplyRequest):
     try:
-        result = orchestrator.manual_save(req.filename, req.content)
+        result = await run_blocking('io', orchestrator.manual_save, req.filename, req.content)
         return result
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+class ChangesetRequest(BaseModel):
+    files: List[FileContent]
+    message: Optional[str] = ""
+
+class RollbackRequest(BaseModel):
+    changeset_id: str
+
+@app.post("/apply-changeset", dependencies=[Depends(get_api_key)])
+async def apply_changeset(req: ChangesetRequest):
+    # SR: Višefajlna izmena - jedan snapshot, atomski upis, rollback jednim pozivom
+    try:
+        return await orchestrator.apply_changeset([(f.path, f.content) for f in req.files], req.message or "")
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/rollback-changeset", dependencies=[Depends(get_api_key)])
+async def rollback_changeset(req: RollbackRequest):
+    try:
+        return await run_blocking('io', orchestrator.rollback_changeset, req.changeset_id)
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/changesets", dependencies=[Depends(get_api_key)])
+async def list_changesets(limit: int = 20):
+    try:
+        return {"changesets": await run_blocking('io', orchestrator.history_manager.list_changesets, limit)}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 # Package Installation Endpoints
 class InstallRequest(BaseModel):
     package: str
     dev: Optional[bool] = False
 
+class BatchInstallRequest(BaseModel):
+    python: List[str] = []
+    node: List[str] = []
+    dev: Optional[bool] = False
+
 @app.post("/install/python", dependencies=[Depends(get_api_key)])
 async def install_python_package(req: InstallRequest):
     try:
-        success, message = package_manager.install_python(req.package)
+        # SR: Ide kroz red - istovremeni zahtevi se spajaju u jedan pip poziv
+        results = await install_queue.submit('python', [req.package]).wait()
+        success, message = results.get(req.package.strip(), (False, "Nevažeće ime paketa"))
         return {"success": success, "message": message}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -427,40 +644,100 @@ async def install_python_package(req: InstallRequest):
 @app.post("/install/node", dependencies=[Depends(get_api_key)])
 async def install_node_package(req: InstallRequest):
     try:
-        success, message = package_manager.install_node(req.package, req.dev)
+        results = await install_queue.submit('node', [req.package], bool(req.dev)).wait()
+        success, message = results.get(req.package.strip(), (False, "Nevažeće ime paketa"))
         return {"success": success, "message": message}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/install/batch", dependencies=[Depends(get_api_key)])
+async def install_batch(req: BatchInstallRequest):
+    """Instalira više paketa (npr. rezultat /install/detect-missing) i šalje napredak kao NDJSON."""
+    jobs = []
+    if req.python:
+        jobs.append(install_queue.submit('python', req.python))
+    if req.node:
+        jobs.append(install_queue.submit('node', req.node, bool(req.dev)))
+
+    async def _stream():
+        # Događaji svih poslova se prosleđuju redom kojim stižu
+        merged: asyncio.Queue = asyncio.Queue()
+
+        async def forward(job):
+            async for event in job.stream():
+                await merged.put(event)
+            await merged.put(None)
+
+        tasks = [asyncio.create_task(forward(job)) for job in jobs]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                event = await merged.get()
+                if event is None:
+                    remaining -= 1
+                    continue
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        finally:
+            # Diskonekcija klijenta ne prekida instalaciju - samo prestaje prosleđivanje
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+@app.get("/install/queue", dependencies=[Depends(get_api_key)])
+async def install_queue_stats():
+    return {"pending": install_queue.stats()}
+
 @app.get("/install/check-python", dependencies=[Depends(get_api_key)])
 async def check_python_package(package: str):
     try:
-        installed, version = package_manager.check_python_package(package)
+        installed, version = await run_blocking('io', package_manager.check_python_package, package)
         return {"installed": installed, "version": version}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+class BulkCheckRequest(BaseModel):
+    packages: List[str]
+
+@app.post("/install/check-python-bulk", dependencies=[Depends(get_api_key)])
+async def check_python_packages(req: BulkCheckRequest):
+    try:
+        results = await run_blocking('io', package_manager.check_python_packages, req.packages)
+        return {"packages": results}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/install/check-node", dependencies=[Depends(get_api_key)])
 async def check_node_package(package: str):
     try:
-        installed, version = package_manager.check_node_package(package)
+        installed, version = await run_blocking('io', package_manager.check_node_package, package)
         return {"installed": installed, "version": version}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/install/list-python", dependencies=[Depends(get_api_key)])
 async def list_python_packages():
     try:
-        packages = package_manager.list_python_packages()
+        packages = await run_blocking('io', package_manager.list_python_packages)
         return {"packages": packages}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/install/detect-missing", dependencies=[Depends(get_api_key)])
 async def detect_missing_dependencies():
     try:
-        missing = dependency_detector.detect_missing()
+        missing = await run_blocking('io', dependency_detector.detect_missing)
         return missing
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -474,16 +751,20 @@ async def git_status():
     try:
         if not git_manager.is_git_initialized():
             return {"initialized": False}
-        status = git_manager.status()
+        status = await run_blocking('git', git_manager.status)
         return {"initialized": True, "status": status}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/git/init", dependencies=[Depends(get_api_key)])
 async def git_init():
     try:
-        success, output = git_manager.init()
+        success, output = await run_blocking('git', git_manager.init)
         return {"success": success, "message": output}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -492,19 +773,23 @@ async def git_commit(req: CommitRequest):
     try:
         # Prvo dodajemo fajlove (ako nisu specificirani, dodaj sve)
         files_to_add = req.files if req.files else ["."]
-        git_manager.add(files_to_add)
+        await run_blocking('git', git_manager.add, files_to_add)
         
         # Onda komitujemo
-        success, output = git_manager.commit(req.message)
+        success, output = await run_blocking('git', git_manager.commit, req.message)
         return {"success": success, "message": output}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/git/push", dependencies=[Depends(get_api_key)])
 async def git_push():
     try:
-        success, output = git_manager.push()
+        success, output = await run_blocking('git', git_manager.push)
         return {"success": success, "message": output}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -516,21 +801,25 @@ class SupabaseConnectRequest(BaseModel):
 @app.post("/supabase/connect", dependencies=[Depends(get_api_key)])
 async def supabase_connect(req: SupabaseConnectRequest):
     try:
-        success = supabase_manager.connect(req.url, req.key)
+        success = await run_blocking('io', supabase_manager.connect, req.url, req.key)
         if success:
             # Automatski pokušaj dohvatanja tabela nakon konekcije
-            tables = supabase_manager.get_tables()
+            tables = await run_blocking('io', supabase_manager.get_tables)
             return {"success": True, "message": "Connected to Supabase", "tables": tables}
         else:
             return {"success": False, "message": "Failed to connect"}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/supabase/tables", dependencies=[Depends(get_api_key)])
 async def supabase_tables():
     try:
-        tables = supabase_manager.get_tables()
+        tables = await run_blocking('io', supabase_manager.get_tables)
         return {"success": True, "tables": tables}
+    except PoolFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1 @@
+# Benchmarks - merenje performansi vrućih putanja AI Fabrike
@@ -0,0 +1,82 @@
+"""
+Benchmark za GitManager.status.
+Pravi privremeni repozitorijum sa N praćenih fajlova i meri latenciju statusa:
+git CLI bez keša, pygit2 bez keša (ako je instaliran) i keširan status.
+
+Pokretanje:
+    python -m benchmarks.bench_git_status [--files 50000] [--repeat 5]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from tools.git_manager import GitManager, PYGIT2_AVAILABLE
+
+
+def create_repo(root: Path, file_count: int) -> None:
+    """Pravi repozitorijum sa file_count fajlova (100 po folderu) i jednim commit-om."""
+    subprocess.run(['git', 'init', '-q'], cwd=root, check=True)
+    for i in range(file_count):
+        folder = root / f"pkg_{i // 100:04d}"
+        if i % 100 == 0:
+            folder.mkdir()
+        (folder / f"module_{i}.py").write_text(f"VALUE = {i}\n", encoding='utf-8')
+    env = dict(os.environ, GIT_AUTHOR_NAME='bench', GIT_AUTHOR_EMAIL='bench@example.com',
+               GIT_COMMITTER_NAME='bench', GIT_COMMITTER_EMAIL='bench@example.com')
+    subprocess.run(['git', 'add', '-A'], cwd=root, check=True)
+    subprocess.run(['git', 'commit', '-q', '-m', 'bench'], cwd=root, check=True, env=env)
+    # Nekoliko izmena da status ne bude prazan
+    (root / "pkg_0000" / "module_0.py").write_text("VALUE = -1\n", encoding='utf-8')
+    (root / "untracked.txt").write_text("x\n", encoding='utf-8')
+
+
+def _latency_ms(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GitManager.status benchmark")
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench_git_"))
+    try:
+        print(f"Pravim repozitorijum sa {args.files} fajlova u {root}...")
+        create_repo(root, args.files)
+
+        cli = GitManager(str(root), backend='cli')
+        expected = cli._status_cli()
+        results = [("git CLI (bez keša)", _latency_ms(cli._status_cli, args.repeat))]
+
+        if PYGIT2_AVAILABLE:
+            native = GitManager(str(root), backend='pygit2')
+            if native._status_pygit2() != expected:
+                raise SystemExit("pygit2 i git CLI daju različit status")
+            results.append(("pygit2 (bez keša)", _latency_ms(native._status_pygit2, args.repeat)))
+        else:
+            print("pygit2 nije instaliran - preskačem in-process backend")
+
+        cached = GitManager(str(root))
+        cached.status()
+        results.append(("keširan status", _latency_ms(cached.status, args.repeat)))
+
+        print(f"{'backend':<22}{'latencija ms':>14}")
+        for name, latency in results:
+            print(f"{name:<22}{latency:>14.2f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark za FileManager._sanitize_path.
+Poredi staru proveru (Path + abspath + startswith po svakom korenu) sa RootTrie
+proverom, za relativne i apsolutne putanje i više aktivnih korena.
+
+Pokretanje:
+    python -m benchmarks.bench_sanitize [--roots 8] [--paths 200000]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from tools.file_manager import FileManager, SecurityError
+
+
+def legacy_sanitize(file_manager: FileManager, path: str) -> Path:
+    """Prethodna implementacija - samo za poređenje."""
+    p = Path(path)
+    if p.is_absolute():
+        resolved_path = Path(os.path.abspath(str(p)))
+    else:
+        resolved_path = Path(os.path.abspath(str(file_manager.BASE_DIR / p)))
+    for root in file_manager.roots:
+        if str(resolved_path).startswith(str(root)):
+            return resolved_path
+    raise SecurityError(path)
+
+
+def _run(fn, paths) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        try:
+            fn(path)
+        except SecurityError:
+            pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="_sanitize_path benchmark")
+    parser.add_argument("--roots", type=int, default=8)
+    parser.add_argument("--paths", type=int, default=200000)
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_sanitize_"))
+    try:
+        file_manager = FileManager(str(tmp / "root_0"))
+        for i in range(1, args.roots):
+            (tmp / f"root_{i}").mkdir()
+            file_manager.add_root(str(tmp / f"root_{i}"))
+
+        paths = []
+        for i in range(args.paths):
+            if i % 2:
+                paths.append(f"src/pkg_{i % 50}/module_{i}.py")
+            else:
+                paths.append(str(tmp / f"root_{i % args.roots}" / "src" / f"module_{i}.py"))
+
+        legacy = _run(lambda p: legacy_sanitize(file_manager, p), paths)
+        trie = _run(file_manager._sanitize_path, paths)
+
+        print(f"{'implementacija':<20}{'ukupno ms':>12}{'us/poziv':>12}")
+        for name, elapsed in (("startswith", legacy), ("RootTrie", trie)):
+            print(f"{name:<20}{elapsed * 1000:>12.1f}{elapsed / len(paths) * 1e6:>12.2f}")
+        print(f"ubrzanje: {legacy / trie:.2f}x")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
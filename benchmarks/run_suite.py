@@ -0,0 +1,492 @@
+"""
+Benchmark suite za vruće putanje fabrike.
+Pravi sintetička stabla (podrazumevano 1k / 10k / 100k fajlova) i meri:
+  - list_files (hladan prolaz FileWatcher-a i topli read iz keša)
+  - /search preko API-ja (hladan = gradnja indeksa, topli upiti)
+  - SecuritySentinel.scan_code (MB/s po fajlovima stabla)
+  - DependencyDetector.detect_missing (bez keša, sa kešom iz SQLite-a, ponovljen poziv)
+  - HistoryManager.create_backup / get_history / read_version sa mnogo verzija
+  - propusnost async_stream_code_generation sa više agenata prema stub LLM-u
+    (HTTP server ili 'stub/' provajder u procesu, --provider)
+
+Rezultati se upisuju kao JSON (benchmarks/results/<commit>.json), pa se dva
+commit-a porede sa --compare.
+
+Pokretanje:
+    python -m benchmarks.run_suite [--sizes 1000,10000,100000] [--sessions 20 --agents 3]
+    python -m benchmarks.run_suite --only list_files,search --sizes 10000
+    python -m benchmarks.run_suite --compare benchmarks/results/a1b2c3d.json benchmarks/results/e4f5a6b.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+BENCHMARKS = ("list_files", "search", "scan_code", "detect_missing", "history", "stream")
+
+
+# ----------------------------------------------------------------------
+# Merenje
+# ----------------------------------------------------------------------
+
+def summarize(samples: List[float], **extra) -> Dict[str, Any]:
+    """Sekunde -> statistika u milisekundama (+ dodatna polja, npr. MB/s)."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    result = {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+    }
+    result.update(extra)
+    return result
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 0,
+            setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    """Poziva fn repeat puta (setup pre svakog poziva se ne meri)."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def report(results: Dict[str, Any], name: str, data: Dict[str, Any]) -> None:
+    results[name] = data
+    extra = " ".join(f"{k}={v}" for k, v in data.items() if not k.endswith("_ms") and k != "runs")
+    print(f"  {name:<40} median {data.get('median_ms', '-'):>10} ms  p95 {data.get('p95_ms', '-'):>10} ms  {extra}")
+
+
+# ----------------------------------------------------------------------
+# Pojedinačni benchmark-i
+# ----------------------------------------------------------------------
+
+def bench_list_files(tree: Path, size: int, args, results: Dict[str, Any]) -> None:
+    from tools.file_manager import FileManager
+    from tools.file_watcher import FileWatcher, get_watcher, stop_watcher
+
+    # Hladno: kompletan prolaz kroz stablo (start servera / promena projekta)
+    samples = measure(lambda: FileWatcher(tree, use_native=False)._rescan(emit=False), repeat=args.repeat_slow)
+    report(results, f"list_files.cold@{size}", summarize(samples, files=size))
+
+    # Toplo: FileManager.list_files iz keša watcher-a (svaki UI refresh)
+    file_manager = FileManager(str(tree))
+    watcher = get_watcher(tree)
+    samples = measure(lambda: file_manager.list_files(), repeat=args.repeat, warmup=1)
+    report(results, f"list_files.warm@{size}", summarize(samples))
+
+    # Posle promene stabla keš po dubini se gradi ponovo (sortiranje celog snapshot-a)
+    def invalidate():
+        with watcher._lock:
+            watcher._depth_cache.clear()
+    samples = measure(lambda: file_manager.list_files(), repeat=args.repeat, setup=invalidate)
+    report(results, f"list_files.after_change@{size}", summarize(samples))
+    stop_watcher(tree)
+
+
+def bench_search(tree: Path, size: int, args, results: Dict[str, Any]) -> None:
+    import api
+    from fastapi.testclient import TestClient
+
+    api.init_services()  # TestClient bez 'with' ne pokreće lifespan
+    client = TestClient(api.app)
+    headers = {"X-API-Key": api.API_TOKEN or ""}
+    response = client.post("/set-project-dir", params={"path": str(tree)}, headers=headers)
+    response.raise_for_status()
+
+    def reset_index():
+        index = api.search_indexes.pop(str(Path(tree).resolve()), None)
+        if index:
+            index.close()
+        for leftover in (tree / ".agent").glob("search_index.sqlite*"):
+            leftover.unlink()
+
+    def search(query: str):
+        response = client.get("/search", params={"query": query, "limit": 100}, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    # Hladno: prvi upit gradi trigram indeks celog projekta
+    samples = measure(lambda: search("compute_total"), repeat=args.repeat_slow, setup=reset_index)
+    report(results, f"search.cold@{size}", summarize(samples))
+
+    # Toplo: čest pojam (puna stranica) i redak pojam (malo kandidata)
+    samples = measure(lambda: search("compute_total"), repeat=args.repeat, warmup=1)
+    report(results, f"search.common@{size}", summarize(samples))
+    samples = measure(lambda: search("normalize_7"), repeat=args.repeat, warmup=1)
+    report(results, f"search.rare@{size}", summarize(samples))
+    samples = measure(lambda: search("fabrika_bench_missing"), repeat=args.repeat, warmup=1)
+    report(results, f"search.few_hits@{size}", summarize(samples))
+
+    # Memorija indeksa u procesu (posting liste + mapa fajlova) - gradi se ispočetka van API-ja
+    import tracemalloc
+    from tools.search_index import SearchIndex
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        index = SearchIndex(tree, Path(tmp) / "search_index.sqlite")
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report(results, f"search.index_memory@{size}", {
+            "mb": round(current / (1024 * 1024), 2),
+            "trigrams": len(index.postings),
+            "entries": sum(len(ids) for ids in index.postings.values()),
+        })
+        del index
+
+
+def bench_scan_code(tree: Path, size: int, args, results: Dict[str, Any]) -> None:
+    from core.sentinel import SecuritySentinel
+
+    sentinel = SecuritySentinel()
+    sources = []
+    for path in sorted(tree.rglob("module_*")):
+        if path.suffix in (".py", ".js", ".jsx"):
+            language = "python" if path.suffix == ".py" else "javascript"
+            sources.append((path.read_text(encoding="utf-8"), language))
+        if len(sources) >= args.scan_limit:
+            break
+    total_mb = sum(len(code.encode("utf-8")) for code, _ in sources) / (1024 * 1024)
+
+    def scan_all():
+        for code, language in sources:
+            sentinel.scan_code(code, language)
+
+    samples = measure(scan_all, repeat=args.repeat_slow, warmup=1)
+    median = statistics.median(samples)
+    report(results, f"scan_code.files@{size}", summarize(
+        samples, files=len(sources), mb=round(total_mb, 2), mb_per_s=round(total_mb / median, 2)))
+
+    # Jedan veliki fajl (generisanje celog modula) - spaja do ~1 MB koda
+    python_code = []
+    length = 0
+    for code, language in sources:
+        if language == "python":
+            python_code.append(code)
+            length += len(code)
+            if length >= 1024 * 1024:
+                break
+    blob = "\n".join(python_code)
+    samples = measure(lambda: sentinel.scan_code(blob, "python"), repeat=args.repeat_slow, warmup=1)
+    blob_mb = len(blob.encode("utf-8")) / (1024 * 1024)
+    report(results, f"scan_code.single_file@{size}", summarize(
+        samples, mb=round(blob_mb, 2), mb_per_s=round(blob_mb / statistics.median(samples), 2)))
+
+
+def bench_detect_missing(tree: Path, size: int, args, results: Dict[str, Any]) -> None:
+    from tools.dependency_detector import DependencyDetector
+
+    cache = tree / ".agent" / "dependency_cache.sqlite"
+
+    def drop_cache():
+        for leftover in cache.parent.glob(cache.name + "*"):
+            leftover.unlink()
+
+    def fresh_detector():
+        return DependencyDetector(str(tree)).detect_missing()
+
+    # Hladno: parsiranje svih fajlova (pool procesa) i upis keša
+    samples = measure(fresh_detector, repeat=args.repeat_slow, setup=drop_cache)
+    missing = fresh_detector()
+    report(results, f"detect_missing.cold@{size}", summarize(
+        samples, missing_python=len(missing.get("python", [])), missing_node=len(missing.get("node", []))))
+
+    # Novi proces sa postojećim kešom: samo stat() po fajlu
+    samples = measure(fresh_detector, repeat=args.repeat_slow)
+    report(results, f"detect_missing.cached@{size}", summarize(samples))
+
+    # Ponovljen poziv na istom detektoru (keš je već u memoriji)
+    detector = DependencyDetector(str(tree))
+    samples = measure(detector.detect_missing, repeat=args.repeat, warmup=1)
+    report(results, f"detect_missing.warm@{size}", summarize(samples))
+
+
+class _Clock:
+    """Sat koji pri svakom pozivu pomera vreme za sekundu - svaka verzija dobija svoju sekundu."""
+
+    def __init__(self):
+        self.now = int(time.time()) - 10 ** 6
+
+    def __call__(self) -> float:
+        self.now += 1
+        return float(self.now)
+
+
+def bench_history(args, results: Dict[str, Any]) -> None:
+    import tools.history_manager as history_module
+    from tools.history_manager import HistoryManager
+
+    workspace = Path(tempfile.mkdtemp(prefix="bench_history_"))
+    original_time = history_module.time
+    history_module.time = types.SimpleNamespace(time=_Clock())
+    try:
+        history = HistoryManager(str(workspace))
+        target = workspace / "src" / "service.py"
+        target.parent.mkdir(parents=True)
+        lines = [f"def handler_{i}(request):\n    return compute(request, {i})\n" for i in range(400)]
+
+        versions = args.history_versions
+        samples = []
+        for version in range(versions):
+            # Mala izmena po verziji - tipičan tok (delta kompresija)
+            lines[version % len(lines)] = f"def handler_{version}(request):\n    return compute(request, {version}, True)\n"
+            target.write_text("".join(lines), encoding="utf-8")
+            started = time.perf_counter()
+            history.create_backup("src/service.py")
+            samples.append(time.perf_counter() - started)
+        report(results, "history.create_backup", summarize(samples, versions=versions, file_kb=round(target.stat().st_size / 1024, 1)))
+
+        samples = measure(lambda: history.get_history("src/service.py"), repeat=args.repeat, warmup=1)
+        report(results, "history.get_history", summarize(samples, versions=len(history.get_history("src/service.py"))))
+
+        entries = history.get_history("src/service.py")
+        oldest, newest = entries[-1]["version_id"], entries[0]["version_id"]
+        samples = measure(lambda: history.read_version("src/service.py", oldest), repeat=args.repeat, warmup=1)
+        report(results, "history.read_version.oldest", summarize(samples))
+        samples = measure(lambda: history.read_version("src/service.py", newest), repeat=args.repeat, warmup=1)
+        report(results, "history.read_version.newest", summarize(samples))
+    finally:
+        history_module.time = original_time
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def bench_stream(args, results: Dict[str, Any]) -> None:
+    server = None
+    if args.provider == "http":
+        from benchmarks.stub_llm_server import StubLLMServer
+
+        server = StubLLMServer(ttft=args.stub_ttft, tokens_per_sec=args.stub_tokens_per_sec,
+                               tokens=args.stub_tokens).start()
+        os.environ["OPENAI_API_BASE"] = server.base_url
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["OPENAI_API_KEY"] = "stub"
+        model = "openai/stub-model"
+    else:
+        # Provajder u procesu (core/stub_llm.py) - bez HTTP-a, meri se samo overhead fabrike
+        model = f"stub/ttft={args.stub_ttft},tps={args.stub_tokens_per_sec},tokens={args.stub_tokens}"
+
+    from core.agent_manager import Agent
+    from core.orchestrator import SecureOrchestrator
+
+    workspace = Path(tempfile.mkdtemp(prefix="bench_stream_"))
+    try:
+        orchestrator = SecureOrchestrator(project_dir=str(workspace))
+        agents = [Agent(id=f"bench-{i}", name=f"Bench {i}", role="Ti si Senior Developer.",
+                        model=model) for i in range(args.agents)]
+        orchestrator.agent_manager.agents = agents
+        agent_ids = [agent.id for agent in agents]
+        total_streams = args.sessions * args.agents
+        orchestrator.llm_scheduler.max_concurrency = args.model_concurrency or total_streams
+
+        async def session(index: int) -> Dict[str, Any]:
+            chunks = 0
+            events = []
+            async for line in orchestrator.async_stream_code_generation(
+                    f"Refaktoriši servis {index}", "src/service.py", agent_ids=agent_ids, mode="Coding"):
+                item = json.loads(line)
+                if item["type"] == "chunk":
+                    chunks += 1
+                elif item["type"] in ("metrics", "error"):
+                    events.append(item)
+            return {"chunks": chunks, "events": events}
+
+        async def run(sessions: int) -> List[Dict[str, Any]]:
+            return await asyncio.gather(*(session(i) for i in range(sessions)))
+
+        # Zagrevanje: import provajdera i HTTP klijent litellm-a
+        asyncio.run(run(1))
+
+        started = time.perf_counter()
+        outcomes = asyncio.run(run(args.sessions))
+        wall = time.perf_counter() - started
+
+        events = [event for outcome in outcomes for event in outcome["events"]]
+        errors = [event for event in events if event["type"] == "error"]
+        metrics = [event for event in events if event["type"] == "metrics"]
+        ttft = [event["ttft_ms"] for event in metrics if event.get("ttft_ms") is not None]
+        totals = [event["total_ms"] for event in metrics]
+        waits = [event["queue_wait_ms"] for event in metrics]
+        chunks = sum(outcome["chunks"] for outcome in outcomes)
+        # Koliko traje isti odgovor bez ikakve obrade (teorijski minimum stub-a)
+        ideal_ms = (args.stub_ttft + args.stub_tokens / args.stub_tokens_per_sec) * 1000
+
+        report(results, f"stream.multi_agent.{args.provider}", {
+            "runs": 1,
+            "median_ms": round(statistics.median(totals), 1) if totals else None,
+            "p95_ms": round(percentile(totals, 0.95), 1) if totals else None,
+            "wall_ms": round(wall * 1000, 1),
+            "sessions": args.sessions,
+            "agents": args.agents,
+            "errors": len(errors),
+            "sessions_per_s": round(args.sessions / wall, 2),
+            "chunks_per_s": round(chunks / wall, 1),
+            "ttft_p50_ms": round(percentile(ttft, 0.5), 1) if ttft else None,
+            "ttft_p95_ms": round(percentile(ttft, 0.95), 1) if ttft else None,
+            "queue_wait_p95_ms": round(percentile(waits, 0.95), 1) if waits else None,
+            "overhead_median_ms": round(statistics.median(totals) - ideal_ms, 1) if totals else None,
+        })
+        if errors:
+            print(f"  ! Greške agenata: {errors[0]['content'][:200]}")
+    finally:
+        if server:
+            server.stop()
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+# ----------------------------------------------------------------------
+# Rezultati
+# ----------------------------------------------------------------------
+
+def _git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                               capture_output=True, text=True, timeout=30).stdout.strip()
+        return f"{commit}-dirty" if commit and dirty else (commit or "unknown")
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> int:
+    """Poredi medijane dva JSON rezultata; vraća broj regresija većih od praga."""
+    old = json.loads(Path(old_path).read_text(encoding="utf-8"))
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))
+    print(f"Stari: {old['meta'].get('commit')}  Novi: {new['meta'].get('commit')}  (prag {threshold:.0%})")
+    print(f"{'benchmark':<42} {'stari ms':>12} {'novi ms':>12} {'odnos':>8}")
+    regressions = 0
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        before = old["results"].get(name, {}).get("median_ms")
+        after = new["results"].get(name, {}).get("median_ms")
+        if not before or after is None:
+            print(f"{name:<42} {before or '-':>12} {after if after is not None else '-':>12} {'-':>8}")
+            continue
+        ratio = after / before
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  SPORIJE"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            mark = "  BRŽE"
+        print(f"{name:<42} {before:>12.2f} {after:>12.2f} {ratio:>7.2f}x{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite fabrike")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Veličine sintetičkih stabala (broj fajlova)")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="Benchmark-i koji se pokreću (zarezom)")
+    parser.add_argument("--repeat", type=int, default=20, help="Ponavljanja brzih merenja")
+    parser.add_argument("--repeat-slow", type=int, default=3, help="Ponavljanja sporih (hladnih) merenja")
+    parser.add_argument("--scan-limit", type=int, default=2000, help="Najviše fajlova za scan_code")
+    parser.add_argument("--history-versions", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=20, help="Istovremene stream sesije")
+    parser.add_argument("--agents", type=int, default=3, help="Agenata po sesiji")
+    parser.add_argument("--model-concurrency", type=int, default=0,
+                        help="Limit paralelnih poziva po modelu (0 = bez limita)")
+    parser.add_argument("--provider", choices=("http", "stub"), default="http",
+                        help="Stub LLM preko HTTP servera (openai/...) ili u procesu (stub/...)")
+    parser.add_argument("--stub-ttft", type=float, default=0.05)
+    parser.add_argument("--stub-tokens-per-sec", type=float, default=400.0)
+    parser.add_argument("--stub-tokens", type=int, default=120)
+    parser.add_argument("--trees", default=None, help="Folder za (ponovo upotrebljiva) sintetička stabla")
+    parser.add_argument("--output", default=None, help="JSON izlaz (podrazumevano benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("STARI", "NOVI"), help="Poredi dva JSON rezultata")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Prag za regresiju pri poređenju")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(args.compare[0], args.compare[1], args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Nepoznati benchmark-i: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    # SR: api.init_services() pravi orkestrator u tekućem folderu - izolujemo ga u privremeni workspace
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    sys.path.insert(0, str(REPO_ROOT))
+    workspace = Path(tempfile.mkdtemp(prefix="bench_workspace_"))
+    os.chdir(workspace)
+
+    from benchmarks.synthetic import create_tree
+
+    trees_root = Path(args.trees).resolve() if args.trees else workspace / "trees"
+    results: Dict[str, Any] = {}
+    started = time.time()
+    try:
+        for size in sizes if set(selected) - {"history", "stream"} else []:
+            tree = trees_root / f"tree_{size}"
+            if not (tree / "package.json").exists():
+                print(f"Pravim sintetičko stablo sa {size} fajlova...")
+                create_tree(tree, size)
+            print(f"[{size} fajlova]")
+            for name, bench in (("list_files", bench_list_files), ("search", bench_search),
+                                ("scan_code", bench_scan_code), ("detect_missing", bench_detect_missing)):
+                if name in selected:
+                    bench(tree, size, args, results)
+
+        if "history" in selected:
+            print("[istorija]")
+            bench_history(args, results)
+        if "stream" in selected:
+            print("[stream]")
+            bench_stream(args, results)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    commit = _git_commit()
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+            "duration_s": round(time.time() - started, 1),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": sizes,
+            "args": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        },
+        "results": results,
+    }, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Rezultati: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Stub LLM server za benchmark-e.
+OpenAI-kompatibilan HTTP server (POST /v1/chat/completions, stream i bez streama)
+koji vraća determinističke odgovore sa podesivim vremenom do prvog tokena i
+brzinom generisanja. Bez spoljnih zavisnosti - čist asyncio, radi u pozadinskoj niti.
+
+Orkestrator ga gađa preko litellm-a kao model 'openai/stub-model' sa
+OPENAI_API_BASE=http://127.0.0.1:<port>/v1. Tokeni su isti kao kod 'stub/' provajdera
+(core/stub_llm.py), ali ovde prolaze i kroz HTTP klijent i SSE parser litellm-a.
+
+Pokretanje (samostalno, za ručno testiranje):
+    python -m benchmarks.stub_llm_server [--port 8765] [--ttft 0.05] [--tokens-per-sec 200]
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from typing import Optional, Tuple
+
+from core.stub_llm import completion_tokens
+
+
+class StubLLMServer:
+    """
+    OpenAI-kompatibilan stub server.
+
+    Attributes:
+        ttft: Kašnjenje pre prvog chunk-a (sekunde).
+        tokens_per_sec: Brzina generisanja (0 = bez pauza).
+        tokens: Broj tokena po odgovoru.
+        chunk_tokens: Broj tokena u jednom SSE chunk-u.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, ttft: float = 0.05,
+                 tokens_per_sec: float = 200.0, tokens: int = 120, chunk_tokens: int = 4,
+                 include_code: bool = True):
+        self.host = host
+        self.port = port
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.tokens = tokens
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.include_code = include_code
+        self.requests = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    # ------------------------------------------------------------------
+    # Životni ciklus
+    # ------------------------------------------------------------------
+
+    def start(self) -> "StubLLMServer":
+        """Pokreće server u pozadinskoj niti i čeka da počne da prima konekcije."""
+        self._thread = threading.Thread(target=self._run, name="StubLLMServer", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(10):
+            raise RuntimeError("Stub LLM server se nije pokrenuo")
+        return self
+
+    def stop(self) -> None:
+        if self._loop and self._server:
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+            except Exception:
+                pass
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    async def _shutdown(self) -> None:
+        """Zatvara listener i keep-alive konekcije koje klijent nije zatvorio."""
+        self._server.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, bytes]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        body = await reader.readexactly(length) if length else b""
+        return method, path.split("?", 1)[0], body
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # Keep-alive: HTTP klijent (httpx) ponovo koristi konekciju
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, body = request
+                if method == "POST" and path.endswith("/chat/completions"):
+                    self.requests += 1
+                    payload = json.loads(body or b"{}")
+                    if payload.get("stream"):
+                        await self._stream(writer, payload)
+                    else:
+                        await self._complete(writer, payload)
+                elif method == "GET" and path.endswith("/models"):
+                    await self._json(writer, 200, {"object": "list", "data": [
+                        {"id": "stub-model", "object": "model", "owned_by": "benchmark"}]})
+                else:
+                    await self._json(writer, 404, {"error": {"message": f"Nepoznata ruta {path}"}})
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Otkazivanje pri gašenju servera se ne propagira - asyncio bi ga logovao kao grešku
+            pass
+        finally:
+            writer.close()
+
+    async def _json(self, writer: asyncio.StreamWriter, status: int, data: dict) -> None:
+        body = json.dumps(data).encode()
+        reason = "OK" if status == 200 else "Not Found"
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    @staticmethod
+    def _usage(tokens: int) -> dict:
+        return {"prompt_tokens": 50, "completion_tokens": tokens, "total_tokens": 50 + tokens}
+
+    async def _complete(self, writer: asyncio.StreamWriter, payload: dict) -> None:
+        tokens = completion_tokens(self.tokens, self.include_code)
+        await asyncio.sleep(self.ttft + (len(tokens) / self.tokens_per_sec if self.tokens_per_sec else 0))
+        await self._json(writer, 200, {
+            "id": f"chatcmpl-stub-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub-model"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "".join(tokens)}}],
+            "usage": self._usage(len(tokens)),
+        })
+
+    async def _stream(self, writer: asyncio.StreamWriter, payload: dict) -> None:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n")
+        tokens = completion_tokens(self.tokens, self.include_code)
+        base = {
+            "id": f"chatcmpl-stub-{self.requests}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub-model"),
+        }
+        pause = self.chunk_tokens / self.tokens_per_sec if self.tokens_per_sec else 0
+
+        async def send(data: str) -> None:
+            event = f"data: {data}\n\n".encode()
+            writer.write(f"{len(event):X}\r\n".encode() + event + b"\r\n")
+            await writer.drain()
+
+        await asyncio.sleep(self.ttft)
+        for start in range(0, len(tokens), self.chunk_tokens):
+            if start:
+                await asyncio.sleep(pause)
+            content = "".join(tokens[start:start + self.chunk_tokens])
+            await send(json.dumps({**base, "choices": [
+                {"index": 0, "delta": {"role": "assistant", "content": content}, "finish_reason": None}]}))
+        await send(json.dumps({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                               "usage": self._usage(len(tokens))}))
+        await send("[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub LLM server (OpenAI-kompatibilan)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft", type=float, default=0.05)
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0)
+    parser.add_argument("--tokens", type=int, default=120)
+    args = parser.parse_args()
+    server = StubLLMServer(port=args.port, ttft=args.ttft, tokens_per_sec=args.tokens_per_sec,
+                           tokens=args.tokens).start()
+    print(f"Stub LLM server radi na {server.base_url} (Ctrl+C za kraj)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Sintetička stabla projekata za benchmark-e.
+Pravi deterministički projekat sa N fajlova (Python, JS/JSX, Markdown, JSON) u
+ugnježdenim folderima, sa importima (i nekim nepostojećim paketima), tipičnim
+kodom i retkim linijama koje Sentinel prijavljuje.
+
+Pokretanje (samo pravljenje stabla):
+    python -m benchmarks.synthetic /tmp/tree --files 10000
+"""
+
+import argparse
+import json
+import os
+import random
+from pathlib import Path
+from typing import Dict
+
+# Udeo vrsta fajlova (ekstenzija, težina)
+FILE_KINDS = (('.py', 60), ('.js', 15), ('.jsx', 10), ('.md', 10), ('.json', 5))
+FILES_PER_DIR = 50
+DIRS_PER_LEVEL = 20
+
+PYTHON_IMPORTS = ['os', 'sys', 'json', 're', 'typing', 'pathlib', 'dataclasses', 'itertools',
+                  'requests', 'pydantic', 'litellm', 'dotenv']
+# Paketi koji sigurno nisu instalirani - detect_missing ih mora prijaviti
+MISSING_PYTHON = [f'fabrika_bench_missing_{i}' for i in range(8)]
+NODE_IMPORTS = ['react', 'react-dom', 'axios', 'lodash', 'lucide-react']
+MISSING_NODE = [f'fabrika-bench-missing-{i}' for i in range(4)]
+
+PY_BODY = '''
+
+class {cls}:
+    """Servis za {word} (generisano za benchmark)."""
+
+    def __init__(self, items=None):
+        self.items = list(items or [])
+        self.cache = {{}}
+
+    def compute_total(self, discount=0):
+        total = sum(item.price * item.qty for item in self.items)
+        if discount and total > 100:
+            total -= total * discount / 100
+        return round(total, 2)
+
+    def find(self, key):
+        if key in self.cache:
+            return self.cache[key]
+        for item in self.items:
+            if getattr(item, "name", None) == key:
+                self.cache[key] = item
+                return item
+        return None
+
+
+def {func}(values):
+    result = []
+    for index, value in enumerate(values):
+        if value is None:
+            continue
+        result.append((index, str(value).strip()))
+    return result
+'''
+
+JS_BODY = '''
+export function {func}(items) {{
+  const total = items.reduce((sum, item) => sum + item.price * item.qty, 0);
+  return Math.round(total * 100) / 100;
+}}
+
+export const {cls} = ({{ label, value }}) => {{
+  const [state, setState] = useState(value);
+  return (
+    <div className="flex items-center gap-2">
+      <span>{{label}}</span>
+      <button onClick={{() => setState(state + 1)}}>{{state}}</button>
+    </div>
+  );
+}};
+'''
+
+# Linije koje Sentinel prijavljuje (~2% fajlova)
+PY_THREATS = ['    result = eval(user_input)', '    os.system("rm -rf " + path)',
+              '    data = pickle.loads(blob)', '    subprocess.run(cmd, shell=True)']
+JS_THREATS = ['el.innerHTML = userData;', 'eval(payload);']
+
+WORDS = ['orders', 'invoices', 'users', 'catalog', 'reports', 'billing', 'search', 'audit', 'inventory']
+
+
+def _pick_kind(rng: random.Random) -> str:
+    total = sum(weight for _, weight in FILE_KINDS)
+    roll = rng.uniform(0, total)
+    for ext, weight in FILE_KINDS:
+        roll -= weight
+        if roll <= 0:
+            return ext
+    return FILE_KINDS[0][0]
+
+
+def _python_file(rng: random.Random, index: int) -> str:
+    imports = rng.sample(PYTHON_IMPORTS, 4)
+    if rng.random() < 0.05:
+        imports.append(rng.choice(MISSING_PYTHON))
+    lines = [f"import {name}" for name in imports]
+    body = PY_BODY.format(cls=f"Service{index}", word=rng.choice(WORDS), func=f"normalize_{index}")
+    if rng.random() < 0.02:
+        body += f"\n\ndef unsafe_{index}(user_input, path, blob, cmd):\n{rng.choice(PY_THREATS)}\n"
+    return "\n".join(lines) + body
+
+
+def _js_file(rng: random.Random, index: int) -> str:
+    imports = rng.sample(NODE_IMPORTS, 2)
+    if rng.random() < 0.05:
+        imports.append(rng.choice(MISSING_NODE))
+    lines = [f"import {name.replace('-', '_')} from '{name}';" for name in imports]
+    lines.append("import { useState } from 'react';")
+    lines.append(f"import helper from './helper_{index % 10}';")
+    body = JS_BODY.format(cls=f"Widget{index}", func=f"total{index}")
+    if rng.random() < 0.02:
+        body += f"\n{rng.choice(JS_THREATS)}\n"
+    return "\n".join(lines) + body
+
+
+def _content(rng: random.Random, ext: str, index: int) -> str:
+    if ext == '.py':
+        return _python_file(rng, index)
+    if ext in ('.js', '.jsx'):
+        return _js_file(rng, index)
+    if ext == '.md':
+        return f"# Modul {index}\n\nOpis modula za {rng.choice(WORDS)}.\n\n- stavka 1\n- stavka 2\n"
+    return json.dumps({"id": index, "name": rng.choice(WORDS), "enabled": rng.random() < 0.5}, indent=2)
+
+
+def _relative_dir(index: int) -> Path:
+    """Fajl index -> folder: 50 fajlova po folderu, 20 foldera po nivou."""
+    folder = index // FILES_PER_DIR
+    parts = []
+    while True:
+        parts.append(f"pkg_{folder % DIRS_PER_LEVEL:02d}")
+        folder //= DIRS_PER_LEVEL
+        if folder == 0:
+            break
+    return Path(*reversed(parts))
+
+
+def create_tree(root: Path, file_count: int, seed: int = 42) -> Dict[str, int]:
+    """
+    Pravi sintetički projekat u root-u (root mora biti prazan ili nepostojeći).
+
+    Returns:
+        Broj fajlova po ekstenziji.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    counts: Dict[str, int] = {}
+    made_dirs = set()
+
+    for index in range(file_count):
+        ext = _pick_kind(rng)
+        directory = root / _relative_dir(index)
+        if directory not in made_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            made_dirs.add(directory)
+        (directory / f"module_{index}{ext}").write_text(_content(rng, ext, index), encoding='utf-8')
+        counts[ext] = counts.get(ext, 0) + 1
+
+    # Ključni fajlovi projekta i folder koji se preskače pri skeniranju
+    (root / "package.json").write_text(json.dumps({
+        "name": "bench-project",
+        "dependencies": {name: "^1.0.0" for name in NODE_IMPORTS[:3]},
+    }, indent=2), encoding='utf-8')
+    (root / "requirements.txt").write_text("requests\npydantic\n", encoding='utf-8')
+    ignored = root / "node_modules" / "left-pad"
+    ignored.mkdir(parents=True, exist_ok=True)
+    (ignored / "index.js").write_text("module.exports = (s) => s;\n", encoding='utf-8')
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sintetičko stablo projekta")
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if os.path.exists(args.root) and os.listdir(args.root):
+        raise SystemExit(f"{args.root} nije prazan folder")
+    counts = create_tree(Path(args.root), args.files, args.seed)
+    print(f"Napravljeno {sum(counts.values())} fajlova u {args.root}: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,10 @@ from typing import List, Optional, Dict
 from pathlib import Path
 from pydantic import BaseModel, Field
 
+from core.log import get_logger
+
+log = get_logger("AgentManager")
+
 class Agent(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -30,7 +34,7 @@ class AgentManager:
                 data = json.loads(self.agents_file.read_text(encoding='utf-8'))
                 self.agents = [Agent(**item) for item in data]
             except Exception as e:
-                print(f"[AgentManager] Error loading agents: {e}")
+                log.error("Greška pri učitavanju agenata", error=e)
                 self._create_defaults()
     
     def _create_defaults(self):
@@ -48,7 +52,7 @@ class AgentManager:
         self.agents_dir.mkdir(parents=True, exist_ok=True)
         data = [agent.dict() for agent in self.agents]
         self.agents_file.write_text(json.dumps(data, indent=2), encoding='utf-8')
-        print(f"[AgentManager] Agents saved to {self.agents_file}")
+        log.info("Agenti sačuvani", agents=len(self.agents), file=self.agents_file)
 
     def get_agent(self, agent_id: str) -> Optional[Agent]:
         for agent in self.agents:
@@ -0,0 +1,159 @@
+"""
+Project Context Builder - Keširan globalni kontekst projekta za LLM upite.
+Struktura i izvodi ključnih fajlova se grade jednom i ponovo samo kada se
+promene (verzija stabla fajlova, mtime/size fajla), uz ograničenje u tokenima.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# SR: Gruba procena - ~4 karaktera po tokenu (isto kao procena u streaming metrikama)
+CHARS_PER_TOKEN = 4
+
+DEFAULT_KEY_FILES = ["README.md", "requirements.txt", "api.py", "ui/src/App.jsx", "ui/package.json"]
+
+# Ključni fajlovi koji se traže i van očekivane putanje (npr. frontend u drugom folderu)
+RELOCATABLE_FILES = {"App.jsx", "package.json"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Procenjuje broj tokena u tekstu."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Skraćuje tekst na budžet tokena, po granici linije kada je moguće."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    if cut < max_chars // 2:
+        cut = max_chars
+    return text[:cut] + "\n... (skraćeno)"
+
+
+class ProjectContextBuilder:
+    """
+    Gradi tekst "STRUKTURA PROJEKTA + ključni fajlovi" za globalni mod.
+
+    Attributes:
+        token_budget: Ukupan budžet tokena za ceo kontekst.
+        file_token_limit: Maksimum tokena po jednom ključnom fajlu.
+        structure_token_limit: Maksimum tokena za listu fajlova.
+    """
+
+    def __init__(self, file_manager, key_files: Optional[List[str]] = None, token_budget: int = 6000,
+                 file_token_limit: int = 1500, structure_token_limit: int = 2000, max_depth: int = 3):
+        self.file_manager = file_manager
+        self.key_files = key_files or list(DEFAULT_KEY_FILES)
+        self.token_budget = token_budget
+        self.file_token_limit = file_token_limit
+        self.structure_token_limit = structure_token_limit
+        self.max_depth = max_depth
+
+        self._lock = threading.Lock()
+        self._structure_key = None
+        self._structure: Tuple[str, Dict[str, str]] = ("", {})
+        # apsolutna putanja -> (mtime_ns, size, izvod, tokeni)
+        self._excerpts: Dict[str, Tuple[int, int, str, int]] = {}
+        self._context_key = None
+        self._context = ""
+        self.hits = 0
+        self.rebuilds = 0
+
+    def _structure_snapshot(self) -> Tuple[str, Dict[str, str]]:
+        """Vraća (tekst strukture, {ime_fajla: prva putanja}) - ponovo samo kad se stablo promeni."""
+        key = self.file_manager.files_version()
+        if key != self._structure_key:
+            files = [f.replace("\\", "/") for f in self.file_manager.list_files(max_depth=self.max_depth)]
+            by_name: Dict[str, str] = {}
+            for f in files:
+                by_name.setdefault(f.rsplit("/", 1)[-1], f)
+            structure = truncate_to_tokens("\n".join(files), self.structure_token_limit)
+            self._structure = (structure, by_name)
+            self._structure_key = key
+        return self._structure
+
+    def _resolve(self, key_file: str, by_name: Dict[str, str]) -> Optional[Tuple[str, str, os.stat_result]]:
+        """Vraća (prikazno ime, apsolutna putanja, stat) za ključni fajl ili None."""
+        candidates = [key_file]
+        base_name = key_file.rsplit("/", 1)[-1]
+        if base_name in RELOCATABLE_FILES and by_name.get(base_name) not in (None, key_file):
+            candidates.append(by_name[base_name])
+        for candidate in candidates:
+            try:
+                path = self.file_manager._sanitize_path(candidate)
+                st = os.stat(path)
+            except Exception:
+                continue
+            return candidate, str(path), st
+        return None
+
+    def _excerpt(self, path: str, st: os.stat_result) -> Tuple[str, int]:
+        """Vraća izvod fajla (do file_token_limit tokena) - čita disk samo ako se fajl promenio."""
+        cached = self._excerpts.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2], cached[3]
+        # Čita se samo onoliko koliko može da stane u izvod
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            head = f.read(self.file_token_limit * CHARS_PER_TOKEN + 1)
+        excerpt = truncate_to_tokens(head, self.file_token_limit)
+        tokens = estimate_tokens(excerpt)
+        self._excerpts[path] = (st.st_mtime_ns, st.st_size, excerpt, tokens)
+        return excerpt, tokens
+
+    def build(self) -> str:
+        """Vraća kontekst projekta; ako se ništa nije promenilo, vraća keširan tekst."""
+        with self._lock:
+            structure, by_name = self._structure_snapshot()
+            resolved = [r for r in (self._resolve(kf, by_name) for kf in self.key_files) if r]
+            key = (self._structure_key,
+                   tuple((path, st.st_mtime_ns, st.st_size) for _, path, st in resolved))
+            if key == self._context_key:
+                self.hits += 1
+                return self._context
+
+            self.rebuilds += 1
+            context = f"STRUKTURA PROJEKTA (Prva {self.max_depth} nivoa):\n{structure}\n\n"
+            remaining = self.token_budget - estimate_tokens(context)
+            for name, path, st in resolved:
+                if remaining <= 0:
+                    break
+                try:
+                    excerpt, tokens = self._excerpt(path, st)
+                except OSError:
+                    continue
+                if tokens > remaining:
+                    excerpt = truncate_to_tokens(excerpt, remaining)
+                    tokens = estimate_tokens(excerpt)
+                context += f"--- SADRŽAJ KLJUČNOG FAJLA: {name} ---\n{excerpt}\n\n"
+                remaining -= tokens
+
+            # Izbaci izvode fajlova koji više nisu ključni (npr. promenjen koren)
+            live = {path for _, path, _ in resolved}
+            for path in list(self._excerpts):
+                if path not in live:
+                    del self._excerpts[path]
+
+            self._context_key = key
+            self._context = context
+            return context
+
+    def invalidate(self) -> None:
+        """Briše sve keširano (npr. nakon promene korena projekta)."""
+        with self._lock:
+            self._structure_key = None
+            self._context_key = None
+            self._excerpts.clear()
+
+    def bind(self, file_manager) -> None:
+        """Prebacuje builder na drugi FileManager (novi workspace) i briše keš starog projekta."""
+        if file_manager is self.file_manager:
+            return
+        with self._lock:
+            self.file_manager = file_manager
+        self.invalidate()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "rebuilds": self.rebuilds, "cached_files": len(self._excerpts)}
@@ -0,0 +1,277 @@
+"""
+Execution Pools - Sloj za izvršavanje blokirajućeg posla van event loop-a.
+Svaka vrsta posla (LLM, git, instalacije, disk) ima svoj ograničeni pool,
+pa jedna spora pip instalacija ne može da zamrzne streaming sesije.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolFullError(Exception):
+    """Izuzetak koji se baca kada je red čekanja pool-a pun."""
+    pass
+
+
+class BoundedPool:
+    """
+    Executor sa ograničenim brojem radnika i ograničenim redom čekanja.
+
+    Attributes:
+        name: Ime pool-a (za metrike i poruke o grešci).
+        max_workers: Maksimalan broj poslova koji se izvršavaju istovremeno.
+        max_queue: Maksimalan broj poslova koji čekaju na slobodnog radnika.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int = 100, use_processes: bool = False):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self._inflight = 0
+
+    def _sync_process_counts(self) -> None:
+        self.active = min(self._inflight, self.max_workers)
+        self.queued = self._inflight - self.active
+
+    @property
+    def executor(self) -> Executor:
+        # Lenjo kreiranje - procesi se ne podižu dok ne zatrebaju
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=f"pool-{self.name}")
+        return self._executor
+
+    def _reserve(self) -> None:
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise PoolFullError(f"Pool '{self.name}' je preopterećen ({self.queued} poslova čeka)")
+            self.queued += 1
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Izvršava fn(*args, **kwargs) u pool-u i čeka rezultat bez blokiranja event loop-a."""
+        self._reserve()
+        submitted = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+
+        if self.use_processes:
+            # Kod procesa ne vidimo trenutak starta u radniku - aktivne i one u redu
+            # izvodimo iz broja poslova u letu
+            with self._lock:
+                self.queued -= 1
+                self._inflight += 1
+                self._sync_process_counts()
+            try:
+                result = await loop.run_in_executor(self.executor, call)
+                with self._lock:
+                    self.completed += 1
+                return result
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self._inflight -= 1
+                    self._sync_process_counts()
+                    self.total_run += time.perf_counter() - submitted
+
+        dequeued = [False]
+
+        def dequeue() -> None:
+            # Poziva se pod lock-om; idempotentno jer otkazivanje i start mogu da se preklope
+            if not dequeued[0]:
+                dequeued[0] = True
+                self.queued -= 1
+
+        def tracked():
+            started = time.perf_counter()
+            with self._lock:
+                dequeue()
+                self.active += 1
+                self.total_wait += started - submitted
+            try:
+                result = call()
+                with self._lock:
+                    self.completed += 1
+                return result
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.total_run += time.perf_counter() - started
+
+        try:
+            return await loop.run_in_executor(self.executor, tracked)
+        except asyncio.CancelledError:
+            # Klijent je otišao pre nego što je posao počeo - oslobodi mesto u redu
+            with self._lock:
+                dequeue()
+            raise
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Sinhrona varijanta run() za kod koji već radi u nekom pool-u (npr. detektor zavisnosti
+        u 'io' niti deli posao na 'cpu' procese). Ista ograničenja reda i ista statistika.
+
+        Raises:
+            PoolFullError: Ako je red pool-a pun.
+        """
+        self._reserve()
+        submitted = time.perf_counter()
+        call = functools.partial(fn, *args, **kwargs)
+
+        if self.use_processes:
+            with self._lock:
+                self.queued -= 1
+                self._inflight += 1
+                self._sync_process_counts()
+
+            def finished(future: Future) -> None:
+                with self._lock:
+                    if not future.cancelled():
+                        if future.exception() is None:
+                            self.completed += 1
+                        else:
+                            self.failed += 1
+                    self._inflight -= 1
+                    self._sync_process_counts()
+                    self.total_run += time.perf_counter() - submitted
+
+            try:
+                future = self.executor.submit(call)
+            except BaseException:
+                with self._lock:
+                    self._inflight -= 1
+                    self._sync_process_counts()
+                raise
+            future.add_done_callback(finished)
+            return future
+
+        dequeued = [False]
+
+        def dequeue() -> None:
+            if not dequeued[0]:
+                dequeued[0] = True
+                self.queued -= 1
+
+        def tracked():
+            started = time.perf_counter()
+            with self._lock:
+                dequeue()
+                self.active += 1
+                self.total_wait += started - submitted
+            try:
+                result = call()
+                with self._lock:
+                    self.completed += 1
+                return result
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.total_run += time.perf_counter() - started
+
+        def cancelled(future: Future) -> None:
+            if future.cancelled():
+                with self._lock:
+                    dequeue()
+
+        try:
+            future = self.executor.submit(tracked)
+        except BaseException:
+            with self._lock:
+                dequeue()
+            raise
+        future.add_done_callback(cancelled)
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait / finished * 1000, 2) if finished else 0.0,
+                "avg_run_ms": round(self.total_run / finished * 1000, 2) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class ExecutionPools:
+    """Registar imenovanih pool-ova koje dele API i orkestrator."""
+
+    # ime -> (max_workers, max_queue, use_processes)
+    DEFAULT_POOLS = {
+        'llm': (8, 64, False),         # Sinhroni litellm.completion pozivi
+        'install': (2, 16, False),     # pip/npm - serijski po okruženju (InstallQueue/lock), python i node paralelno
+        'git': (2, 32, False),         # git subprocesi
+        'io': (4, 128, False),         # Čitanje/pisanje fajlova, pretraga, skeniranje
+        'dialog': (1, 4, False),       # Nativni dijalozi za izbor fajla/foldera (čekaju korisnika)
+        'cpu': (2, 32, True),          # CPU-intenzivne čiste funkcije (bez deljenog stanja)
+        'audit': (os.cpu_count() or 2, 64, True),  # Skeniranje celog projekta - po jedan proces na jezgro
+    }
+
+    def __init__(self, config: Optional[Dict[str, tuple]] = None):
+        self.pools: Dict[str, BoundedPool] = {}
+        for name, (workers, queue, processes) in (config or self.DEFAULT_POOLS).items():
+            self.pools[name] = BoundedPool(name, workers, queue, processes)
+
+    def get(self, name: str) -> BoundedPool:
+        if name not in self.pools:
+            raise KeyError(f"Nepoznat pool: {name}")
+        return self.pools[name]
+
+    async def run(self, pool: str, fn: Callable, *args, **kwargs) -> Any:
+        return await self.get(pool).run(fn, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    def shutdown(self) -> None:
+        for pool in self.pools.values():
+            pool.shutdown()
+
+
+# SR: Deljena instanca za ceo proces
+execution_pools = ExecutionPools()
+
+
+async def run_blocking(pool: str, fn: Callable, *args, **kwargs) -> Any:
+    """Prečica: izvrši blokirajuću funkciju u imenovanom pool-u."""
+    return await execution_pools.run(pool, fn, *args, **kwargs)
@@ -0,0 +1,164 @@
+"""
+LLM Response Cache - Keš odgovora LLM-a adresiran sadržajem upita.
+Identični upiti (model, poruke, prilozi, parametri) se ne šalju ponovo provajderu.
+Čuva se u SQLite bazi pod .agent/ sa TTL-om i LRU izbacivanjem.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.log import get_logger
+
+log = get_logger("LLMCache")
+
+
+class LLMResponseCache:
+    """
+    Keš za sinhrone i streaming LLM odgovore.
+
+    Ključ je SHA-256 kanonskog JSON-a upita, pa ulaze i sistemski prompt, korisnički
+    sadržaj i prilozi (slike/fajlovi su deo poruka). Streaming odgovori se čuvaju kao
+    sekvenca chunk-ova i reprodukuju istim redom.
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: int = 24 * 3600, max_entries: int = 500,
+                 enabled: bool = True):
+        """
+        Args:
+            db_path: Putanja do SQLite fajla.
+            ttl_seconds: Koliko dugo je unos validan.
+            max_entries: Maksimalan broj unosa pre LRU izbacivanja.
+            enabled: Ako je False, keš ne čita i ne upisuje ništa.
+        """
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=5)
+
+    def _init_db(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, model TEXT, kind TEXT, payload TEXT, tokens INTEGER, "
+                    "created REAL, last_access REAL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, Any]], **params) -> str:
+        """Pravi ključ od modela, poruka i parametara poziva (npr. temperature, stream)."""
+        canonical = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _get(self, key: str, kind: str) -> Optional[Tuple[str, int]]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        row = conn.execute(
+                            "SELECT payload, tokens, created FROM responses WHERE key = ? AND kind = ?",
+                            (key, kind)
+                        ).fetchone()
+                        if row and now - row[2] > self.ttl_seconds:
+                            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                            row = None
+                        if row:
+                            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                log.warning("Greška pri čitanju keša", error=e)
+                row = None
+
+            if row:
+                self.hits += 1
+                return row[0], row[1]
+            self.misses += 1
+            return None
+
+    def _put(self, key: str, model: str, kind: str, payload: str, tokens: int) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO responses (key, model, kind, payload, tokens, created, last_access) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (key, model, kind, payload, tokens, now, now)
+                        )
+                        conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+                        # LRU: zadrži samo max_entries poslednje korišćenih
+                        conn.execute(
+                            "DELETE FROM responses WHERE key NOT IN "
+                            "(SELECT key FROM responses ORDER BY last_access DESC LIMIT ?)",
+                            (self.max_entries,)
+                        )
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                log.warning("Greška pri upisu u keš", error=e)
+
+    def get_completion(self, key: str) -> Optional[Tuple[str, int]]:
+        """Vraća (content, tokens) za keširan sinhroni odgovor ili None."""
+        return self._get(key, "completion")
+
+    def put_completion(self, key: str, model: str, content: str, tokens: int) -> None:
+        self._put(key, model, "completion", content, tokens)
+
+    def get_stream(self, key: str) -> Optional[List[str]]:
+        """Vraća listu keširanih chunk-ova za streaming odgovor ili None."""
+        cached = self._get(key, "stream")
+        if cached is None:
+            return None
+        try:
+            return json.loads(cached[0])
+        except ValueError:
+            return None
+
+    def put_stream(self, key: str, model: str, chunks: List[str]) -> None:
+        self._put(key, model, "stream", json.dumps(chunks, ensure_ascii=False), 0)
+
+    def clear(self) -> None:
+        """Briše ceo keš."""
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM responses")
+            finally:
+                conn.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,436 @@
+"""
+LLM Scheduler - Raspoređivač poziva ka LLM provajderima.
+Za svaki model drži red čekanja sa pravednim (round-robin) opsluživanjem HTTP sesija,
+ograničenje paralelnih poziva i token bucket-e za zahteve i tokene u minuti (RPM/TPM).
+Posle 429 odgovora ceo model se pauzira (eksponencijalni backoff sa jitter-om), pa
+agenti koji dele isti model ne troše pokušaje jedan za drugim.
+
+Limiti se zadaju u LLM_RATE_LIMITS kao 'ključ=rpm:tpm' odvojeno zarezom, gde je ključ
+model ('gemini/gemini-3-flash-preview') ili provajder ('gemini'); 0 = bez limita:
+    LLM_RATE_LIMITS=gemini=15:1000000,openai/gpt-4o-mini=500:200000
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from core.log import get_logger
+from core.metrics import LLM_RATE_LIMITED, metrics
+
+log = get_logger("LLMScheduler")
+
+
+class QueueTimeoutError(TimeoutError):
+    """Zahtev je čekao u redu modela duže od queue_timeout."""
+
+
+class TokenBucket:
+    """
+    Bucket sa kapacitetom po minuti. Potrošeni tokeni se vraćaju tačno 60 s posle upotrebe
+    (klizni prozor, kako provajderi broje RPM/TPM) - pun bucket na startu zato ne pušta
+    dvostruki limit u prvom minutu, kao kod ravnomernog dopunjavanja.
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.used = 0.0
+        # [vreme, količina, aktivan] - lista da bi se procena kasnije ispravila na licu mesta
+        self._entries: Deque[List[Any]] = deque()
+
+    def _expire(self, now: float) -> None:
+        while self._entries and now - self._entries[0][0] >= self.WINDOW:
+            entry = self._entries.popleft()
+            entry[2] = False
+            self.used -= entry[1]
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Koliko sekundi treba čekati da bi amount bilo dostupno (0 = odmah)."""
+        self._expire(now)
+        excess = self.used + min(amount, self.capacity) - self.capacity
+        if excess <= 0:
+            return 0.0
+        freed = 0.0
+        for at, value, _ in self._entries:
+            freed += value
+            if freed >= excess:
+                return at + self.WINDOW - now
+        return self.WINDOW
+
+    def take(self, amount: float, now: float) -> List[Any]:
+        self._expire(now)
+        entry = [now, min(amount, self.capacity), True]
+        self._entries.append(entry)
+        self.used += entry[1]
+        return entry
+
+    def adjust(self, entry: List[Any], amount: float) -> None:
+        """Ispravka posle poziva: stvarna potrošnja umesto procene (može i preko kapaciteta)."""
+        if entry[2]:
+            self.used += amount - entry[1]
+            entry[1] = amount
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """'gemini=15:1000000,openai/gpt-4o=500:0' -> {'gemini': (15, 1000000), 'openai/gpt-4o': (500, 0)}."""
+    limits = {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        key, sep, value = part.partition("=")
+        rpm, _, tpm = value.partition(":")
+        try:
+            limits[key.strip()] = (int(rpm or 0), int(tpm or 0))
+        except ValueError:
+            log.warning("Neispravan LLM_RATE_LIMITS unos", entry=part)
+    return limits
+
+
+class _Waiter:
+    """Jedan zahtev u redu - budi se preko asyncio future-a ili threading.Event-a."""
+
+    __slots__ = ("session", "tokens", "enqueued", "granted", "cancelled", "entry", "_loop", "_future", "_event")
+
+    def __init__(self, session: str, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.session = session
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+        self.entry: Optional[List[Any]] = None
+        self._loop = loop
+        self._future = loop.create_future() if loop else None
+        self._event = None if loop else threading.Event()
+
+    def grant(self) -> None:
+        self.granted = True
+        if self._future is not None:
+            self._loop.call_soon_threadsafe(self._resolve)
+        else:
+            self._event.set()
+
+    def _resolve(self) -> None:
+        if not self._future.done():
+            self._future.set_result(None)
+
+
+@dataclass
+class _Limits:
+    key: str
+    requests: Optional[TokenBucket]
+    tokens: Optional[TokenBucket]
+    blocked_until: float = 0.0
+    rate_limited: int = 0
+
+
+class _ModelQueue:
+    """Red jednog modela: sesije po redu (round-robin), svaka sa svojim FIFO zahtevima."""
+
+    def __init__(self, model: str, limits: _Limits):
+        self.model = model
+        self.limits = limits
+        self.sessions: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self.active = 0
+        self.queued = 0
+        self.granted = 0
+        self.total_wait = 0.0
+        self.timer: Optional[threading.Timer] = None
+        self.timer_at = 0.0
+
+
+class Lease:
+    """
+    Dozvola za jedan LLM poziv. Posle poziva obavezno release() (oslobađa slot i
+    ispravlja TPM procenu stvarnim brojem tokena).
+
+    Attributes:
+        wait_ms: Ukupno čekanje ovog zahteva u redu (uključujući backoff posle 429).
+        rate_limit_retries: Broj 429 odgovora posle kojih je poziv ponovljen.
+    """
+
+    def __init__(self, scheduler: "LLMScheduler", model: str, entry: Optional[List[Any]], wait_ms: float):
+        self.scheduler = scheduler
+        self.model = model
+        self.entry = entry
+        self.wait_ms = wait_ms
+        self.rate_limit_retries = 0
+        self._released = False
+
+    def release(self, tokens_used: Optional[int] = None) -> None:
+        if self._released:
+            return
+        self._released = True
+        self.scheduler._release(self.model, self.entry, tokens_used)
+
+
+class LLMScheduler:
+    """
+    Raspoređivač LLM poziva po modelu (deljen u procesu, kao execution_pools).
+
+    Attributes:
+        max_concurrency: Najviše paralelnih poziva ka jednom modelu.
+        max_rate_limit_retries: Koliko puta se poziv ponavlja posle 429 (ne troši max_retries orkestratora).
+        backoff_base: Početni backoff posle 429 (sekunde), duplira se po pokušaju.
+        backoff_cap: Najduži backoff (sekunde).
+        queue_timeout: Najduže čekanje u redu pre QueueTimeoutError (sekunde, 0 = bez limita).
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, int]]] = None, max_concurrency: int = 4,
+                 max_rate_limit_retries: int = 6, backoff_base: float = 1.0, backoff_cap: float = 60.0,
+                 queue_timeout: float = 300.0):
+        self.limits = dict(limits or {})
+        self.max_concurrency = max_concurrency
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._buckets: Dict[str, _Limits] = {}
+
+    # ------------------------------------------------------------------
+    # Redovi i limiti
+    # ------------------------------------------------------------------
+
+    def _limit_key(self, model: str) -> str:
+        if model in self.limits:
+            return model
+        provider = model.split("/", 1)[0] if "/" in model else model
+        return provider if provider in self.limits else model
+
+    def _queue(self, model: str) -> _ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            # Provajderski limit (npr. 'gemini') dele svi modeli tog provajdera
+            key = self._limit_key(model)
+            limits = self._buckets.get(key)
+            if limits is None:
+                rpm, tpm = self.limits.get(key, (0, 0))
+                limits = self._buckets[key] = _Limits(
+                    key, TokenBucket(rpm) if rpm > 0 else None, TokenBucket(tpm) if tpm > 0 else None)
+            queue = self._queues[model] = _ModelQueue(model, limits)
+        return queue
+
+    def _dispatch_locked(self, queue: _ModelQueue) -> None:
+        """Pušta zahteve dok ima slobodnih slotova i kapaciteta u bucket-ima."""
+        limits = queue.limits
+        while queue.sessions and queue.active < self.max_concurrency:
+            session, waiters = next(iter(queue.sessions.items()))
+            waiter = waiters[0]
+            if waiter.cancelled:
+                waiters.popleft()
+                queue.queued -= 1
+                if not waiters:
+                    del queue.sessions[session]
+                continue
+
+            now = time.monotonic()
+            wait = max(0.0, limits.blocked_until - now)
+            if limits.requests:
+                wait = max(wait, limits.requests.wait_time(1, now))
+            if limits.tokens:
+                wait = max(wait, limits.tokens.wait_time(waiter.tokens, now))
+            if wait > 0:
+                self._schedule_locked(queue, wait)
+                return
+
+            if limits.requests:
+                limits.requests.take(1, now)
+            if limits.tokens:
+                waiter.entry = limits.tokens.take(waiter.tokens, now)
+            waiters.popleft()
+            queue.queued -= 1
+            # Sesija ide na kraj reda - sledeći zahtev dobija druga sesija
+            queue.sessions.move_to_end(session)
+            if not waiters:
+                del queue.sessions[session]
+            queue.active += 1
+            queue.granted += 1
+            queue.total_wait += now - waiter.enqueued
+            waiter.grant()
+
+    def _schedule_locked(self, queue: _ModelQueue, delay: float) -> None:
+        due = time.monotonic() + delay
+        if queue.timer is not None and queue.timer_at <= due:
+            return
+        if queue.timer is not None:
+            queue.timer.cancel()
+        queue.timer = threading.Timer(delay, self._on_timer, args=(queue,))
+        queue.timer.daemon = True
+        queue.timer_at = due
+        queue.timer.start()
+
+    def _on_timer(self, queue: _ModelQueue) -> None:
+        with self._lock:
+            queue.timer = None
+            self._dispatch_locked(queue)
+
+    def _enqueue(self, model: str, waiter: _Waiter) -> _ModelQueue:
+        with self._lock:
+            queue = self._queue(model)
+            queue.sessions.setdefault(waiter.session, deque()).append(waiter)
+            queue.queued += 1
+            self._dispatch_locked(queue)
+            return queue
+
+    def _cancel(self, model: str, waiter: _Waiter) -> None:
+        with self._lock:
+            queue = self._queue(model)
+            if waiter.granted:
+                # Dozvola je stigla u istom trenutku kada je zahtev otkazan
+                queue.active -= 1
+            else:
+                waiter.cancelled = True
+                # Odmah iz reda - zahtevi koji ističu dok je model blokiran ne gomilaju se u redu
+                waiters = queue.sessions.get(waiter.session)
+                if waiters and waiter in waiters:
+                    waiters.remove(waiter)
+                    queue.queued -= 1
+                    if not waiters:
+                        del queue.sessions[waiter.session]
+            self._dispatch_locked(queue)
+
+    def _release(self, model: str, entry: Optional[List[Any]], tokens_used: Optional[int]) -> None:
+        with self._lock:
+            queue = self._queue(model)
+            queue.active -= 1
+            if tokens_used is not None and entry is not None and queue.limits.tokens:
+                queue.limits.tokens.adjust(entry, tokens_used)
+            self._dispatch_locked(queue)
+
+    # ------------------------------------------------------------------
+    # Javni API
+    # ------------------------------------------------------------------
+
+    def _timeout_error(self, model: str) -> QueueTimeoutError:
+        return QueueTimeoutError(f"Model {model} nije dostupan posle {self.queue_timeout:g} s čekanja u redu")
+
+    async def acquire(self, model: str, session: str, tokens: int = 0) -> Lease:
+        """
+        Čeka na red (async) i vraća Lease; otkazivanje uklanja zahtev iz reda.
+
+        Raises:
+            QueueTimeoutError: Ako dozvola ne stigne za queue_timeout sekundi.
+        """
+        waiter = _Waiter(session, tokens, asyncio.get_running_loop())
+        self._enqueue(model, waiter)
+        try:
+            await asyncio.wait_for(waiter._future, self.queue_timeout or None)
+        except asyncio.TimeoutError:
+            self._cancel(model, waiter)
+            raise self._timeout_error(model) from None
+        except asyncio.CancelledError:
+            self._cancel(model, waiter)
+            raise
+        return Lease(self, model, waiter.entry, (time.monotonic() - waiter.enqueued) * 1000)
+
+    def acquire_sync(self, model: str, session: str, tokens: int = 0) -> Lease:
+        """Isto kao acquire, za sinhrone pozive iz 'llm' pool-a."""
+        waiter = _Waiter(session, tokens)
+        self._enqueue(model, waiter)
+        if not waiter._event.wait(self.queue_timeout or None):
+            # _cancel pod lock-om razrešava i dozvolu koja je stigla baš posle isteka
+            self._cancel(model, waiter)
+            raise self._timeout_error(model)
+        return Lease(self, model, waiter.entry, (time.monotonic() - waiter.enqueued) * 1000)
+
+    def backoff(self, model: str, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        Beleži 429 za model i vraća koliko čekati pre ponovnog pokušaja.
+        Ceo model (i provajder, ako je limit provajderski) se pauzira do isteka backoff-a,
+        pa ostali zahtevi ne udaraju u isti limit.
+        """
+        delay = min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+        # Jitter: razbija sinhronizovane pokušaje više agenata
+        delay = random.uniform(delay / 2, delay)
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_cap))
+        with self._lock:
+            limits = self._queue(model).limits
+            limits.blocked_until = max(limits.blocked_until, time.monotonic() + delay)
+            limits.rate_limited += 1
+        LLM_RATE_LIMITED.inc(model=model)
+        log.warning("Provajder vratio 429, backoff", model=model, attempt=attempt + 1, delay_s=round(delay, 2))
+        return delay
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            now = time.monotonic()
+            result = {}
+            for model, queue in self._queues.items():
+                limits = queue.limits
+                rpm, tpm = self.limits.get(limits.key, (0, 0))
+                result[model] = {
+                    "limit_key": limits.key,
+                    "rpm": rpm,
+                    "tpm": tpm,
+                    "max_concurrency": self.max_concurrency,
+                    "active": queue.active,
+                    "queued": queue.queued,
+                    "sessions": len(queue.sessions),
+                    "granted": queue.granted,
+                    "rate_limited": limits.rate_limited,
+                    "blocked_for_s": round(max(0.0, limits.blocked_until - now), 2),
+                    "avg_wait_ms": round(queue.total_wait / queue.granted * 1000, 2) if queue.granted else 0.0,
+                }
+            return result
+
+
+def _retry_after(error: Optional[BaseException]) -> Optional[float]:
+    """Retry-After iz odgovora provajdera (ako ga litellm izuzetak nosi)."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], completion: Optional[int] = None) -> int:
+    """Procena tokena za TPM bucket: ~4 karaktera po tokenu + očekivan odgovor."""
+    length = 0
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            length += sum(len(part.get("text", "")) for part in content if isinstance(part, dict))
+        else:
+            length += len(str(content))
+    if completion is None:
+        completion = int(os.getenv('LLM_EXPECTED_COMPLETION_TOKENS', 1024))
+    return length // 4 + completion
+
+
+# SR: Deljeni raspoređivač za ceo proces - limiti provajdera važe po API ključu, ne po orkestratoru
+llm_scheduler = LLMScheduler(
+    limits=parse_limits(os.getenv('LLM_RATE_LIMITS', '')),
+    max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY_PER_MODEL', 4)),
+    max_rate_limit_retries=int(os.getenv('LLM_RATE_LIMIT_MAX_RETRIES', 6)),
+    backoff_base=float(os.getenv('LLM_BACKOFF_BASE', 1.0)),
+    backoff_cap=float(os.getenv('LLM_BACKOFF_CAP', 60.0)),
+    queue_timeout=float(os.getenv('LLM_QUEUE_TIMEOUT', 300.0)),
+)
+
+
+def _scheduler_collector() -> List[str]:
+    """Stanje redova po modelu kao gauge-ovi (čita se samo pri /metrics)."""
+    stats = llm_scheduler.stats()
+    lines = []
+    for field, documentation in (("queued", "LLM zahtevi koji čekaju u redu modela"),
+                                 ("active", "LLM pozivi u toku po modelu")):
+        name = f"factory_llm_scheduler_{field}"
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} gauge")
+        for model, values in sorted(stats.items()):
+            lines.append(f'{name}{{model="{model}"}} {values[field]}')
+    return lines
+
+
+metrics.register_collector(_scheduler_collector)
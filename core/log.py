@@ -0,0 +1,189 @@
+"""
+Log - Neblokirajući logger sa nivoima, strukturiranim poljima i uzorkovanjem.
+Pozivajuća nit samo stavlja zapis u red (QueueHandler); formatiranje i pisanje na
+konzolu radi jedna pozadinska nit (QueueListener), pa spora konzola (Windows cmd iz
+StartFactory.bat) ne usporava i ne serijalizuje zahteve.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+_ROOT_NAME = "factory"
+_configured = False
+_config_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _FastQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler koji u pozivajućoj niti ne formatira poruku formatter-om - samo
+    spaja argumente (getMessage) i pretvara izuzetak u tekst, ostalo radi listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _component(record: logging.LogRecord) -> str:
+    """'factory.FileManager' -> 'FileManager'."""
+    prefix = _ROOT_NAME + "."
+    return record.name[len(prefix):] if record.name.startswith(prefix) else record.name
+
+
+class _TextFormatter(logging.Formatter):
+    """'vreme NIVO [Komponenta] poruka ključ=vrednost ...'"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(component)s] %(message)s", datefmt="%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.component = _component(record)
+        fields = getattr(record, "fields", None)
+        if not fields:
+            return super().format(record)
+        # Polja idu uz poruku, pre eventualnog traceback-a
+        message = record.msg
+        record.msg = f"{message} " + " ".join(f"{key}={value}" for key, value in fields.items())
+        try:
+            return super().format(record)
+        finally:
+            record.msg = message
+
+
+class _JsonFormatter(logging.Formatter):
+    """Jedan JSON objekat po liniji (LOG_FORMAT=json) - za mašinsku obradu logova."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": _component(record),
+            "msg": record.getMessage(),
+        }
+        data.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, stream=None) -> None:
+    """
+    Podešava 'factory' logger: QueueHandler u pozivajućim nitima, QueueListener sa
+    StreamHandler-om u pozadini. Poziva se automatski pri prvom get_logger().
+
+    Args:
+        level: Minimalni nivo (LOG_LEVEL, podrazumevano INFO).
+        fmt: 'text' ili 'json' (LOG_FORMAT, podrazumevano text).
+        stream: Izlaz (podrazumevano sys.stdout).
+    """
+    global _configured, _listener
+    with _config_lock:
+        if _listener is not None:
+            _listener.stop()
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        if (fmt or os.getenv("LOG_FORMAT", "text")).lower() == "json":
+            output.setFormatter(_JsonFormatter())
+        else:
+            output.setFormatter(_TextFormatter())
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        root = logging.getLogger(_ROOT_NAME)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_FastQueueHandler(log_queue))
+        root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+        # Zapisi ne idu i u root logger (uvicorn/basicConfig bi ih ispisali drugi put)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+        _listener.start()
+        _configured = True
+
+
+def flush_logging() -> None:
+    """Čeka da pozadinska nit ispiše sve zapise iz reda (gašenje procesa, testovi)."""
+    global _listener
+    with _config_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener.start()
+
+
+def _shutdown() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_shutdown)
+
+
+class FactoryLogger:
+    """
+    Omotač oko logging.Logger-a sa strukturiranim poljima i uzorkovanjem.
+
+    Primer:
+        log = get_logger("FileManager")
+        log.info("Fajl upisan", path="src/app.py")
+        log.debug("Fajl pročitan", sample_every=100, path=rel)   # 1 od 100 zapisa
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._logger = logging.getLogger(f"{_ROOT_NAME}.{name}")
+        self._counters: Dict[str, int] = {}
+
+    def is_enabled_for(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def _log(self, level: int, msg: str, sample_every: int = 1, exc_info: Any = None, **fields) -> None:
+        if not self._logger.isEnabledFor(level):
+            return
+        if sample_every > 1:
+            # Brojač po poruci - bez lock-a; izgubljen inkrement pri trci samo pomera uzorak
+            count = self._counters.get(msg, 0) + 1
+            self._counters[msg] = count
+            if count % sample_every != 1:
+                return
+            fields["sampled"] = f"1/{sample_every}"
+        self._logger.log(level, msg, exc_info=exc_info, extra={"fields": fields} if fields else None)
+
+    def debug(self, msg: str, **fields) -> None:
+        self._log(logging.DEBUG, msg, **fields)
+
+    def info(self, msg: str, **fields) -> None:
+        self._log(logging.INFO, msg, **fields)
+
+    def warning(self, msg: str, **fields) -> None:
+        self._log(logging.WARNING, msg, **fields)
+
+    def error(self, msg: str, **fields) -> None:
+        self._log(logging.ERROR, msg, **fields)
+
+    def exception(self, msg: str, **fields) -> None:
+        self._log(logging.ERROR, msg, exc_info=True, **fields)
+
+
+_loggers: Dict[str, FactoryLogger] = {}
+
+
+def get_logger(name: str) -> FactoryLogger:
+    """Vraća (keširan) logger za komponentu; prvi poziv podešava logovanje."""
+    if not _configured:
+        configure_logging()
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers.setdefault(name, FactoryLogger(name))
+    return logger
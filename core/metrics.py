@@ -0,0 +1,300 @@
+"""
+Metrics - Lagani brojači, histogrami i trace span-ovi za vruće putanje.
+Izlaz je u Prometheus text formatu (GET /metrics), bez spoljnih zavisnosti.
+Kada su metrike isključene (METRICS_ENABLED=0), svaki poziv je jedna provera flag-a.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+# Podrazumevane granice histograma (sekunde) - od pretrage u memoriji do LLM odgovora
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Granice za propusnost (tokena u sekundi)
+RATE_BUCKETS = (1, 5, 10, 20, 40, 60, 80, 100, 150, 200, 300, 500)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _NoopTimer:
+    """Tajmer koji ništa ne meri - vraća se kada su metrike isključene."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class _Timer:
+    __slots__ = ("metric", "labels", "started")
+
+    def __init__(self, metric: "Histogram", labels: Dict[str, Any]):
+        self.metric = metric
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metric.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Brojač koji samo raste (zahtevi, tokeni, greške)."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    """Histogram sa fiksnim granicama (trajanja, tokeni u sekundi)."""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # ključ -> [brojači po granici..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, **labels):
+        """Context manager koji meri trajanje bloka u sekundama."""
+        if not self.registry.enabled:
+            return _NOOP_TIMER
+        return _Timer(self, labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_number(cumulative)}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_number(state[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_number(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_number(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registar metrika procesa.
+
+    Attributes:
+        enabled: Da li se vrednosti beleže (METRICS_ENABLED, podrazumevano uključeno).
+    """
+
+    def __init__(self, enabled: bool = True, trace_buffer: int = 256):
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+        self._lock = threading.Lock()
+        self._spans: Deque[Dict[str, Any]] = deque(maxlen=trace_buffer)
+        self.span_seconds = self.histogram("factory_span_seconds", "Trajanje trace span-ova", ["span"])
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Iterable[str], **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, documentation, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Dodaje funkciju koja pri svakom /metrics vraća gotove linije (npr. gauge-ovi pool-ova)."""
+        self._collectors.append(collector)
+
+    # ------------------------------------------------------------------
+    # Trace span-ovi
+    # ------------------------------------------------------------------
+
+    def span(self, name: str, **fields):
+        """
+        Meri blok koda kao span: trajanje ide u factory_span_seconds{span=name},
+        a poslednjih trace_buffer span-ova (sa poljima) se čuva za /metrics/traces.
+        """
+        if not self.enabled:
+            return _NOOP_TIMER
+        return _Span(self, name, fields)
+
+    def recent_spans(self, limit: int = 100) -> List[Dict[str, Any]]:
+        spans = list(self._spans)
+        return spans[-limit:][::-1]
+
+    # ------------------------------------------------------------------
+    # Izlaz
+    # ------------------------------------------------------------------
+
+    def render(self) -> str:
+        """Sve metrike u Prometheus text formatu (verzija 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                lines.append(f"# collector error: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+
+class _Span:
+    __slots__ = ("registry", "name", "fields", "started")
+
+    def __init__(self, registry: MetricsRegistry, name: str, fields: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def set(self, **fields) -> None:
+        """Dodaje polja span-u (npr. broj fajlova poznat tek na kraju)."""
+        self.fields.update(fields)
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        self.registry.span_seconds.observe(elapsed, span=self.name)
+        record = {"span": self.name, "at": time.time(), "duration_ms": round(elapsed * 1000, 3), **self.fields}
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self.registry._spans.append(record)
+        return False
+
+
+# SR: Deljeni registar za ceo proces
+metrics = MetricsRegistry(enabled=os.getenv('METRICS_ENABLED', '1') != '0')
+
+# ----------------------------------------------------------------------
+# Metrike vrućih putanja
+# ----------------------------------------------------------------------
+
+LLM_REQUESTS = metrics.counter("factory_llm_requests_total", "Broj LLM poziva", ["model", "mode", "status"])
+LLM_LATENCY = metrics.histogram("factory_llm_request_seconds", "Ukupno trajanje LLM poziva", ["model", "mode"])
+LLM_TTFT = metrics.histogram("factory_llm_ttft_seconds", "Vreme do prvog tokena (streaming)", ["model"])
+LLM_QUEUE_WAIT = metrics.histogram("factory_llm_queue_wait_seconds", "Čekanje u redu modela (slot, RPM/TPM, backoff)",
+                                   ["model"])
+LLM_RATE_LIMITED = metrics.counter("factory_llm_rate_limited_total", "Odgovori 429 od provajdera", ["model"])
+LLM_TOKENS = metrics.counter("factory_llm_tokens_total", "Potrošeni tokeni", ["model"])
+LLM_TOKENS_PER_SECOND = metrics.histogram("factory_llm_tokens_per_second", "Propusnost generisanja",
+                                          ["model"], buckets=RATE_BUCKETS)
+
+SENTINEL_SCAN = metrics.histogram("factory_sentinel_scan_seconds", "Trajanje Sentinel skeniranja", ["engine"])
+FILE_WALK = metrics.histogram("factory_file_walk_seconds", "Trajanje prolaza kroz stablo fajlova", ["source"])
+SUBPROCESS = metrics.histogram("factory_subprocess_seconds", "Trajanje git/pip/npm procesa", ["tool", "command"])
+SUBPROCESS_FAILURES = metrics.counter("factory_subprocess_failures_total", "Neuspeli git/pip/npm procesi",
+                                      ["tool", "command"])
+HISTORY_BACKUP = metrics.histogram("factory_history_backup_seconds", "Trajanje snimanja istorije", ["operation"])
+
+
+def _pool_collector() -> List[str]:
+    """Stanje execution pool-ova kao gauge-ovi (čita se samo pri /metrics)."""
+    from core.executor import execution_pools
+
+    stats = execution_pools.stats()
+    lines = []
+    for field, kind, documentation in (
+        ("queued", "gauge", "Poslovi koji čekaju u pool-u"),
+        ("active", "gauge", "Poslovi koji se izvršavaju u pool-u"),
+        ("completed", "counter", "Završeni poslovi po pool-u"),
+        ("failed", "counter", "Neuspeli poslovi po pool-u"),
+        ("rejected", "counter", "Odbijeni poslovi (pun red) po pool-u"),
+    ):
+        name = f"factory_pool_{field}" + ("_total" if kind == "counter" else "")
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} {kind}")
+        for pool, values in sorted(stats.items()):
+            lines.append(f'{name}{{pool="{pool}"}} {values[field]}')
+    return lines
+
+
+metrics.register_collector(_pool_collector)
@@ -9,6 +9,9 @@ from dotenv import load_dotenv
 import litellm
 import json
 import asyncio
+import hashlib
+import time
+import uuid
 
 # Set debug before other operations if needed
 litellm.set_debug = True
@@ -17,6 +20,15 @@ from core.sentinel import SecuritySentinel, SecurityThreat
 from tools.file_manager import FileManager, SecurityError
 from tools.history_manager import HistoryManager
 from core.agent_manager import AgentManager, Agent
+from core.llm_cache import LLMResponseCache
+from core.llm_scheduler import estimate_tokens, llm_scheduler
+from core.stream_parser import StreamParser
+from core.stub_llm import register_stub_provider
+from core.context_builder import ProjectContextBuilder
+from core.executor import PoolFullError, execution_pools, run_blocking
+from core.log import get_logger
+from core.metrics import (LLM_LATENCY, LLM_QUEUE_WAIT, LLM_REQUESTS, LLM_TOKENS, LLM_TOKENS_PER_SECOND,
+                          LLM_TTFT, metrics)
 from tools.package_manager import PackageManager
 from tools.git_manager import GitManager
 from tools.supabase_manager import SupabaseManager
@@ -24,6 +36,11 @@ from tools.supabase_manager import SupabaseManager
 # Učitaj environment varijable
 load_dotenv()
 
+log = get_logger("Orchestrator")
+
+# SR: Lokalni 'stub/...' modeli za load testove bez mreže (core/stub_llm.py)
+register_stub_provider()
+
 # Eksplicitno postavi Gemini API ključ i konfiguraciju
 google_api_key = os.getenv('GOOGLE_API_KEY')
 if google_api_key:
@@ -32,7 +49,7 @@ if google_api_key:
     
     # Konfiguracija litellm za bolju Gemini stabilnost
     litellm.drop_params = True
-    print(f"[Environment] Gemini/Google konfiguracija učitana")
+    get_logger("Environment").info("Gemini/Google konfiguracija učitana")
 
 
 class SecureOrchestrator:
@@ -47,21 +64,40 @@ class SecureOrchestrator:
         """
         self.file_manager = FileManager(project_dir)
         self.sentinel = SecuritySentinel()
-        self.history_manager = HistoryManager(self.file_manager.BASE_DIR)
+        # SR: Istorija deli korene i obaveštavanje o promenama sa FileManager-om
+        self.history_manager = HistoryManager(self.file_manager.BASE_DIR,
+                                              root_trie=self.file_manager._root_trie,
+                                              on_change=self.file_manager._notify_change)
         self.agent_manager = AgentManager(self.file_manager.BASE_DIR)
         self.package_manager = PackageManager(str(self.file_manager.BASE_DIR))
         self.git_manager = GitManager(str(self.file_manager.BASE_DIR))
+        # SR: Globalni kontekst se gradi ponovo samo kad se stablo ili ključni fajlovi promene
+        self.context_builder = ProjectContextBuilder(
+            self.file_manager,
+            token_budget=int(os.getenv('CONTEXT_TOKEN_BUDGET', 6000))
+        )
         self.supabase_manager = SupabaseManager()
         self.max_retries = max_retries
         self.total_tokens_used = 0
         
+        # SR: Keš identičnih LLM upita (TTL + LRU) u .agent/llm_cache.sqlite
+        self.llm_cache = LLMResponseCache(
+            self.file_manager.BASE_DIR / ".agent" / "llm_cache.sqlite",
+            ttl_seconds=int(os.getenv('LLM_CACHE_TTL', 24 * 3600)),
+            max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', 500)),
+            enabled=os.getenv('LLM_CACHE_ENABLED', '1') != '0'
+        )
+        
+        # SR: Red po modelu (paralelni pozivi, RPM/TPM, backoff posle 429) i veličina reda događaja po zahtevu
+        self.llm_scheduler = llm_scheduler
+        self.stream_queue_size = int(os.getenv('STREAM_QUEUE_SIZE', 256))
+        
         # Podrazumevani model (može se promeniti)
         self.model = os.getenv('DEFAULT_LLM_MODEL', 'gemini/gemini-3-flash-preview')
         self.api_key = os.getenv("GOOGLE_API_KEY")
         
-        print(f"[Orchestrator] Inicijalizovan sa modelom: {self.model}")
-        print(f"[Orchestrator] Radni direktorijum: {self.file_manager.BASE_DIR}")
-        print(f"[Orchestrator] Učitano {len(self.agent_manager.agents)} agenata.")
+        log.info("Inicijalizovan", model=self.model, project_dir=self.file_manager.BASE_DIR,
+                 agents=len(self.agent_manager.agents))
     
     async def async_stream_code_generation(self, prompt, filename, attachments=None, agent_ids=None, model=None, mode="Planning"):
         """
@@ -73,7 +109,7 @@ class SecureOrchestrator:
         ctx_header = f"Mod: {mode}\n"
         if is_global:
             ctx_header += "Cilj: GLOBALNI PREGLED PROJEKTA (Nije selektovan nijedan fajl)\n"
-            global_ctx = self._gather_project_context()
+            global_ctx = await run_blocking('io', self._gather_project_context)
             ctx_header += f"\n{global_ctx}\n"
         else:
             ctx_header += f"Ciljani fajl: {filename}\n"
@@ -101,9 +137,15 @@ class SecureOrchestrator:
             # Fallback na default agenta
             agents_to_use = [self.agent_manager.agents[0]] if self.agent_manager.agents else [Agent(name="AI Agent", role="Expert Developer", model=self.model, id="default")]
             
-        queue = asyncio.Queue()
+        # Ograničen red - spor klijent usporava agente umesto da red raste bez granice
+        queue = asyncio.Queue(maxsize=self.stream_queue_size)
+        # Svi agenti jednog zahteva su jedna sesija u redu modela (pravedno prema drugim zahtevima)
+        session_id = uuid.uuid4().hex
 
         async def produce(agent: Agent):
+            cancelled = False
+            # preview = (blok, zadatak skeniranja) za prvi blok koda
+            state = {"preview": None, "tool_block": None}
             try:
                 system_prompt = agent.role
                 if is_global:
@@ -137,128 +179,272 @@ Primer: <tool_code>{"name": "git_push", "args": {"remote": "origin", "branch": "
                 messages = [{"role": "system", "content": system_prompt}]
                 messages.append({"role": "user", "content": user_content})
 
-                response = await litellm.acompletion(
-                    model=agent.model,
-                    messages=messages,
-                    temperature=0.3,
-                    stream=True
-                )
+                cache_key = self.llm_cache.make_key(agent.model, messages, temperature=0.3, stream=True)
+                try:
+                    # SQLite keš van event loop-a - paralelni streamovi se ne serijalizuju na disku
+                    cached_chunks = await run_blocking('io', self.llm_cache.get_stream, cache_key)
+                except PoolFullError:
+                    cached_chunks = None
                 
-                full_content_accumulator = ""
-                async for chunk in response:
-                    if chunk and chunk.choices and chunk.choices[0].delta.content:
-                        content = chunk.choices[0].delta.content
-                        full_content_accumulator += content
+                chunks = []
+                parser = StreamParser()
+                started = time.perf_counter()
+                first_token_at = None
+                wait_ms = 0.0
+                rate_limit_retries = 0
+                completion_tokens = None
+
+                async def emit(content: str):
+                    chunks.append(content)
+                    await queue.put({
+                        "type": "chunk",
+                        "agent_id": agent.id,
+                        "agent_name": agent.name,
+                        "agent_color": agent.color,
+                        "content": content
+                    })
+                    # Blokovi se obrađuju čim se zatvore, ne posle kraja streama
+                    for block in parser.feed(content):
+                        if block.kind == 'tool':
+                            if state["tool_block"] is None:
+                                state["tool_block"] = block
+                            continue
+                        if state["preview"] is not None or not block.content:
+                            continue
+                        # Skeniranje počinje čim se blok zatvori i teče uz ostatak streama, van event loop-a
+                        state["preview"] = (block, asyncio.ensure_future(self._scan_block(block)))
+
+                if cached_chunks is not None:
+                    # Keš pogodak - reprodukujemo istu sekvencu chunk-ova bez poziva provajdera
+                    for content in cached_chunks:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        await emit(content)
+                else:
+                    # Red modela: slot, RPM/TPM bucket-i i backoff posle 429 (van max_retries)
+                    response, lease = await self._open_stream(agent.model, messages, session_id)
+                    wait_ms = lease.wait_ms
+                    rate_limit_retries = lease.rate_limit_retries
+                    try:
+                        async for chunk in response:
+                            usage = getattr(chunk, "usage", None)
+                            if usage and getattr(usage, "completion_tokens", None):
+                                completion_tokens = usage.completion_tokens
+                            if chunk and chunk.choices and chunk.choices[0].delta.content:
+                                content = chunk.choices[0].delta.content
+                                if first_token_at is None:
+                                    first_token_at = time.perf_counter()
+                                await emit(content)
+                    finally:
+                        try:
+                            # Zatvori HTTP stream ka provajderu i kada je klijent otkazao zahtev
+                            aclose = getattr(response, "aclose", None)
+                            if aclose:
+                                try:
+                                    await aclose()
+                                except Exception:
+                                    pass
+                        finally:
+                            used = completion_tokens if completion_tokens is not None else sum(len(c) for c in chunks) // 4
+                            lease.release(estimate_tokens(messages, completion=used))
+                    if chunks:
+                        try:
+                            await run_blocking('io', self.llm_cache.put_stream, cache_key, agent.model, chunks)
+                        except PoolFullError:
+                            log.warning("Odgovor nije keširan - io pool je pun", model=agent.model)
+                
+                if state["preview"] is not None:
+                    # Preview ide posle kraja odgovora - objašnjenje je ceo tekst bez bloka koda (i tekst posle njega)
+                    block, scan = state["preview"]
+                    is_safe, threats = await scan
+                    if is_safe:
+                        full_text = "".join(chunks)
+                        await queue.put({
+                            "type": "preview",
+                            "agent_id": agent.id,
+                            "code": block.content,
+                            "filename": filename if not is_global else "generated_suggestion.py",
+                            "explanation": full_text.replace(block.raw, "", 1).strip()
+                                           if block.raw in full_text else parser.text
+                        })
+                    else:
+                        await queue.put({
+                            "type": "security_warning",
+                            "agent_id": agent.id,
+                            "threats": [t.description for t in threats]
+                        })
+
+                await queue.put(self._stream_metrics_event(
+                    agent, started, first_token_at, wait_ms, chunks,
+                    completion_tokens, cached=cached_chunks is not None,
+                    rate_limit_retries=rate_limit_retries
+                ))
+
+                # Tool call prepoznat tokom streama - izvršava se tek kada je odgovor kompletan
+                tool_block = state["tool_block"]
+                if tool_block is not None and tool_block.content.startswith("{"):
+                    try:
+                        tool_json = json.loads(tool_block.content)
+                        tool_name = tool_json.get("name")
+                        tool_args = tool_json.get("args", {})
+                        
+                        # Obavesti korisnika da se izvršava
                         await queue.put({
                             "type": "chunk",
                             "agent_id": agent.id,
-                            "agent_name": agent.name,
-                            "agent_color": agent.color,
-                            "content": content
+                            "agent_name": "System",
+                            "agent_color": "gray",
+                            "content": f"\n\n> ⚙️ **Izvršavam akciju:** `{tool_name}`...\n"
+                        })
+                        
+                        # Izvrši akciju (van event loop-a, u pool-u za tu vrstu alata)
+                        result = await run_blocking(self._tool_pool(tool_name), self._execute_tool_action, tool_name, tool_args)
+                        
+                        await queue.put({
+                            "type": "chunk",
+                            "agent_id": agent.id,
+                            "agent_name": "System",
+                            "agent_color": "gray",
+                            "content": f"> ✅ **Rezultat:** {result}\n"
+                        })
+                        
+                    except Exception as e:
+                        await queue.put({
+                            "type": "chunk",
+                            "agent_id": agent.id,
+                            "agent_name": "System",
+                            "agent_color": "red",
+                            "content": f"\n> ❌ **Greška pri izvršavanju alata:** {str(e)}\n"
                         })
-                
-                # Provera koda za preview
-                import re
-                if "```" in full_content_accumulator:
-                    code_match = re.search(r"```(?:\w+)?\n([\s\S]*?)```", full_content_accumulator)
-                    if code_match:
-                         code = code_match.group(1).strip()
-                         is_safe, _ = self.sentinel.scan_code(code)
-                         if is_safe:
-                             await queue.put({
-                                 "type": "preview",
-                                 "agent_id": agent.id,
-                                 "code": code,
-                                 "filename": filename if not is_global else "generated_suggestion.py",
-                                 "explanation": full_content_accumulator.replace(code_match.group(0), "").strip()
-                             })
-
-                # Provera Tool call-a
-                if "<tool_code>" in full_content_accumulator:
-                    tool_match = re.search(r"<tool_code>\s*({.*?})\s*</tool_code>", full_content_accumulator, re.DOTALL)
-                    if tool_match:
-                        try:
-                            tool_json = json.loads(tool_match.group(1))
-                            tool_name = tool_json.get("name")
-                            tool_args = tool_json.get("args", {})
-                            
-                            # Obavesti korisnika da se izvršava
-                            await queue.put({
-                                "type": "chunk",
-                                "agent_id": agent.id,
-                                "agent_name": "System",
-                                "agent_color": "gray",
-                                "content": f"\n\n> ⚙️ **Izvršavam akciju:** `{tool_name}`...\n"
-                            })
-                            
-                            # Izvrši akciju
-                            result = self._execute_tool_action(tool_name, tool_args)
-                            
-                            await queue.put({
-                                "type": "chunk",
-                                "agent_id": agent.id,
-                                "agent_name": "System",
-                                "agent_color": "gray",
-                                "content": f"> ✅ **Rezultat:** {result}\n"
-                            })
-                            
-                        except Exception as e:
-                            await queue.put({
-                                "type": "chunk",
-                                "agent_id": agent.id,
-                                "agent_name": "System",
-                                "agent_color": "red",
-                                "content": f"\n> ❌ **Greška pri izvršavanju alata:** {str(e)}\n"
-                            })
 
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
             except Exception as e:
-                print(f"Agent {agent.name} error: {e}")
+                LLM_REQUESTS.inc(model=agent.model, mode='stream', status='error')
+                log.error("Greška agenta", agent=agent.name, model=agent.model, error=e)
                 await queue.put({"type": "error", "agent_id": agent.id, "content": str(e)})
             finally:
-                await queue.put(None)
+                if state["preview"] is not None and not state["preview"][1].done():
+                    state["preview"][1].cancel()
+                # Kod otkazivanja niko više ne čita red - ne čekamo na slobodno mesto
+                if not cancelled:
+                    await queue.put(None)
 
         # Pokreni taskove
-        for agent in agents_to_use:
-            asyncio.create_task(produce(agent))
+        tasks = [asyncio.create_task(produce(agent)) for agent in agents_to_use]
+        
+        try:
+            # Consumer petlja
+            finished_agents = 0
+            while finished_agents < len(agents_to_use):
+                item = await queue.get()
+                if item is None:
+                    finished_agents += 1
+                    continue
+                yield json.dumps(item) + "\n"
             
-        # Consumer petlja
-        finished_agents = 0
-        while finished_agents < len(agents_to_use):
-            item = await queue.get()
-            if item is None:
-                finished_agents += 1
+            # Kraj
+            yield json.dumps({"type": "done"}) + "\n"
+        finally:
+            # Klijent se diskonektovao (ili je generator zatvoren) - otkaži agente koji još rade
+            pending = [t for t in tasks if not t.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _open_stream(self, model: str, messages: List[Dict[str, Any]], session_id: str):
+        """
+        Otvara stream ka provajderu kroz red modela.
+        429 (RateLimitError) pauzira model i ponavlja poziv sa backoff-om - ne troši max_retries.
+
+        Returns:
+            (response, lease) - lease.release() se poziva kada se stream zatvori.
+        """
+        tokens = estimate_tokens(messages)
+        waited_ms = 0.0
+        attempt = 0
+        while True:
+            lease = await self.llm_scheduler.acquire(model, session_id, tokens)
+            waited_ms += lease.wait_ms
+            try:
+                response = await litellm.acompletion(
+                    model=model,
+                    messages=messages,
+                    temperature=0.3,
+                    stream=True
+                )
+            except litellm.RateLimitError as e:
+                lease.release(0)
+                if attempt >= self.llm_scheduler.max_rate_limit_retries:
+                    raise
+                # Sledeći acquire čeka u redu dok backoff modela ne istekne
+                self.llm_scheduler.backoff(model, attempt, e)
+                attempt += 1
                 continue
-            yield json.dumps(item) + "\n"
-        
-        # Kraj
-        yield json.dumps({"type": "done"}) + "\n"
+            except BaseException:
+                lease.release(0)
+                raise
+            lease.wait_ms = waited_ms
+            lease.rate_limit_retries = attempt
+            return response, lease
+
+    async def _scan_block(self, block) -> tuple:
+        """
+        Skenira blok koda iz streama u procesnom 'cpu' pool-u (kada je pun, u 'io' niti),
+        tako da AST+regex skeniranje velikog bloka ne zaustavlja ostale streamove.
+        """
+        from core.project_audit import scan_one
+
+        try:
+            return await run_blocking('cpu', scan_one, block.content, block.language)
+        except PoolFullError:
+            return await run_blocking('io', self.sentinel.scan_code, block.content, block.language)
+
+    @staticmethod
+    def _stream_metrics_event(agent: Agent, started: float, first_token_at: Optional[float], wait_ms: float,
+                              chunks: List[str], completion_tokens: Optional[int], cached: bool,
+                              rate_limit_retries: int = 0) -> Dict[str, Any]:
+        """Pravi NDJSON događaj sa TTFT i brzinom generisanja za jednog agenta."""
+        finished = time.perf_counter()
+        estimated = completion_tokens is None
+        if estimated:
+            # Provajder nije poslao usage - gruba procena (~4 karaktera po tokenu)
+            length = sum(len(c) for c in chunks)
+            completion_tokens = max(1, length // 4) if length else 0
+        generation_s = finished - (first_token_at or finished)
+        if metrics.enabled and not cached:
+            # Keš pogoci se ne mešaju sa stvarnim latencijama provajdera
+            LLM_REQUESTS.inc(model=agent.model, mode='stream', status='ok')
+            LLM_LATENCY.observe(finished - started, model=agent.model, mode='stream')
+            LLM_QUEUE_WAIT.observe(wait_ms / 1000, model=agent.model)
+            if first_token_at:
+                LLM_TTFT.observe(first_token_at - started, model=agent.model)
+            if generation_s > 0 and completion_tokens:
+                LLM_TOKENS_PER_SECOND.observe(completion_tokens / generation_s, model=agent.model)
+            LLM_TOKENS.inc(completion_tokens, model=agent.model)
+        return {
+            "type": "metrics",
+            "agent_id": agent.id,
+            "model": agent.model,
+            "cached": cached,
+            "queue_wait_ms": round(wait_ms, 1),
+            "rate_limit_retries": rate_limit_retries,
+            "ttft_ms": round((first_token_at - started) * 1000, 1) if first_token_at else None,
+            "total_ms": round((finished - started) * 1000, 1),
+            "completion_tokens": completion_tokens,
+            "tokens_estimated": estimated,
+            "tokens_per_sec": round(completion_tokens / generation_s, 1) if generation_s > 0 else None,
+        }
 
     def _gather_project_context(self) -> str:
-        """Sakuplja globalni kontekst celog projekta."""
+        """Sakuplja globalni kontekst celog projekta (keširano, u okviru budžeta tokena)."""
         try:
-            files = self.file_manager.list_files(max_depth=3)
-            # Normalizujemo putanje
-            structure = "\n".join([f.replace("\\", "/") for f in files])
-            
-            context = f"STRUKTURA PROJEKTA (Prva 3 nivoa):\n{structure}\n\n"
-            
-            # Ključni fajlovi za čitanje (provera u root-u i podfolderima)
-            key_files = ["README.md", "requirements.txt", "api.py", "ui/src/App.jsx", "ui/package.json"]
-            for kf in key_files:
-                try:
-                    content = self.file_manager.safe_read(kf)
-                    context += f"--- SADRŽAJ KLJUČNOG FAJLA: {kf} ---\n{content[:3000]}\n\n"
-                except Exception:
-                    # Pokušaj da nađeš fajl ako je putanja drugačija
-                    base_name = kf.split('/')[-1]
-                    for f in files:
-                        if f.endswith(base_name) and base_name in ["App.jsx", "package.json"]:
-                             try:
-                                 content = self.file_manager.safe_read(f)
-                                 context += f"--- SADRŽAJ KLJUČNOG FAJLA (Pronađen): {f} ---\n{content[:3000]}\n\n"
-                                 break
-                             except: continue
-            return context
+            # /set-project-dir menja samo self.file_manager - builder prati trenutni workspace
+            self.context_builder.bind(self.file_manager)
+            with metrics.span('context.build'):
+                return self.context_builder.build()
         except Exception as e:
             return f"Greška pri sakupljanju konteksta: {e}"
 
@@ -273,12 +459,16 @@ Primer: <tool_code>{"name": "git_push", "args": {"remote": "origin", "branch": "
             'threats': [],
             'attempts': 0,
             'tokens_used': 0,
+            'queue_wait_ms': 0.0,
+            'rate_limit_retries': 0,
             'message': ''
         }
+        # Svi pokušaji jednog zahteva su jedna sesija u redu modela
+        session_id = uuid.uuid4().hex
         
         for attempt in range(1, self.max_retries + 1):
             result['attempts'] = attempt
-            print(f"\n[Orchestrator] Pokušaj {attempt}/{self.max_retries} - Generisanje koda...")
+            log.info("Generisanje koda", attempt=f"{attempt}/{self.max_retries}", filename=filename)
             
             # Slična logika kao async za globalni kontekst
             is_global = not filename or filename in ["N/A", "null", "undefined", "General"]
@@ -290,26 +480,28 @@ Primer: <tool_code>{"name": "git_push", "args": {"remote": "origin", "branch": "
             full_prompt = f"{ctx}\n\nCiljani fajl: {filename}\nZahtev: {prompt}"
             
             try:
-                generated_code, tokens, explanation = self._call_llm(full_prompt, attachments)
+                generated_code, tokens, explanation, wait = self._call_llm(full_prompt, attachments, session_id)
+                result['queue_wait_ms'] += wait['queue_wait_ms']
+                result['rate_limit_retries'] += wait['rate_limit_retries']
                 result['tokens_used'] += tokens
                 self.total_tokens_used += tokens
                 result['message'] = explanation
             except Exception as e:
                 result['message'] = f"Greška pri pozivu LLM-a: {str(e)}"
-                print(f"[Orchestrator] ✗ {result['message']}")
+                log.error(result['message'])
                 continue
             
-            is_safe, threats = self.sentinel.scan_code(generated_code)
+            is_safe, threats = self.sentinel.scan_code(generated_code, self.sentinel.language_from_filename(filename))
             result['threats'] = threats
             
             if is_safe:
                 result['success'] = True
                 result['code'] = generated_code
                 result['preview'] = True
-                print(f"[Orchestrator] ✋ Prikazujem izmene za {filename} (Čeka odobrenje)")
+                log.info("Izmene čekaju odobrenje", filename=filename)
                 return result
             else:
-                print(f"[Orchestrator] ✗ Kod sadrži bezbednosne pretnje!")
+                log.warning("Kod sadrži bezbednosne pretnje", filename=filename, threats=len(threats))
                 if attempt < self.max_retries:
                     prompt = self._create_fix_prompt(prompt, generated_code, threats)
         
@@ -321,27 +513,114 @@ Primer: <tool_code>{"name": "git_push", "args": {"remote": "origin", "branch": "
         Ručno čuva fajl nakon odobrenja korisnika.
         """
         try:
-            is_safe, threats = self.sentinel.scan_code(content)
+            is_safe, threats = self.sentinel.scan_code(content, self.sentinel.language_from_filename(filename))
             if not is_safe:
                 return {'success': False, 'message': 'Bezbednosna provera nije prošla!', 'threats': threats}
 
-            backup_path = self.history_manager.create_backup(filename)
+            backup_version = self.history_manager.create_backup(filename)
             self.file_manager.safe_write(filename, content)
             
             msg = f"Fajl {filename} uspešno sačuvan."
-            if backup_path:
-                msg += f" (Backup: {os.path.basename(backup_path)})"
+            if backup_version:
+                msg += f" (Backup: verzija {backup_version})"
                 
-            print(f"[Orchestrator] ✓ {msg}")
-            return {'success': True, 'message': msg, 'backup': backup_path}
+            log.info(msg)
+            # SR: 'backup' ostaje zbog postojećih klijenata (ranije putanja .bak fajla, sada ista verzija)
+            return {'success': True, 'message': msg, 'backup': backup_version, 'backup_version': backup_version}
         except Exception as e:
             err_msg = f"Greška pri ručnom čuvanju: {str(e)}"
-            print(f"[Orchestrator] ✗ {err_msg}")
+            log.error(err_msg)
             return {'success': False, 'message': err_msg}
     
-    def _call_llm(self, prompt: str, attachments: Optional[List[Dict[str, Any]]] = None) -> tuple[str, int, str]:
+    async def scan_files(self, files: List[tuple]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Skenira više fajlova paralelno u procesnom pool-u 'audit'.
+        Isti sadržaj (npr. dva prazna __init__.py) se skenira jednom.
+
+        Returns:
+            {putanja: lista pretnji kao dict-ovi}
+        """
+        from core.project_audit import BATCH_FILES, scan_batch
+
+        keys = {}
+        batch_items = {}
+        for path, content in files:
+            language = self.sentinel.language_from_filename(path)
+            key = hashlib.sha256(f"{language}\0{content}".encode('utf-8', errors='surrogatepass')).hexdigest()
+            keys[path] = key
+            batch_items.setdefault(key, (key, content, language))
+
+        items = list(batch_items.values())
+        pool = execution_pools.get('audit')
+        parts = await asyncio.gather(*(pool.run(scan_batch, items[i:i + BATCH_FILES])
+                                       for i in range(0, len(items), BATCH_FILES)))
+        found = {key: threats for part in parts for key, threats in part}
+        return {path: found[key] for path, key in keys.items()}
+
+    async def apply_changeset(self, files: List[tuple], message: str = "") -> Dict[str, Any]:
+        """
+        Primenjuje izmenu više fajlova kao jednu celinu: paralelna bezbednosna provera,
+        jedan grupni snapshot u istoriji, pa atomski upis svih fajlova.
+
+        Args:
+            files: Lista (putanja, sadržaj).
+            message: Opis izmene (čuva se uz changeset).
+
+        Returns:
+            {'success', 'message', 'changeset_id', 'files', 'threats'}.
+        """
+        files = list(files)
+        paths = [path for path, _ in files]
+        try:
+            resolved = [self.file_manager._sanitize_path(path) for path in paths]
+        except SecurityError as e:
+            return {'success': False, 'message': str(e)}
+        if len(set(resolved)) != len(resolved):
+            return {'success': False, 'message': 'Isti fajl se pojavljuje više puta u izmeni'}
+
+        with metrics.span('changeset.scan', files=len(files)):
+            threats = await self.scan_files(files)
+        critical = {path: found for path, found in threats.items()
+                    if any(t['severity'] == 'CRITICAL' for t in found)}
+        if critical:
+            return {'success': False, 'message': 'Bezbednosna provera nije prošla!', 'threats': critical}
+
+        with metrics.span('changeset.commit', files=len(files)):
+            result = await run_blocking('io', self._commit_changeset, files, message)
+        result['threats'] = {path: found for path, found in threats.items() if found}
+        return result
+
+    def _commit_changeset(self, files: List[tuple], message: str) -> Dict[str, Any]:
+        paths = [path for path, _ in files]
+        try:
+            changeset_id = self.history_manager.create_snapshot(paths, message)
+        except Exception as e:
+            err_msg = f"Snapshot nije napravljen: {str(e)}"
+            log.error(err_msg)
+            return {'success': False, 'message': err_msg}
+
+        try:
+            self.file_manager.write_many(files)
+        except Exception as e:
+            # Upis je stao - vraćamo sve fajlove na snapshot da stablo ne ostane polovično izmenjeno
+            self.rollback_changeset(changeset_id)
+            err_msg = f"Greška pri upisu izmene: {str(e)}"
+            log.error(err_msg, changeset=changeset_id)
+            return {'success': False, 'message': err_msg}
+
+        msg = f"Izmena primenjena na {len(files)} fajlova (changeset {changeset_id})."
+        log.info(msg)
+        return {'success': True, 'message': msg, 'changeset_id': changeset_id, 'files': paths}
+
+    def rollback_changeset(self, changeset_id: str) -> Dict[str, Any]:
+        """Vraća sve fajlove iz changeset-a na stanje pre izmene."""
+        return self.history_manager.rollback_changeset(changeset_id)
+
+    def _call_llm(self, prompt: str, attachments: Optional[List[Dict[str, Any]]] = None,
+                  session_id: Optional[str] = None) -> tuple[str, int, str, Dict[str, Any]]:
         """
         Poziva LLM (synchronous) - koristi se za generate_and_validate_code.
+        Vraća (kod, tokeni, objašnjenje, {'queue_wait_ms', 'rate_limit_retries'}).
         """
         messages = [
             {
@@ -367,14 +646,59 @@ Primer: <tool_code>{"name": "git_push", "args": {"remote": "origin", "branch": "
         
         messages.append({"role": "user", "content": user_content})
         
-        response = litellm.completion(
-            model=self.model,
-            messages=messages,
-            temperature=0.3
-        )
+        cache_key = self.llm_cache.make_key(self.model, messages, temperature=0.3)
+        cached = self.llm_cache.get_completion(cache_key)
         
-        content = response.choices[0].message.content
-        tokens = response.usage.total_tokens
+        wait = {'queue_wait_ms': 0.0, 'rate_limit_retries': 0}
+        if cached is not None:
+            # Keš pogodak ne troši tokene
+            content, tokens = cached[0], 0
+        else:
+            started = time.perf_counter()
+            estimated = estimate_tokens(messages)
+            attempt = 0
+            while True:
+                lease = self.llm_scheduler.acquire_sync(self.model, session_id or uuid.uuid4().hex, estimated)
+                wait['queue_wait_ms'] += lease.wait_ms
+                try:
+                    response = litellm.completion(
+                        model=self.model,
+                        messages=messages,
+                        temperature=0.3
+                    )
+                except litellm.RateLimitError as e:
+                    lease.release(0)
+                    if attempt >= self.llm_scheduler.max_rate_limit_retries:
+                        LLM_REQUESTS.inc(model=self.model, mode='sync', status='error')
+                        raise
+                    # 429 ne troši max_retries - model se pauzira, a poziv čeka u redu
+                    self.llm_scheduler.backoff(self.model, attempt, e)
+                    attempt += 1
+                    continue
+                except Exception:
+                    lease.release(0)
+                    LLM_REQUESTS.inc(model=self.model, mode='sync', status='error')
+                    raise
+                break
+            
+            tokens = None
+            try:
+                content = response.choices[0].message.content or ""
+                usage = getattr(response, "usage", None)
+                tokens = getattr(usage, "total_tokens", None)
+                if tokens is None:
+                    # Provajder nije vratio usage - procena kao kod streama
+                    tokens = estimate_tokens(messages, completion=len(content) // 4)
+            finally:
+                # Slot se vraća i kada odgovor nema očekivan oblik - inače model ostaje zaključan
+                lease.release(tokens)
+            wait['rate_limit_retries'] = attempt
+            wait['queue_wait_ms'] = round(wait['queue_wait_ms'], 1)
+            LLM_REQUESTS.inc(model=self.model, mode='sync', status='ok')
+            LLM_LATENCY.observe(time.perf_counter() - started, model=self.model, mode='sync')
+            LLM_QUEUE_WAIT.observe(wait['queue_wait_ms'] / 1000, model=self.model)
+            LLM_TOKENS.inc(tokens, model=self.model)
+            self.llm_cache.put_completion(cache_key, self.model, content, tokens)
         
         code = ""
         explanation = content
@@ -386,7 +710,7 @@ Primer: <tool_code>{"name": "git_push", "args": {"remote": "origin", "branch": "
                 code = code_match.group(1).strip()
                 explanation = content.replace(code_match.group(0), "").strip()
         
-        return code, tokens, explanation
+        return code, tokens, explanation, wait
 
     def _create_fix_prompt(self, original_prompt: str, unsafe_code: str, threats: List[SecurityThreat]) -> str:
         threat_descriptions = "\n".join([f"- Linija {t.line_number}: {t.description} ({t.category})" for t in threats if t.severity == 'CRITICAL'])
@@ -403,11 +727,21 @@ INSTRUKCIJE ZA PREPRAVKU:
 3. Generiši ISPRAVAN i BEZBEDAN kod.
 """
     
+    @staticmethod
+    def _tool_pool(tool_name: str) -> str:
+        """Vraća ime execution pool-a za dati alat."""
+        if tool_name.startswith("git_"):
+            return "git"
+        if tool_name in ("npm_install", "pip_install"):
+            return "install"
+        return "io"
+
     def _execute_tool_action(self, tool_name: str, args: Dict[str, Any]) -> str:
         """
         Izvršava specifičan alat na osnovu imena i argumenata.
         """
-        print(f"[Orchestrator] Executing tool: {tool_name} with args: {args}")
+        # Vrednosti argumenata se ne loguju (supabase_connect nosi ključ)
+        log.info("Izvršavam alat", tool=tool_name, args=",".join(sorted(args)) if isinstance(args, dict) else "")
         
         try:
             if tool_name == "git_status":
@@ -436,3 +770,6 @@ INSTRUKCIJE ZA PREPRAVKU:
 
     def get_token_usage(self) -> int:
         return self.total_tokens_used
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        return self.llm_cache.get_stats()
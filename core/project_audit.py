@@ -0,0 +1,259 @@
+"""
+Project Audit - Bezbednosni pregled celog projekta.
+Svi fajlovi iz FileManager.list_files se skeniraju SecuritySentinel-om u procesnom
+pool-u, rezultati se keširaju po hešu sadržaja, a nalazi se šalju kao tok događaja.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from core.executor import execution_pools, run_blocking
+from core.log import get_logger
+from core.sentinel import SecuritySentinel
+
+log = get_logger("ProjectAuditor")
+
+# Fajlovi veći od ovoga se ne skeniraju (generisani bundle-ovi, dump-ovi...)
+MAX_AUDIT_FILE_SIZE = 2 * 1024 * 1024
+
+# SR: Posao za proces se pakuje u serije (do 256 KB ili 64 fajla), da trošak slanja
+# ne pojede dobit, a da opet ima dovoljno serija za sva jezgra
+BATCH_BYTES = 256 * 1024
+BATCH_FILES = 64
+
+_worker_sentinel: Optional[SecuritySentinel] = None
+
+
+def scan_batch(batch: List[Tuple[str, str, Optional[str]]]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Izvršava se u radnom procesu: skenira seriju (heš, sadržaj, jezik).
+
+    Returns:
+        Lista (heš, pretnje kao dict-ovi).
+    """
+    global _worker_sentinel
+    if _worker_sentinel is None:
+        _worker_sentinel = SecuritySentinel()
+    results = []
+    for content_hash, content, language in batch:
+        _, threats = _worker_sentinel.scan_code(content, language)
+        results.append((content_hash, [asdict(t) for t in threats]))
+    return results
+
+
+def scan_one(content: str, language: Optional[str]) -> Tuple[bool, List[Any]]:
+    """Izvršava se u radnom procesu: isto što i SecuritySentinel.scan_code, sa sentinel-om procesa."""
+    global _worker_sentinel
+    if _worker_sentinel is None:
+        _worker_sentinel = SecuritySentinel()
+    return _worker_sentinel.scan_code(content, language)
+
+
+def _rules_fingerprint() -> str:
+    """Otisak pravila - keš se poništava kada se pravila skenera promene."""
+    import core.python_analyzer as analyzer
+    digest = hashlib.sha256()
+    digest.update(json.dumps([SecuritySentinel.CRITICAL_PATTERNS, SecuritySentinel.WARNING_PATTERNS],
+                             sort_keys=True).encode("utf-8"))
+    digest.update(Path(analyzer.__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ProjectAuditor:
+    """
+    Skenira ceo projekat i pamti rezultate.
+
+    Dva nivoa keša: putanja -> (mtime_ns, size, heš) da se nepromenjeni fajlovi ni ne čitaju,
+    i heš sadržaja -> pretnje (u SQLite) da se isti sadržaj nikad ne skenira dvaput.
+    """
+
+    def __init__(self, file_manager, cache_path: Path, pool: str = 'audit'):
+        self.file_manager = file_manager
+        self.cache_path = Path(cache_path)
+        self.pool = pool
+        self.fingerprint = _rules_fingerprint()
+        self._stats: Dict[str, Tuple[int, int, str]] = {}
+        self._results: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._load_cache()
+
+    # ------------------------------------------------------------------
+    # Keš
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.cache_path), timeout=5)
+        conn.execute("CREATE TABLE IF NOT EXISTS results (hash TEXT PRIMARY KEY, fingerprint TEXT, threats TEXT)")
+        return conn
+
+    def _load_cache(self) -> None:
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM results WHERE fingerprint != ?", (self.fingerprint,))
+                self._results = {h: json.loads(t) for h, t in conn.execute("SELECT hash, threats FROM results")}
+            finally:
+                conn.close()
+        except (sqlite3.Error, ValueError) as e:
+            log.warning("Keš nije učitan", path=self.cache_path, error=e)
+            self._results = {}
+
+    def _save_results(self, results: List[Tuple[str, List[Dict[str, Any]]]]) -> None:
+        with self._lock:
+            for content_hash, threats in results:
+                self._results[content_hash] = threats
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO results (hash, fingerprint, threats) VALUES (?, ?, ?)",
+                        [(h, self.fingerprint, json.dumps(t, ensure_ascii=False)) for h, t in results]
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            log.warning("Greška pri upisu keša", path=self.cache_path, error=e)
+
+    # ------------------------------------------------------------------
+    # Planiranje
+    # ------------------------------------------------------------------
+
+    def _plan(self) -> Tuple[List[Tuple[str, str]], List[List[Tuple[str, str, Optional[str]]]], Dict[str, List[str]]]:
+        """
+        Prolazi kroz listu fajlova (blokirajuće - izvršava se u 'io' pool-u).
+
+        Returns:
+            (poznati, serije, čekaju) gde su poznati [(putanja, heš)] sa keširanim rezultatom,
+            serije posao za procese, a čekaju {heš: [putanje]} za fajlove u serijama.
+        """
+        with self._lock:
+            return self._plan_locked()
+
+    def _plan_locked(self) -> Tuple[List[Tuple[str, str]], List[List[Tuple[str, str, Optional[str]]]], Dict[str, List[str]]]:
+        """Telo _plan - poziva se pod lock-om da dva paralelna audita ne dele keš putanja."""
+        known: List[Tuple[str, str]] = []
+        pending: Dict[str, List[str]] = {}
+        batches: List[List[Tuple[str, str, Optional[str]]]] = []
+        batch: List[Tuple[str, str, Optional[str]]] = []
+        batch_size = 0
+        seen = set()
+
+        for rel in self.file_manager.list_files():
+            try:
+                path = self.file_manager._sanitize_path(rel)
+                st = os.stat(path)
+            except Exception:
+                continue
+            if st.st_size > MAX_AUDIT_FILE_SIZE:
+                continue
+            seen.add(rel)
+
+            cached = self._stats.get(rel)
+            if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size and cached[2] in self._results:
+                known.append((rel, cached[2]))
+                continue
+
+            try:
+                data = Path(path).read_bytes()
+            except OSError:
+                continue
+            content_hash = hashlib.sha256(data).hexdigest()
+            self._stats[rel] = (st.st_mtime_ns, st.st_size, content_hash)
+            if content_hash in self._results:
+                known.append((rel, content_hash))
+                continue
+            if content_hash in pending:
+                pending[content_hash].append(rel)
+                continue
+
+            pending[content_hash] = [rel]
+            language = SecuritySentinel.language_from_filename(rel)
+            batch.append((content_hash, data.decode("utf-8", errors="replace"), language))
+            batch_size += len(data)
+            if batch_size >= BATCH_BYTES or len(batch) >= BATCH_FILES:
+                batches.append(batch)
+                batch, batch_size = [], 0
+        if batch:
+            batches.append(batch)
+
+        # Zaboravi fajlove koji više ne postoje
+        for rel in list(self._stats):
+            if rel not in seen:
+                del self._stats[rel]
+        return known, batches, pending
+
+    # ------------------------------------------------------------------
+    # Audit
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _file_event(rel: str, threats: List[Dict[str, Any]], cached: bool) -> Dict[str, Any]:
+        return {
+            "type": "file",
+            "path": rel,
+            "cached": cached,
+            "critical": sum(1 for t in threats if t["severity"] == "CRITICAL"),
+            "threats": threats,
+        }
+
+    async def audit(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async generator događaja: 'start', 'file' (samo fajlovi sa pretnjama), 'progress', 'done'.
+        Prekid čitanja (diskonekcija klijenta) otkazuje serije koje još nisu počele.
+        """
+        started = time.perf_counter()
+        known, batches, pending = await run_blocking('io', self._plan)
+        total = len(known) + sum(len(paths) for paths in pending.values())
+        yield {"type": "start", "files": total, "cached": len(known), "batches": len(batches)}
+
+        scanned = 0
+        threat_count = 0
+        for rel, content_hash in known:
+            threats = self._results.get(content_hash, [])
+            scanned += 1
+            if threats:
+                threat_count += len(threats)
+                yield self._file_event(rel, threats, cached=True)
+
+        pool = execution_pools.get(self.pool)
+        # Klizni prozor - u letu najviše dve serije po radniku, da se red pool-a ne prepuni
+        window = max(1, pool.max_workers * 2)
+        queue = list(batches)
+        running = set()
+        try:
+            while queue or running:
+                while queue and len(running) < window:
+                    running.add(asyncio.ensure_future(pool.run(scan_batch, queue.pop(0))))
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results = task.result()
+                    await run_blocking('io', self._save_results, results)
+                    for content_hash, threats in results:
+                        for rel in pending.get(content_hash, []):
+                            scanned += 1
+                            if threats:
+                                threat_count += len(threats)
+                                yield self._file_event(rel, threats, cached=False)
+                yield {"type": "progress", "scanned": scanned, "total": total}
+        finally:
+            for task in running:
+                task.cancel()
+
+        yield {
+            "type": "done",
+            "files": total,
+            "cached": len(known),
+            "threats": threat_count,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
@@ -0,0 +1,268 @@
+"""
+Python Analyzer - AST analiza Python koda za SecuritySentinel.
+Kod se parsira jednom i stablo obilazi jednom; pravila se proveravaju nad
+čvorovima (pozivi, importi, dodele), pa string literali i komentari ne daju
+lažne pogotke, a višelinijski pozivi se vide kao jedan poziv.
+"""
+
+import ast
+import re
+from typing import Dict, List, Optional, Tuple
+
+# SR: Svaki nalaz nosi tačan regex patern iz SecuritySentinel-a kome odgovara,
+# pa se opis, ozbiljnost i redosled pretnji izvode isto kao kod regex skenera.
+EVAL = r'\beval\s*\('
+EXEC = r'\bexec\s*\('
+COMPILE = r'\bcompile\s*\('
+DUNDER_IMPORT = r'__import__\s*\('
+SQL_PERCENT = r'execute\s*\(\s*["\'].*%s.*["\']'
+SQL_FSTRING = r'execute\s*\(\s*f["\']'
+SQL_CONCAT = r'execute\s*\(\s*.*\+.*\)'
+SQL_FORMAT = r'cursor\.execute\s*\(.*\.format\('
+XSS_INNER_HTML = r'innerHTML\s*='
+XSS_DOCUMENT_WRITE = r'document\.write\s*\('
+XSS_EVAL_REQUEST = r'eval\s*\(\s*.*request'
+OS_SYSTEM = r'\bos\.system\s*\('
+SHELL_CALL = r'\bsubprocess\.call\s*\(.*shell\s*=\s*True'
+SHELL_RUN = r'\bsubprocess\.run\s*\(.*shell\s*=\s*True'
+SHELL_POPEN = r'\bsubprocess\.Popen\s*\(.*shell\s*=\s*True'
+SUDO = r'\bsudo\b'
+SU_ROOT = r'\bsu\s+root'
+SETUID_ROOT = r'os\.setuid\s*\(\s*0\s*\)'
+RUNAS_ADMIN = r'runas\s+/user:administrator'
+PICKLE_LOADS = r'\bpickle\.loads\s*\('
+YAML_LOAD = r'\byaml\.load\s*\('
+MARSHAL_LOADS = r'\bmarshal\.loads\s*\('
+IMPORT_PICKLE = r'import\s+pickle\b'
+FROM_PICKLE = r'from\s+pickle\s+import'
+IMPORT_MARSHAL = r'import\s+marshal\b'
+REQUESTS_NO_VERIFY = r'requests\.get\s*\(.*verify\s*=\s*False'
+URLOPEN = r'urllib\.request\.urlopen\s*\('
+OPEN_WRITE = r'open\s*\(.*["\']w["\']'
+OS_REMOVE = r'os\.remove\s*\('
+RMTREE = r'shutil\.rmtree\s*\('
+
+# Pozivi koji se prepoznaju po punom (razrešenom) imenu
+CALL_RULES = {
+    'eval': ('CODE_EXECUTION', EVAL),
+    'builtins.eval': ('CODE_EXECUTION', EVAL),
+    'exec': ('CODE_EXECUTION', EXEC),
+    'builtins.exec': ('CODE_EXECUTION', EXEC),
+    'compile': ('CODE_EXECUTION', COMPILE),
+    'builtins.compile': ('CODE_EXECUTION', COMPILE),
+    '__import__': ('CODE_EXECUTION', DUNDER_IMPORT),
+    'builtins.__import__': ('CODE_EXECUTION', DUNDER_IMPORT),
+    'os.system': ('UNSAFE_SYSTEM', OS_SYSTEM),
+    'os.setuid': ('PRIVILEGE_ESCALATION', SETUID_ROOT),
+    'pickle.loads': ('UNSAFE_DESERIALIZATION', PICKLE_LOADS),
+    'yaml.load': ('UNSAFE_DESERIALIZATION', YAML_LOAD),
+    'marshal.loads': ('UNSAFE_DESERIALIZATION', MARSHAL_LOADS),
+    'urllib.request.urlopen': ('NETWORK_RISK', URLOPEN),
+    'os.remove': ('FILE_OPERATIONS', OS_REMOVE),
+    'shutil.rmtree': ('FILE_OPERATIONS', RMTREE),
+}
+
+SHELL_RULES = {
+    'subprocess.call': SHELL_CALL,
+    'subprocess.run': SHELL_RUN,
+    'subprocess.Popen': SHELL_POPEN,
+    'subprocess.check_call': SHELL_CALL,
+    'subprocess.check_output': SHELL_RUN,
+}
+
+REQUESTS_METHODS = {'get', 'post', 'put', 'patch', 'delete', 'head', 'options', 'request'}
+
+SAFE_YAML_LOADERS = {'SafeLoader', 'CSafeLoader', 'BaseLoader'}
+
+# Pravila nad sadržajem string literala (komande koje se prosleđuju shell-u, HTML/JS šabloni)
+STRING_RULES = [
+    ('XSS', XSS_INNER_HTML, re.compile(XSS_INNER_HTML, re.IGNORECASE)),
+    ('XSS', XSS_DOCUMENT_WRITE, re.compile(XSS_DOCUMENT_WRITE, re.IGNORECASE)),
+    ('PRIVILEGE_ESCALATION', SUDO, re.compile(SUDO, re.IGNORECASE)),
+    ('PRIVILEGE_ESCALATION', SU_ROOT, re.compile(SU_ROOT, re.IGNORECASE)),
+    ('PRIVILEGE_ESCALATION', RUNAS_ADMIN, re.compile(RUNAS_ADMIN, re.IGNORECASE)),
+]
+
+# (kategorija, patern, broj linije)
+Finding = Tuple[str, str, int]
+
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    """Vraća 'a.b.c' za lanac Name/Attribute čvorova ili None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _is_false(node: Optional[ast.AST]) -> bool:
+    return isinstance(node, ast.Constant) and not node.value
+
+
+def _mentions(node: ast.AST, name: str) -> bool:
+    """Da li se identifikator (ili atribut) sa datim podstringom javlja u izrazu."""
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and name in child.id.lower():
+            return True
+        if isinstance(child, ast.Attribute) and name in child.attr.lower():
+            return True
+    return False
+
+
+def _is_string_expr(node: ast.AST) -> bool:
+    """Da li je izraz (delimično) string literal - f-string, 'a' + x, 'a' % x..."""
+    # Iterativno - dugački lanci 'a' + b + c + ... ne smeju da probiju limit rekurzije
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.JoinedStr):
+            return True
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return True
+        if isinstance(node, ast.BinOp):
+            stack.append(node.right)
+            stack.append(node.left)
+    return False
+
+
+class PythonAnalyzer:
+    """Jedan prolaz kroz AST koji skuplja nalaze za sva Python pravila."""
+
+    def __init__(self, tree: ast.AST):
+        self.tree = tree
+        self.aliases: Dict[str, str] = {}
+        self.findings: List[Finding] = []
+
+    def _resolve(self, node: ast.AST) -> Optional[str]:
+        """Puno ime pozvane funkcije, uz razrešavanje importa (import x as y, from x import f)."""
+        name = _dotted(node)
+        if name is None:
+            return None
+        head, _, rest = name.partition(".")
+        if head in self.aliases:
+            head = self.aliases[head]
+        return f"{head}.{rest}" if rest else head
+
+    def analyze(self) -> List[Finding]:
+        calls: List[ast.Call] = []
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Call):
+                calls.append(node)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    self.aliases[(alias.asname or alias.name).split(".")[0]] = \
+                        alias.name if alias.asname else alias.name.split(".")[0]
+                    root = alias.name.split(".")[0]
+                    if root == 'pickle':
+                        self._add('UNSAFE_LIBRARY', IMPORT_PICKLE, node)
+                    elif root == 'marshal':
+                        self._add('UNSAFE_LIBRARY', IMPORT_MARSHAL, node)
+            elif isinstance(node, ast.ImportFrom):
+                if node.module and not node.level:
+                    for alias in node.names:
+                        self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+                    if node.module.split(".")[0] == 'pickle':
+                        self._add('UNSAFE_LIBRARY', FROM_PICKLE, node)
+            elif isinstance(node, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                if any(isinstance(t, ast.Attribute) and t.attr == 'innerHTML' for t in targets):
+                    self._add('XSS', XSS_INNER_HTML, node)
+            elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+                self._check_string(node)
+
+        # Pozivi se proveravaju posle obilaska, kada su svi importi (i alijasi) poznati
+        for call in calls:
+            self._check_call(call)
+        return self.findings
+
+    def _add(self, category: str, pattern: str, node: ast.AST, line: Optional[int] = None) -> None:
+        self.findings.append((category, pattern, line or node.lineno))
+
+    def _check_string(self, node: ast.Constant) -> None:
+        for offset, text in enumerate(node.value.split("\n")):
+            for category, pattern, regex in STRING_RULES:
+                if regex.search(text):
+                    self._add(category, pattern, node, node.lineno + offset)
+
+    def _check_sql(self, call: ast.Call) -> None:
+        query = call.args[0]
+        if isinstance(query, ast.JoinedStr):
+            self._add('SQL_INJECTION', SQL_FSTRING, call)
+        elif isinstance(query, ast.BinOp) and _is_string_expr(query):
+            if isinstance(query.op, ast.Mod):
+                self._add('SQL_INJECTION', SQL_PERCENT, call)
+            else:
+                self._add('SQL_INJECTION', SQL_CONCAT, call)
+        elif (isinstance(query, ast.Call) and isinstance(query.func, ast.Attribute)
+              and query.func.attr == 'format'):
+            self._add('SQL_INJECTION', SQL_FORMAT, call)
+
+    def _check_call(self, call: ast.Call) -> None:
+        # SR: execute/executemany se proverava po imenu metode, nezavisno od prijemnika
+        # (conn.cursor().execute(...) nema razrešivo tačkasto ime)
+        if (isinstance(call.func, ast.Attribute) and call.func.attr in ('execute', 'executemany')
+                and call.args):
+            self._check_sql(call)
+            return
+        name = self._resolve(call.func)
+        if name is None:
+            return
+        keywords = {kw.arg: kw.value for kw in call.keywords if kw.arg}
+        args = list(call.args) + list(keywords.values())
+
+        rule = CALL_RULES.get(name)
+        if rule:
+            category, pattern = rule
+            if pattern == SETUID_ROOT:
+                if call.args and isinstance(call.args[0], ast.Constant) and call.args[0].value == 0:
+                    self._add(category, pattern, call)
+            elif pattern == YAML_LOAD:
+                loader = keywords.get('Loader', call.args[1] if len(call.args) > 1 else None)
+                loader_name = _dotted(loader) if loader is not None else None
+                if not loader_name or loader_name.rsplit(".", 1)[-1] not in SAFE_YAML_LOADERS:
+                    self._add(category, pattern, call)
+            else:
+                self._add(category, pattern, call)
+            if pattern == EVAL and any(_mentions(arg, 'request') for arg in args):
+                self._add('XSS', XSS_EVAL_REQUEST, call)
+            return
+
+        if name in SHELL_RULES:
+            if 'shell' in keywords and not _is_false(keywords['shell']):
+                self._add('UNSAFE_SYSTEM', SHELL_RULES[name], call)
+            return
+
+        head, _, method = name.rpartition(".")
+        if head == 'requests' and method in REQUESTS_METHODS:
+            if 'verify' in keywords and _is_false(keywords['verify']):
+                self._add('NETWORK_RISK', REQUESTS_NO_VERIFY, call)
+            return
+
+        if name == 'document.write':
+            self._add('XSS', XSS_DOCUMENT_WRITE, call)
+            return
+
+        if name == 'open':
+            mode = keywords.get('mode', call.args[1] if len(call.args) > 1 else None)
+            if isinstance(mode, ast.Constant) and isinstance(mode.value, str) and 'w' in mode.value:
+                self._add('FILE_OPERATIONS', OPEN_WRITE, call)
+            return
+
+
+def analyze_python(code: str) -> Optional[List[Finding]]:
+    """
+    Analizira Python kod.
+
+    Returns:
+        Lista (kategorija, patern, linija) ili None ako kod nije validan Python
+        ili je previše duboko ugnežden za AST (tada Sentinel koristi regex skener).
+    """
+    try:
+        tree = ast.parse(code)
+        return PythonAnalyzer(tree).analyze()
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
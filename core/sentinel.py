@@ -4,9 +4,93 @@ Detektuje potencijalno opasne konstrukte pre nego što se kod izvrši ili upiše
 """
 
 import re
-from typing import List, Dict, Tuple
+import time
+from typing import List, Dict, Optional, Tuple, NamedTuple, Pattern
 from dataclasses import dataclass
 
+from core.metrics import SENTINEL_SCAN, metrics
+from core.python_analyzer import analyze_python
+
+# Jezici (i ekstenzije) za koje se koristi AST analiza umesto regex-a
+PYTHON_LANGUAGES = {'python', 'py', 'pyw', 'python3'}
+
+# SR: Znakovi koje re.IGNORECASE poistovećuje sa ASCII slovima, a str.lower() ne
+# (npr. 'ſ' se poklapa sa 's'). Bez ovoga bi literal prefilter mogao da propusti pogodak.
+_CASE_FOLD = {0x130: 'i', 0x131: 'i', 0x17f: 's', 0x212a: 'k'}
+
+
+def _literal_anchor(pattern: str) -> str:
+    """
+    Izvlači najduži literal koji MORA postojati u svakom pogotku paterna (lowercase).
+    Vraća prazan string kada se takav literal ne može garantovati (npr. alternacija).
+    """
+    if '|' in pattern:
+        return ''
+
+    runs, current = [], ''
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\' and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            i += 2
+            if nxt.isalnum():
+                # \b, \s, \w, \d... nisu literali
+                runs.append(current)
+                current = ''
+                continue
+            literal = nxt
+        elif ch in '([{':
+            # Preskoči grupu / klasu karaktera - sadržaj ne tretiramo kao obavezan
+            closing = {'(': ')', '[': ']', '{': '}'}[ch]
+            depth = 0
+            while i < len(pattern):
+                if pattern[i] == '\\':
+                    i += 2
+                    continue
+                if pattern[i] == ch:
+                    depth += 1
+                elif pattern[i] == closing:
+                    depth -= 1
+                    if depth == 0:
+                        break
+                i += 1
+            i += 1
+            runs.append(current)
+            current = ''
+            continue
+        elif ch in '.^$*+?)]}':
+            i += 1
+            runs.append(current)
+            current = ''
+            continue
+        else:
+            literal = ch
+            i += 1
+
+        quantifier = pattern[i] if i < len(pattern) else ''
+        if quantifier in ('*', '?', '{'):
+            # Literal je opcion - prekida niz i ne ulazi u njega
+            runs.append(current)
+            current = ''
+        elif quantifier == '+':
+            runs.append(current + literal)
+            current = ''
+        else:
+            current += literal
+    runs.append(current)
+    return max(runs, key=len).lower()
+
+
+class _Rule(NamedTuple):
+    """Prekompajlirano pravilo skenera."""
+    group: int  # Redosled (severity, kategorija) grupe u izveštaju
+    category: str
+    severity: str
+    pattern: str
+    regex: Pattern
+    anchor: str
+
 
 @dataclass
 class SecurityThreat:
@@ -87,65 +171,160 @@ class SecuritySentinel:
         ],
     }
     
+    _rules: List[_Rule] = []
+    _rules_by_pattern: Dict[Tuple[str, str], int] = {}
+
     def __init__(self):
         """Inicijalizuje Security Sentinel."""
         self.threats: List[SecurityThreat] = []
+        if not SecuritySentinel._rules:
+            SecuritySentinel._rules = self._compile_rules()
+            SecuritySentinel._rules_by_pattern = {
+                (rule.category, rule.pattern): idx for idx, rule in enumerate(SecuritySentinel._rules)
+            }
+
+    @classmethod
+    def _compile_rules(cls) -> List[_Rule]:
+        """Kompajlira sve paterne jednom, zajedno sa literal sidrom za brzo odbacivanje linija."""
+        rules = []
+        groups = [(category, patterns, 'CRITICAL') for category, patterns in cls.CRITICAL_PATTERNS.items()]
+        groups += [(category, patterns, 'MEDIUM') for category, patterns in cls.WARNING_PATTERNS.items()]
+        for group, (category, patterns, severity) in enumerate(groups):
+            for pattern in patterns:
+                rules.append(_Rule(group, category, severity, pattern,
+                                   re.compile(pattern, re.IGNORECASE), _literal_anchor(pattern)))
+        return rules
     
-    def scan_code(self, code: str) -> Tuple[bool, List[SecurityThreat]]:
+    @staticmethod
+    def language_from_filename(filename: Optional[str]) -> Optional[str]:
+        """Vraća jezik (ekstenziju bez tačke) za ime fajla, ili None ako se ne može odrediti."""
+        if not filename or '.' not in filename:
+            return None
+        return filename.rsplit('.', 1)[-1].lower()
+
+    def scan_code(self, code: str, language: Optional[str] = None) -> Tuple[bool, List[SecurityThreat]]:
         """
         Skenira kod na bezbednosne pretnje.
         
         Args:
-            code: String sa Python kodom za analizu.
+            code: String sa kodom za analizu.
+            language: Jezik koda ('python', 'js', ekstenzija fajla...). Python kod se
+                analizira preko AST-a; ostalo (JS/HTML) regex pravilima. Ako je None,
+                pokušava se AST, a regex se koristi kada kod nije validan Python.
             
         Returns:
             Tuple (is_safe, threats) gde je:
             - is_safe: True ako kod ne sadrži kritične pretnje
             - threats: Lista detektovanih pretnji
         """
-        self.threats = []
+        started = time.perf_counter() if metrics.enabled else None
         lines = code.split('\n')
+        buckets: Dict[int, List[SecurityThreat]] = {}
+        
+        findings = None
+        if language is None or language.lower() in PYTHON_LANGUAGES:
+            findings = analyze_python(code)
         
-        # Skeniraj kritične paterne
-        for category, patterns in self.CRITICAL_PATTERNS.items():
-            self._scan_patterns(lines, patterns, category, 'CRITICAL')
+        if findings is not None:
+            self._collect_findings(lines, findings, buckets)
+        else:
+            folded_code = (code if code.isascii() else code.translate(_CASE_FOLD)).lower()
+            candidates = self._candidate_lines(folded_code)
+            if candidates:
+                self._scan_lines(lines, candidates, buckets)
         
-        # Skeniraj upozorenja
-        for category, patterns in self.WARNING_PATTERNS.items():
-            self._scan_patterns(lines, patterns, category, 'MEDIUM')
+        # Redosled pretnji isti kao ranije: grupa po grupa (kritične pa upozorenja)
+        threats = [threat for group in sorted(buckets) for threat in buckets[group]]
+        # SR: Ista instanca se poziva iz više niti (io/audit pool) - vraća se lokalna lista,
+        # a self.threats je samo kopija poslednjeg rezultata za generate_report()
+        self.threats = list(threats)
         
         # Proveri da li postoje kritične pretnje
-        critical_threats = [t for t in self.threats if t.severity == 'CRITICAL']
+        critical_threats = [t for t in threats if t.severity == 'CRITICAL']
         is_safe = len(critical_threats) == 0
         
-        return is_safe, self.threats
+        if started is not None:
+            SENTINEL_SCAN.observe(time.perf_counter() - started, engine='ast' if findings is not None else 'regex')
+        return is_safe, threats
+    
+    def _candidate_lines(self, folded_code: str) -> Dict[int, List[int]]:
+        """
+        Prefilter na literal sidrima: za svako pravilo nalazi pojavljivanja sidra u celom
+        kodu (str.find radi u C-u) i vraća {indeks_linije: [indeksi pravila]}.
+        Regex se posle pokreće samo na tim (linija, pravilo) parovima.
+        """
+        candidates: Dict[int, List[int]] = {}
+        for rule_idx, rule in enumerate(self._rules):
+            anchor = rule.anchor
+            if not anchor:
+                # Pravilo bez garantovanog literala mora da proveri svaku liniju
+                for line_idx in range(folded_code.count('\n') + 1):
+                    candidates.setdefault(line_idx, []).append(rule_idx)
+                continue
+            
+            pos = folded_code.find(anchor)
+            line_idx, line_pos = 0, 0
+            last_line = -1
+            while pos != -1:
+                line_idx += folded_code.count('\n', line_pos, pos)
+                line_pos = pos
+                if line_idx != last_line:
+                    candidates.setdefault(line_idx, []).append(rule_idx)
+                    last_line = line_idx
+                pos = folded_code.find(anchor, pos + 1)
+        return candidates
     
-    def _scan_patterns(self, lines: List[str], patterns: List[str], 
-                      category: str, severity: str) -> None:
+    def _scan_lines(self, lines: List[str], candidates: Dict[int, List[int]],
+                    buckets: Dict[int, List[SecurityThreat]]) -> None:
         """
-        Skenira linije koda na osnovu regex paterna.
+        Pokreće prekompajlirane regex-e samo na kandidatskim linijama.
         
         Args:
-            lines: Liste linija koda.
-            patterns: Lista regex paterna za pretragu.
-            category: Kategorija pretnje.
-            severity: Nivo ozbiljnosti.
+            lines: Linije koda.
+            candidates: {indeks_linije: [indeksi pravila]} iz prefiltera.
+            buckets: Izlaz - pretnje grupisane po redosledu kategorija.
         """
-        for line_num, line in enumerate(lines, start=1):
+        for line_idx in sorted(candidates):
+            line = lines[line_idx]
             # Preskoči komentare
             if line.strip().startswith('#'):
                 continue
             
-            for pattern in patterns:
-                if re.search(pattern, line, re.IGNORECASE):
+            for rule_idx in candidates[line_idx]:
+                rule = self._rules[rule_idx]
+                if rule.regex.search(line):
                     threat = SecurityThreat(
-                        severity=severity,
-                        category=category,
-                        description=self._get_threat_description(category, pattern),
-                        line_number=line_num,
+                        severity=rule.severity,
+                        category=rule.category,
+                        description=self._get_threat_description(rule.category, rule.pattern),
+                        line_number=line_idx + 1,
                         code_snippet=line.strip()
                     )
-                    self.threats.append(threat)
+                    buckets.setdefault(rule.group, []).append(threat)
+    
+    def _collect_findings(self, lines: List[str], findings: List[Tuple[str, str, int]],
+                          buckets: Dict[int, List[SecurityThreat]]) -> None:
+        """
+        Pretvara nalaze AST analize u SecurityThreat zapise, istim redosledom kao regex skener
+        (po liniji, pa po redosledu pravila) i sa najviše jednim zapisom po (linija, pravilo).
+        
+        Args:
+            lines: Linije koda.
+            findings: (kategorija, patern, broj linije) iz PythonAnalyzer-a.
+            buckets: Izlaz - pretnje grupisane po redosledu kategorija.
+        """
+        hits = sorted({(line_number, self._rules_by_pattern[(category, pattern)])
+                       for category, pattern, line_number in findings})
+        for line_number, rule_idx in hits:
+            rule = self._rules[rule_idx]
+            line = lines[line_number - 1] if 0 < line_number <= len(lines) else ''
+            buckets.setdefault(rule.group, []).append(SecurityThreat(
+                severity=rule.severity,
+                category=rule.category,
+                description=self._get_threat_description(rule.category, rule.pattern),
+                line_number=line_number,
+                code_snippet=line.strip()
+            ))
     
     def _get_threat_description(self, category: str, pattern: str) -> str:
         """Vraća opis pretnje na osnovu kategorije."""
@@ -162,14 +341,18 @@ class SecuritySentinel:
         }
         return descriptions.get(category, 'Nepoznata bezbednosna pretnja')
     
-    def generate_report(self) -> str:
+    def generate_report(self, threats: Optional[List[SecurityThreat]] = None) -> str:
         """
         Generiše čitljiv izveštaj o detektovanim pretnjama.
         
+        Args:
+            threats: Pretnje iz scan_code (podrazumevano poslednji rezultat ove instance).
+        
         Returns:
             Formatiran string sa izveštajem.
         """
-        if not self.threats:
+        threats = self.threats if threats is None else threats
+        if not threats:
             return "✓ Kod je bezbedan - nisu detektovane pretnje."
         
         report = ["\n" + "="*70]
@@ -178,7 +361,7 @@ class SecuritySentinel:
         
         # Grupiši po ozbiljnosti
         by_severity = {}
-        for threat in self.threats:
+        for threat in threats:
             by_severity.setdefault(threat.severity, []).append(threat)
         
         for severity in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']:
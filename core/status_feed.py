@@ -0,0 +1,232 @@
+"""
+Status Feed - Jedan tok događaja umesto pollinga /status, /git/status i brojača tokena.
+Posle početnog snapshot-a šalju se samo razlike: promene stabla fajlova,
+promene git statusa i promene potrošnje tokena.
+"""
+
+import asyncio
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from core.executor import PoolFullError, run_blocking
+
+GIT_KEYS = ("staged", "modified", "untracked")
+
+
+def list_delta(previous: List[str], current: List[str]) -> Optional[Dict[str, List[str]]]:
+    """Vraća {'added', 'removed'} između dve liste ili None ako su iste."""
+    old, new = set(previous), set(current)
+    if old == new:
+        return None
+    return {"added": sorted(new - old), "removed": sorted(old - new)}
+
+
+class SharedGitStatus:
+    """
+    Jedno čitanje git statusa za sve feed-ove istog GitManager-a: rezultat mlađi od
+    max_age se deli, a istovremeni zahtevi čekaju isto čitanje u toku.
+
+    Attributes:
+        read_at: Kada je počelo čitanje koje je dalo value (monotonic).
+    """
+
+    def __init__(self, git_manager):
+        self.git_manager = git_manager
+        self.value: Optional[Dict[str, Any]] = None
+        self.read_at = 0.0
+        self._task: Optional[asyncio.Future] = None
+
+    def _read(self) -> Dict[str, Any]:
+        if not self.git_manager.is_git_initialized():
+            return {"initialized": False}
+        status = self.git_manager.status()
+        if "error" in status:
+            return {"initialized": True, "error": status["error"]}
+        return {"initialized": True, **{key: status.get(key, []) for key in GIT_KEYS}}
+
+    async def _refresh(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            value = await run_blocking('git', self._read)
+            self.value, self.read_at = value, started
+            return value
+        finally:
+            self._task = None
+
+    async def get(self, max_age: float, newer_than: float = 0.0) -> Dict[str, Any]:
+        """
+        Vraća git status star najviše max_age sekundi, pročitan posle trenutka newer_than.
+
+        Raises:
+            PoolFullError: Ako je 'git' pool pun (feed tada preskače taj krug).
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            if (self.value is not None and time.monotonic() - self.read_at < max_age
+                    and self.read_at >= newer_than):
+                return self.value
+            if self._task is None or self._task.get_loop() is not loop:
+                self._task = loop.create_task(self._refresh())
+                # shield - otkazivanje jednog klijenta ne prekida čitanje koje čekaju ostali
+                return await asyncio.shield(self._task)
+            # Čitanje u toku je možda počelo pre promene - sačekaj ga pa proveri ponovo
+            await asyncio.shield(self._task)
+
+
+_git_statuses: "weakref.WeakKeyDictionary[Any, SharedGitStatus]" = weakref.WeakKeyDictionary()
+
+
+def shared_git_status(git_manager) -> SharedGitStatus:
+    """Vraća deljeni izvor git statusa za dati GitManager."""
+    shared = _git_statuses.get(git_manager)
+    if shared is None:
+        shared = _git_statuses[git_manager] = SharedGitStatus(git_manager)
+    return shared
+
+
+class StatusFeed:
+    """
+    Izvor događaja za jednog klijenta.
+
+    Promene fajlova stižu od FileWatcher-a (callback iz njegove niti budi petlju),
+    git status se ponovo čita git_debounce sekundi posle promene fajlova (nalet promena
+    daje jedno čitanje) ili na svakih git_interval sekundi, i to jednim čitanjem za sve klijente
+    (SharedGitStatus). Brojači tokena su čitanje iz memorije. Ako je pool pun,
+    krug se preskače i pokušava ponovo u sledećem.
+    """
+
+    def __init__(self, orchestrator, git_manager, max_depth: int = 2, interval: float = 1.0,
+                 git_interval: float = 5.0, heartbeat: float = 15.0, git_debounce: float = 1.0):
+        self.orchestrator = orchestrator
+        self.git_manager = git_manager
+        self.max_depth = max_depth
+        self.interval = interval
+        self.git_interval = git_interval
+        self.heartbeat = heartbeat
+        self.git_debounce = git_debounce
+        self.git_status = shared_git_status(git_manager)
+
+    def _project(self) -> Dict[str, Any]:
+        file_manager = self.orchestrator.file_manager
+        return {
+            "project_dir": str(file_manager.BASE_DIR),
+            "roots": [str(r) for r in file_manager.roots],
+            "model": self.orchestrator.model,
+        }
+
+    def _tokens(self) -> Dict[str, int]:
+        cache_stats = self.orchestrator.get_cache_stats()
+        return {
+            "total_tokens": self.orchestrator.get_token_usage(),
+            "cache_hits": cache_stats["hits"],
+            "cache_misses": cache_stats["misses"],
+        }
+
+    @staticmethod
+    def _git_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if previous == current:
+            return None
+        if previous.get("initialized") != current.get("initialized") or "error" in current or "error" in previous:
+            # Promena stanja repozitorijuma - šalje se ceo status
+            return {"type": "git", "full": True, **current}
+        delta = {"type": "git", "full": False}
+        for key in GIT_KEYS:
+            change = list_delta(previous.get(key, []), current.get(key, []))
+            if change:
+                delta[key] = change
+        return delta
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        """Async generator događaja: snapshot, files, git, tokens, project, ping."""
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def on_change(event) -> None:
+            # Poziva se iz niti watcher-a
+            loop.call_soon_threadsafe(changed.set)
+
+        project = self._project()
+        unsubscribe = self.orchestrator.file_manager.subscribe(on_change)
+        try:
+            while True:
+                try:
+                    files = await run_blocking('io', self.orchestrator.file_manager.list_files,
+                                               max_depth=self.max_depth)
+                    git = await self.git_status.get(self.git_interval)
+                    break
+                except PoolFullError:
+                    # Pool-ovi su zauzeti - snapshot se šalje kada se oslobode
+                    await asyncio.sleep(self.interval)
+            tokens = self._tokens()
+            yield {"type": "snapshot", **project, **tokens, "files": files, "git": git}
+
+            last_git = last_event = time.monotonic()
+            files_pending = False
+            git_changed_at = None  # Prva promena fajlova koju git status još ne odražava
+            while True:
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                files_changed = changed.is_set() or files_pending
+                changed.clear()
+                now = time.monotonic()
+
+                current_project = self._project()
+                if current_project != project:
+                    # Promenjen workspace - novi pretplatnici i puna lista fajlova
+                    for unsub in unsubscribe:
+                        unsub()
+                    unsubscribe = self.orchestrator.file_manager.subscribe(on_change)
+                    project = current_project
+                    files_changed = True
+                    yield {"type": "project", **project}
+                    last_event = now
+
+                if files_changed and git_changed_at is None:
+                    git_changed_at = now
+                if files_changed:
+                    try:
+                        current = await run_blocking('io', self.orchestrator.file_manager.list_files,
+                                                     max_depth=self.max_depth)
+                    except PoolFullError:
+                        current = None
+                    # Pun pool - lista fajlova se osvežava u sledećem krugu
+                    files_pending = current is None
+                    if current is not None:
+                        delta = list_delta(files, current)
+                        files = current
+                        if delta:
+                            yield {"type": "files", **delta}
+                            last_event = now
+
+                git_due = git_changed_at is not None and now - git_changed_at >= self.git_debounce
+                if git_due or now - last_git >= self.git_interval:
+                    try:
+                        current_git = await self.git_status.get(
+                            self.git_interval, newer_than=git_changed_at if git_due else 0.0)
+                    except PoolFullError:
+                        current_git = None
+                    if current_git is not None:
+                        if git_due:
+                            git_changed_at = None
+                        last_git = now
+                        delta = self._git_delta(git, current_git)
+                        git = current_git
+                        if delta:
+                            yield delta
+                            last_event = now
+
+                current_tokens = self._tokens()
+                if current_tokens != tokens:
+                    tokens = current_tokens
+                    yield {"type": "tokens", **tokens}
+                    last_event = now
+
+                if now - last_event >= self.heartbeat:
+                    yield {"type": "ping"}
+                    last_event = now
+        finally:
+            for unsub in unsubscribe:
+                unsub()
@@ -0,0 +1,105 @@
+"""
+Stream Parser - Inkrementalno prepoznavanje blokova koda i tool poziva u LLM streamu.
+Tekst se obrađuje chunk po chunk, pa se blok prijavljuje čim se zatvori,
+bez ponovnog pretraživanja celog odgovora posle kraja streama.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+FENCE = "```"
+TOOL_OPEN = "<tool_code>"
+TOOL_CLOSE = "</tool_code>"
+
+
+@dataclass
+class StreamBlock:
+    """Zatvoren blok iz streama."""
+    kind: str                   # 'code' ili 'tool'
+    content: str                # Sadržaj bloka (bez ograda/tagova)
+    raw: str                    # Ceo blok kako je stigao (sa ogradama/tagovima)
+    language: Optional[str] = None
+
+
+class StreamParser:
+    """
+    Mašina stanja nad streamom: tekst -> ```lang\\n...``` blok koda ili <tool_code>...</tool_code>.
+
+    Čuva samo neobrađeni rep (najviše dužinu markera) i delove trenutno otvorenog bloka,
+    tako da je ukupan rad linearan u dužini odgovora.
+    """
+
+    def __init__(self):
+        self._mode = 'text'             # 'text', 'code_header', 'code', 'tool'
+        self._pending = ""
+        self._language: Optional[str] = None
+        self._block_parts: List[str] = []
+        self._text_parts: List[str] = []
+
+    @property
+    def text(self) -> str:
+        """Tekst van blokova primljen do sada (za 'explanation' polje preview-a)."""
+        return "".join(self._text_parts).strip()
+
+    def feed(self, chunk: str) -> List[StreamBlock]:
+        """Dodaje chunk i vraća blokove koji su se u njemu zatvorili."""
+        self._pending += chunk
+        blocks = []
+        while True:
+            if self._mode == 'text':
+                fence = self._pending.find(FENCE)
+                tool = self._pending.find(TOOL_OPEN)
+                if fence == -1 and tool == -1:
+                    # Zadrži rep koji može biti početak markera podeljenog između chunk-ova
+                    keep = len(TOOL_OPEN) - 1
+                    if len(self._pending) > keep:
+                        self._text_parts.append(self._pending[:-keep])
+                        self._pending = self._pending[-keep:]
+                    return blocks
+                if tool == -1 or (fence != -1 and fence < tool):
+                    self._text_parts.append(self._pending[:fence])
+                    self._pending = self._pending[fence + len(FENCE):]
+                    self._mode = 'code_header'
+                else:
+                    self._text_parts.append(self._pending[:tool])
+                    self._pending = self._pending[tool + len(TOOL_OPEN):]
+                    self._mode = 'tool'
+                self._block_parts = []
+
+            elif self._mode == 'code_header':
+                newline = self._pending.find("\n")
+                inline = self._pending.find(FENCE)
+                if inline != -1 and (newline == -1 or inline < newline):
+                    # ```inline``` u istoj liniji nije blok koda - vraćamo ga u tekst
+                    self._text_parts.append(FENCE + self._pending[:inline + len(FENCE)])
+                    self._pending = self._pending[inline + len(FENCE):]
+                    self._mode = 'text'
+                    continue
+                if newline == -1:
+                    return blocks
+                self._language = self._pending[:newline].strip() or None
+                self._pending = self._pending[newline + 1:]
+                self._mode = 'code'
+
+            else:
+                marker = FENCE if self._mode == 'code' else TOOL_CLOSE
+                end = self._pending.find(marker)
+                if end == -1:
+                    keep = len(marker) - 1
+                    if len(self._pending) > keep:
+                        self._block_parts.append(self._pending[:-keep])
+                        self._pending = self._pending[-keep:]
+                    return blocks
+                self._block_parts.append(self._pending[:end])
+                self._pending = self._pending[end + len(marker):]
+                blocks.append(self._close_block())
+                self._mode = 'text'
+
+    def _close_block(self) -> StreamBlock:
+        body = "".join(self._block_parts)
+        self._block_parts = []
+        if self._mode == 'tool':
+            return StreamBlock('tool', body.strip(), f"{TOOL_OPEN}{body}{TOOL_CLOSE}")
+        header = self._language or ""
+        language, self._language = self._language, None
+        return StreamBlock('code', body.strip(), f"{FENCE}{header}\n{body}{FENCE}", language)
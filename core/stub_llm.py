@@ -0,0 +1,250 @@
+"""
+Stub LLM - Lokalni litellm provajder za load testove orkestratora bez mreže i API ključeva.
+Agent (ili /stream-generate zahtev) sa modelom 'stub/...' dobija determinističke tokene
+sa podesivim vremenom do prvog tokena (TTFT) i brzinom generisanja, pa se meri samo
+sopstveni overhead fabrike.
+
+Podešavanja se zadaju u imenu modela (ključ=vrednost, odvojeno zarezom):
+    stub/default                         - STUB_LLM_* iz okruženja
+    stub/fast                            - bez kašnjenja (čist overhead)
+    stub/ttft=0.5,tps=40,tokens=600      - sporiji provajder
+    stub/code=0                          - samo tekst, bez bloka koda
+    stub/tool=git_status                 - odgovor se završava <tool_code> pozivom alata
+    stub/rpm=30                          - iznad 30 zahteva u minuti vraća 429 (RateLimitError)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+import litellm
+from litellm import CustomLLM
+from litellm.types.utils import GenericStreamingChunk, ModelResponse, Usage
+
+from core.log import get_logger
+
+log = get_logger("StubLLM")
+
+PROVIDER = "stub"
+
+# Odgovor ima objašnjenje, Python blok koda i listu zadataka - kao pravi agent
+_EXPLANATION = ("Predlažem da se logika računanja izdvoji u zaseban servis kako bi bila "
+                "lakša za testiranje i ponovnu upotrebu u ostatku projekta. ")
+_CODE_BLOCK = """```python
+def compute_total(items, discount=0):
+    total = sum(item["price"] * item["qty"] for item in items)
+    if discount:
+        total -= total * discount / 100
+    return round(total, 2)
+```
+"""
+_TASKS = "\nSUMARNA LISTA ZADATAKA\n- Dodati testove za compute_total\n- Povezati servis sa API slojem\n"
+
+
+@dataclass(frozen=True)
+class StubSettings:
+    """
+    Ponašanje stub provajdera za jedan model.
+
+    Attributes:
+        ttft: Kašnjenje pre prvog chunk-a (sekunde).
+        tokens_per_sec: Brzina generisanja (0 = bez pauza između chunk-ova).
+        tokens: Približan broj tokena u odgovoru.
+        chunk_tokens: Broj tokena u jednom chunk-u streama.
+        code: Da li odgovor sadrži ```python blok.
+        tool: Ime alata za <tool_code> na kraju odgovora (None = bez poziva alata).
+        rpm: Limit zahteva u minuti po modelu, kao kod pravog provajdera (0 = bez limita).
+    """
+    ttft: float = 0.2
+    tokens_per_sec: float = 80.0
+    tokens: int = 200
+    chunk_tokens: int = 4
+    code: bool = True
+    tool: Optional[str] = None
+    rpm: int = 0
+
+    @classmethod
+    def from_env(cls) -> "StubSettings":
+        return cls(
+            ttft=float(os.getenv('STUB_LLM_TTFT', cls.ttft)),
+            tokens_per_sec=float(os.getenv('STUB_LLM_TOKENS_PER_SEC', cls.tokens_per_sec)),
+            tokens=int(os.getenv('STUB_LLM_TOKENS', cls.tokens)),
+        )
+
+    @classmethod
+    def parse(cls, model: str) -> "StubSettings":
+        """'stub/ttft=0.1,tps=200' (ili bez prefiksa) -> StubSettings; nepoznati ključevi su greška."""
+        spec = model.split("/", 1)[1] if model.startswith(PROVIDER + "/") else model
+        settings = cls.from_env()
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            if part == "default":
+                continue
+            if part == "fast":
+                settings = replace(settings, ttft=0.0, tokens_per_sec=0.0)
+                continue
+            key, sep, value = part.partition("=")
+            field = _ALIASES.get(key.strip())
+            if not sep or field is None:
+                raise ValueError(f"Nepoznato podešavanje stub modela: '{part}'")
+            settings = replace(settings, **{field: _FIELD_TYPES[field](value.strip())})
+        return settings
+
+
+def _parse_bool(value: str) -> bool:
+    return value.lower() not in ("0", "false", "no", "ne")
+
+
+_ALIASES = {"ttft": "ttft", "tps": "tokens_per_sec", "tokens_per_sec": "tokens_per_sec",
+            "tokens": "tokens", "chunk": "chunk_tokens", "chunk_tokens": "chunk_tokens",
+            "code": "code", "tool": "tool", "rpm": "rpm"}
+_FIELD_TYPES = {"ttft": float, "tokens_per_sec": float, "tokens": int, "chunk_tokens": int,
+                "code": _parse_bool, "tool": lambda v: v or None, "rpm": int}
+
+
+def completion_tokens(tokens: int, include_code: bool = True, tool: Optional[str] = None) -> List[str]:
+    """
+    Deterministička sekvenca "tokena" (reči sa razmakom) dužine ~tokens.
+    Blok koda, lista zadataka i <tool_code> se uvek uključuju celi.
+    """
+    fixed = (_CODE_BLOCK + _TASKS) if include_code else _TASKS
+    if tool:
+        fixed += "\n<tool_code>\n" + json.dumps({"name": tool, "args": {}}) + "\n</tool_code>\n"
+    parts = fixed.split(" ")
+    fixed_tokens = [t + " " for t in parts[:-1]] + parts[-1:]
+    words = _EXPLANATION.split()
+    text_tokens: List[str] = []
+    index = 0
+    while len(text_tokens) + len(fixed_tokens) < tokens:
+        text_tokens.append(words[index % len(words)] + " ")
+        index += 1
+    return text_tokens + ["\n\n"] + fixed_tokens
+
+
+def _chunks(settings: StubSettings) -> List[str]:
+    tokens = completion_tokens(settings.tokens, settings.code, settings.tool)
+    size = max(1, settings.chunk_tokens)
+    return ["".join(tokens[i:i + size]) for i in range(0, len(tokens), size)]
+
+
+def _usage(messages: list, settings: StubSettings) -> Dict[str, int]:
+    # Gruba procena kao u orkestratoru (~4 karaktera po tokenu)
+    prompt = sum(len(json.dumps(m.get("content", ""), ensure_ascii=False)) for m in messages) // 4
+    completion = len(completion_tokens(settings.tokens, settings.code, settings.tool))
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+class StubLLM(CustomLLM):
+    """litellm CustomLLM koji ne izlazi na mrežu - stream i obični pozivi."""
+
+    def __init__(self):
+        super().__init__()
+        self._settings: Dict[str, StubSettings] = {}
+        self._calls: Dict[str, Deque[float]] = {}
+        self._calls_lock = threading.Lock()
+
+    def settings_for(self, model: str) -> StubSettings:
+        settings = self._settings.get(model)
+        if settings is None:
+            settings = self._settings[model] = StubSettings.parse(model)
+        return settings
+
+    def _check_rate(self, model: str, settings: StubSettings) -> None:
+        """Klizni prozor od 60 s - iznad rpm zahteva baca 429 kao pravi provajder."""
+        if settings.rpm <= 0:
+            return
+        now = time.monotonic()
+        with self._calls_lock:
+            calls = self._calls.setdefault(model, deque())
+            while calls and now - calls[0] >= 60:
+                calls.popleft()
+            if len(calls) >= settings.rpm:
+                raise litellm.RateLimitError(
+                    message=f"Stub limit od {settings.rpm} zahteva u minuti je prekoračen",
+                    llm_provider=PROVIDER, model=model)
+            calls.append(now)
+
+    @staticmethod
+    def _pause(settings: StubSettings) -> float:
+        return settings.chunk_tokens / settings.tokens_per_sec if settings.tokens_per_sec > 0 else 0.0
+
+    @staticmethod
+    def _stream_chunk(text: str, usage: Optional[Dict[str, int]] = None) -> GenericStreamingChunk:
+        return {
+            "text": text,
+            "tool_use": None,
+            "is_finished": usage is not None,
+            "finish_reason": "stop" if usage is not None else "",
+            "usage": usage,
+            "index": 0,
+        }
+
+    def _response(self, model: str, messages: list, model_response: ModelResponse) -> ModelResponse:
+        settings = self.settings_for(model)
+        model_response.choices[0].message.content = "".join(_chunks(settings))  # type: ignore[union-attr]
+        model_response.choices[0].finish_reason = "stop"
+        model_response.model = f"{PROVIDER}/{model}"
+        setattr(model_response, "usage", Usage(**_usage(messages, settings)))
+        return model_response
+
+    def completion(self, model: str, messages: list, *args, model_response: ModelResponse = None,
+                   **kwargs) -> ModelResponse:
+        settings = self.settings_for(model)
+        self._check_rate(model, settings)
+        chunks = _chunks(settings)
+        time.sleep(settings.ttft + self._pause(settings) * max(0, len(chunks) - 1))
+        return self._response(model, messages, model_response)
+
+    async def acompletion(self, model: str, messages: list, *args, model_response: ModelResponse = None,
+                          **kwargs) -> ModelResponse:
+        settings = self.settings_for(model)
+        self._check_rate(model, settings)
+        chunks = _chunks(settings)
+        await asyncio.sleep(settings.ttft + self._pause(settings) * max(0, len(chunks) - 1))
+        return self._response(model, messages, model_response)
+
+    def streaming(self, model: str, messages: list, *args, **kwargs) -> Iterator[GenericStreamingChunk]:
+        # Limit se proverava pri otvaranju streama (kao HTTP 429), ne tek pri prvom chunk-u
+        settings = self.settings_for(model)
+        self._check_rate(model, settings)
+        return self._stream(messages, settings)
+
+    def astreaming(self, model: str, messages: list, *args, **kwargs) -> AsyncIterator[GenericStreamingChunk]:
+        settings = self.settings_for(model)
+        self._check_rate(model, settings)
+        return self._astream(messages, settings)
+
+    def _stream(self, messages: list, settings: StubSettings) -> Iterator[GenericStreamingChunk]:
+        pause = self._pause(settings)
+        time.sleep(settings.ttft)
+        for index, text in enumerate(_chunks(settings)):
+            if index and pause:
+                time.sleep(pause)
+            yield self._stream_chunk(text)
+        yield self._stream_chunk("", _usage(messages, settings))
+
+    async def _astream(self, messages: list, settings: StubSettings) -> AsyncIterator[GenericStreamingChunk]:
+        pause = self._pause(settings)
+        await asyncio.sleep(settings.ttft)
+        for index, text in enumerate(_chunks(settings)):
+            if index and pause:
+                await asyncio.sleep(pause)
+            yield self._stream_chunk(text)
+        yield self._stream_chunk("", _usage(messages, settings))
+
+
+stub_llm = StubLLM()
+
+
+def register_stub_provider() -> None:
+    """Registruje 'stub/' provajdera u litellm (idempotentno)."""
+    if any(item.get("provider") == PROVIDER for item in litellm.custom_provider_map):
+        return
+    litellm.custom_provider_map = list(litellm.custom_provider_map) + [
+        {"provider": PROVIDER, "custom_handler": stub_llm}
+    ]
+    log.debug("Stub LLM provajder registrovan", provider=PROVIDER)
@@ -1,18 +1,114 @@
 """
 Dependency Detector
 Automatski detektuje nedostajuće Python i Node.js zavisnosti u projektu.
+Importi se keširaju po fajlu (putanja, mtime, size), pa se ponovo parsiraju samo izmenjeni fajlovi.
 """
 
 import ast
 import os
 import json
+import sqlite3
+import threading
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Tuple
 import re
 
+from core.executor import PoolFullError, execution_pools
+from core.metrics import FILE_WALK
+
+PYTHON_EXTENSIONS = {'.py'}
+NODE_EXTENSIONS = {'.js', '.jsx', '.ts', '.tsx'}
+
+# Folderi koji se preskaču pri skeniranju (virtuelna okruženja, cache, build izlazi)
+SKIP_DIRS = {'venv', 'env', '__pycache__', '.venv', 'node_modules', 'dist', 'build', '.next', '.git', '.agent', '.history'}
+
+# Regex za ES6 import (import ... from 'package') i CommonJS require('package')
+IMPORT_PATTERN = re.compile(r"import\s+.*?\s+from\s+['\"]([^'\"]+)['\"]")
+REQUIRE_PATTERN = re.compile(r"require\(['\"]([^'\"]+)['\"]\)")
+
+# Ispod ovog broja izmenjenih fajlova parsiranje ide u istom procesu (start procesa je skuplji)
+PARALLEL_THRESHOLD = 64
+
+
+def parse_python_imports(file_path: str) -> Set[str]:
+    """Vraća top-level pakete iz import statement-a Python fajla."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        tree = ast.parse(content)
+        imports = set()
+        
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    # Uzmi samo top-level paket (npr. 'requests' iz 'requests.auth')
+                    package = alias.name.split('.')[0]
+                    imports.add(package)
+                    
+            elif isinstance(node, ast.ImportFrom):
+                # Relativni importi (from . import x) su lokalni moduli
+                if node.module and not node.level:
+                    package = node.module.split('.')[0]
+                    imports.add(package)
+        
+        return imports
+        
+    except Exception as e:
+        print(f"[DependencyDetector] Greška pri parsiranju {file_path}: {e}")
+        return set()
+
+
+def parse_node_imports(file_path: str) -> Set[str]:
+    """Vraća imena paketa iz import/require statement-a JS/TS fajla."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        imports = set()
+        for pattern in (IMPORT_PATTERN, REQUIRE_PATTERN):
+            for match in pattern.finditer(content):
+                package = match.group(1)
+                # Ignoriši relativne putanje
+                if not package.startswith('.') and not package.startswith('/'):
+                    # Uzmi samo ime paketa (npr. 'react' iz 'react/jsx-runtime')
+                    package_name = package.split('/')[0]
+                    # @scope paketi zadržavaju scope (npr. '@vitejs/plugin-react')
+                    if package.startswith('@'):
+                        package_name = '/'.join(package.split('/')[:2])
+                    imports.add(package_name)
+        
+        return imports
+        
+    except Exception as e:
+        print(f"[DependencyDetector] Greška pri parsiranju {file_path}: {e}")
+        return set()
+
+
+def _parse_file(item: Tuple[str, str]) -> Tuple[str, List[str]]:
+    """(putanja, vrsta) -> (putanja, importi)."""
+    path, kind = item
+    parser = parse_python_imports if kind == 'python' else parse_node_imports
+    return path, sorted(parser(path))
+
+
+def _parse_batch(items: List[Tuple[str, str]]) -> List[Tuple[str, List[str]]]:
+    """Radna funkcija za 'cpu' pool procesa - jedna serija fajlova po pozivu."""
+    return [_parse_file(item) for item in items]
+
+
 class DependencyDetector:
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, cache_path: str = None, pool: str = 'cpu'):
         self.project_root = Path(project_root).resolve()
+        self.cache_path = Path(cache_path) if cache_path else self.project_root / '.agent' / 'dependency_cache.sqlite'
+        # SR: Parsiranje ide u deljeni pool procesa (execution_pools), pa važe njegove granice i statistika
+        self.pool = pool
+        
+        # putanja -> (vrsta, mtime_ns, size, importi)
+        self._cache: Dict[str, Tuple[str, int, int, List[str]]] = {}
+        self._cache_loaded = False
+        self._lock = threading.Lock()
         
         # Standardne biblioteke koje ne treba instalirati
         self.python_stdlib = {
@@ -39,30 +135,7 @@ class DependencyDetector:
         Returns:
             Set imena paketa (top-level)
         """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            tree = ast.parse(content)
-            imports = set()
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        # Uzmi samo top-level paket (npr. 'requests' iz 'requests.auth')
-                        package = alias.name.split('.')[0]
-                        imports.add(package)
-                        
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        package = node.module.split('.')[0]
-                        imports.add(package)
-            
-            return imports
-            
-        except Exception as e:
-            print(f"[DependencyDetector] Greška pri parsiranju {file_path}: {e}")
-            return set()
+        return parse_python_imports(str(file_path))
     
     def detect_node_imports(self, file_path: Path) -> Set[str]:
         """
@@ -71,44 +144,138 @@ class DependencyDetector:
         Returns:
             Set imena paketa
         """
+        return parse_node_imports(str(file_path))
+    
+    # ------------------------------------------------------------------
+    # Keš importa po fajlu
+    # ------------------------------------------------------------------
+    
+    def _connect(self) -> sqlite3.Connection:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.cache_path), timeout=5)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS imports "
+            "(path TEXT PRIMARY KEY, kind TEXT, mtime_ns INTEGER, size INTEGER, imports TEXT)"
+        )
+        return conn
+    
+    def _load_cache(self) -> None:
+        self._cache_loaded = True
+        if not self.cache_path.exists():
+            return
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            conn = self._connect()
+            try:
+                for path, kind, mtime_ns, size, imports in conn.execute(
+                        "SELECT path, kind, mtime_ns, size, imports FROM imports"):
+                    self._cache[path] = (kind, mtime_ns, size, json.loads(imports))
+            finally:
+                conn.close()
+        except (sqlite3.Error, ValueError) as e:
+            print(f"[DependencyDetector] Keš importa nije učitan: {e}")
+            self._cache = {}
+    
+    def _save_cache(self, changed: Dict[str, Tuple[str, int, int, List[str]]], removed: List[str]) -> None:
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("DELETE FROM imports WHERE path = ?", [(p,) for p in removed])
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO imports (path, kind, mtime_ns, size, imports) VALUES (?, ?, ?, ?, ?)",
+                        [(p, kind, m, s, json.dumps(imps)) for p, (kind, m, s, imps) in changed.items()]
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[DependencyDetector] Greška pri upisu keša importa: {e}")
+    
+    def _walk(self) -> Dict[str, Tuple[str, int, int]]:
+        """Jedan prolaz kroz projekat: {putanja: (vrsta, mtime_ns, size)} za .py i JS/TS fajlove."""
+        found = {}
+        stack = [str(self.project_root)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in SKIP_DIRS:
+                                    stack.append(entry.path)
+                                continue
+                            ext = os.path.splitext(entry.name)[1]
+                            if ext in PYTHON_EXTENSIONS:
+                                kind = 'python'
+                            elif ext in NODE_EXTENSIONS:
+                                kind = 'node'
+                            else:
+                                continue
+                            st = entry.stat()
+                            found[entry.path] = (kind, st.st_mtime_ns, st.st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return found
+    
+    def _parse_all(self, items: List[Tuple[str, str]]) -> List[Tuple[str, List[str]]]:
+        """Parsira izmenjene fajlove - u serijama u pool-u procesa kada ih ima dovoljno."""
+        pool = execution_pools.get(self.pool)
+        if len(items) < PARALLEL_THRESHOLD or pool.max_workers < 2:
+            return _parse_batch(items)
+        size = max(1, len(items) // (pool.max_workers * 4))
+        pending = deque(items[i:i + size] for i in range(0, len(items), size))
+        # Klizni prozor kao kod audita - najviše dve serije po radniku u redu pool-a
+        window = pool.max_workers * 2
+        running = deque()
+        results = []
+        while pending or running:
+            while pending and len(running) < window:
+                batch = pending.popleft()
+                try:
+                    running.append(pool.submit(_parse_batch, batch))
+                except PoolFullError:
+                    # Pool je zauzet drugim poslom - seriju parsira tekuća nit
+                    results.extend(_parse_batch(batch))
+            if running:
+                results.extend(running.popleft().result())
+        return results
+    
+    def scan_imports(self) -> Dict[str, Set[str]]:
+        """
+        Vraća sve importe projekta po vrsti ({'python': ..., 'node': ...}).
+        Ponovo se parsiraju samo fajlovi čiji se mtime ili size promenio od prošlog poziva.
+        """
+        with self._lock:
+            if not self._cache_loaded:
+                self._load_cache()
             
-            imports = set()
+            with FILE_WALK.time(source='dependency_detector'):
+                current = self._walk()
+            removed = [path for path in self._cache if path not in current]
+            for path in removed:
+                del self._cache[path]
             
-            # Regex za ES6 import
-            # import ... from 'package'
-            # import ... from "package"
-            import_pattern = r"import\s+.*?\s+from\s+['\"]([^'\"]+)['\"]"
-            for match in re.finditer(import_pattern, content):
-                package = match.group(1)
-                # Ignoriši relativne putanje
-                if not package.startswith('.') and not package.startswith('/'):
-                    # Uzmi samo ime paketa (npr. 'react' iz 'react/jsx-runtime')
-                    package_name = package.split('/')[0]
-                    # Ignoriši @scope pakete sa scope-om
-                    if package.startswith('@'):
-                        package_name = '/'.join(package.split('/')[:2])
-                    imports.add(package_name)
+            stale = []
+            for path, (kind, mtime_ns, size) in current.items():
+                cached = self._cache.get(path)
+                if not cached or cached[0] != kind or cached[1] != mtime_ns or cached[2] != size:
+                    stale.append((path, kind))
             
-            # Regex za CommonJS require
-            # require('package')
-            # require("package")
-            require_pattern = r"require\(['\"]([^'\"]+)['\"]\)"
-            for match in re.finditer(require_pattern, content):
-                package = match.group(1)
-                if not package.startswith('.') and not package.startswith('/'):
-                    package_name = package.split('/')[0]
-                    if package.startswith('@'):
-                        package_name = '/'.join(package.split('/')[:2])
-                    imports.add(package_name)
+            changed = {}
+            for path, imports in self._parse_all(stale):
+                kind, mtime_ns, size = current[path]
+                changed[path] = (kind, mtime_ns, size, imports)
+            self._cache.update(changed)
             
-            return imports
+            if changed or removed:
+                self._save_cache(changed, removed)
             
-        except Exception as e:
-            print(f"[DependencyDetector] Greška pri parsiranju {file_path}: {e}")
-            return set()
+            result = {'python': set(), 'node': set()}
+            for kind, _, _, imports in self._cache.values():
+                result[kind].update(imports)
+            return result
     
     def scan_project_python(self) -> Set[str]:
         """
@@ -117,15 +284,7 @@ class DependencyDetector:
         Returns:
             Set svih detektovanih paketa
         """
-        all_imports = set()
-        
-        for py_file in self.project_root.rglob('*.py'):
-            # Ignoriši virtuelne okruženja i cache foldere
-            if any(part in py_file.parts for part in ['venv', 'env', '__pycache__', '.venv', 'node_modules']):
-                continue
-            
-            imports = self.detect_python_imports(py_file)
-            all_imports.update(imports)
+        all_imports = self.scan_imports()['python']
         
         # Filtriraj standardne biblioteke
         external_packages = all_imports - self.python_stdlib
@@ -139,16 +298,7 @@ class DependencyDetector:
         Returns:
             Set svih detektovanih paketa
         """
-        all_imports = set()
-        
-        for ext in ['*.js', '*.jsx', '*.ts', '*.tsx']:
-            for js_file in self.project_root.rglob(ext):
-                # Ignoriši node_modules i build foldere
-                if any(part in js_file.parts for part in ['node_modules', 'dist', 'build', '.next']):
-                    continue
-                
-                imports = self.detect_node_imports(js_file)
-                all_imports.update(imports)
+        all_imports = self.scan_imports()['node']
         
         # Filtriraj built-in module
         external_packages = all_imports - self.node_builtins
@@ -158,12 +308,11 @@ class DependencyDetector:
     def get_installed_python_packages(self) -> Set[str]:
         """
         Vraća set instaliranih Python paketa.
+        SR: Uključuje i top-level module distribucija, pa se 'import yaml' vidi kao instaliran PyYAML.
         """
-        from tools.package_manager import PackageManager
-        pm = PackageManager(str(self.project_root))
+        from tools.package_inventory import package_inventory
         
-        packages = pm.list_python_packages()
-        return {pkg['name'].lower() for pkg in packages}
+        return package_inventory.installed_names()
     
     def get_installed_node_packages(self) -> Set[str]:
         """
@@ -194,13 +343,16 @@ class DependencyDetector:
         Returns:
             Dict sa 'python' i 'node' listama nedostajućih paketa
         """
+        # Jedan prolaz kroz projekat za obe vrste fajlova
+        used = self.scan_imports()
+        
         # Python
-        used_python = self.scan_project_python()
+        used_python = used['python'] - self.python_stdlib
         installed_python = self.get_installed_python_packages()
         missing_python = sorted(list(used_python - installed_python))
         
         # Node.js
-        used_node = self.scan_project_node()
+        used_node = used['node'] - self.node_builtins
         installed_node = self.get_installed_node_packages()
         missing_node = sorted(list(used_node - installed_node))
         
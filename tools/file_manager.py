@@ -4,8 +4,101 @@ Sprečava Directory Traversal napade i ograničava pristup samo na radni folder
 """
 
 import os
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from core.log import get_logger
+
+log = get_logger("FileManager")
+
+
+# SR: Zajednička pravila filtriranja - koriste ih list_files i indeks pretrage
+EXCLUDE_DIRS = {'.git', 'node_modules', '__pycache__', '.venv', '.history', '.agent', 'dist', 'build', 'venv', 'env'}
+ALLOWED_EXTENSIONS = {'.py', '.js', '.jsx', '.ts', '.tsx', '.html', '.css', '.json', '.md', '.txt', '.yaml', '.yml'}
+
+# SR: Fajlovi veći od ovoga se u read_many ne dekodiraju u string - klijent ih čita kao stream
+INLINE_READ_LIMIT = 1024 * 1024
+
+# Umask procesa - temp fajl (mkstemp, 0600) dobija iste dozvole kao da je kreiran sa open()
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def is_excluded_dir(name: str) -> bool:
+    """Vraća True ako folder treba preskočiti pri skeniranju projekta."""
+    return name in EXCLUDE_DIRS or name.startswith('.')
+
+
+def is_allowed_file(name: str) -> bool:
+    """Vraća True ako fajl ima ekstenziju koju fabrika prati."""
+    return os.path.splitext(name)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def _write_temp(target: Path, content: Union[str, bytes], encoding: str = 'utf-8') -> str:
+    """Upisuje sadržaj u temp fajl u folderu odredišta (isti disk - rename je atomski)."""
+    directory = target.parent
+    try:
+        fd, temp_path = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=directory)
+    except FileNotFoundError:
+        # Folder se pravi samo kada zaista ne postoji
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=directory)
+
+    try:
+        if isinstance(content, bytes):
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+        else:
+            # Tekstualni mod - isti prevod novih redova kao write_text
+            with os.fdopen(fd, 'w', encoding=encoding) as f:
+                f.write(content)
+        try:
+            mode = os.stat(target).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(temp_path, mode)
+    except BaseException:
+        _discard_temp(temp_path)
+        raise
+    return temp_path
+
+
+def _discard_temp(temp_path: str) -> None:
+    try:
+        os.unlink(temp_path)
+    except OSError:
+        pass
+
+
+def atomic_write_files(targets: List[Tuple[Path, Union[str, bytes]]], encoding: str = 'utf-8') -> List[Path]:
+    """
+    Atomski upisuje više fajlova: prvo se svi sadržaji upišu u temp fajlove pored
+    odredišta, pa se tek onda redom preimenuju (os.replace). Ako priprema bilo kog
+    fajla ne uspe, nijedan fajl nije promenjen. Putanje moraju biti već proverene.
+
+    Returns:
+        Lista upisanih putanja.
+    """
+    prepared: List[Tuple[str, Path]] = []
+    try:
+        for target, content in targets:
+            prepared.append((_write_temp(target, content, encoding), target))
+    except BaseException:
+        for temp_path, _ in prepared:
+            _discard_temp(temp_path)
+        raise
+
+    written = []
+    for index, (temp_path, target) in enumerate(prepared):
+        try:
+            os.replace(temp_path, target)
+        except BaseException:
+            for leftover, _ in prepared[index:]:
+                _discard_temp(leftover)
+            raise
+        written.append(target)
+    return written
 
 
 class SecurityError(Exception):
@@ -13,6 +106,71 @@ class SecurityError(Exception):
     pass
 
 
+class RootTrie:
+    """
+    Stablo komponenti putanja dozvoljenih korena.
+
+    Provera pripadnosti ide komponentu po komponentu (O(dubina)), pa '/proj-evil'
+    NIJE unutar korena '/proj' - za razliku od poređenja stringova sa startswith.
+    Putanje koje se proveravaju moraju već biti apsolutne i normalizovane (normpath).
+    """
+
+    _ROOT = object()  # Ključ čvora koji označava kraj korena
+
+    def __init__(self, roots: Iterable = ()):
+        self._tree: Dict = {}
+        for root in roots:
+            self.add(root)
+
+    @staticmethod
+    def _parts(path: str) -> list:
+        # normcase: na Windows-u su putanje case-insensitive i sa '\\' separatorom.
+        # Putanja je već normalizovana, pa split daje iste komponente za koren i za putanju
+        # (koren '/' postaje [''] i sadrži sve apsolutne putanje).
+        return os.path.normcase(path).rstrip(os.sep).split(os.sep)
+
+    def add(self, root) -> None:
+        root = os.path.normpath(os.path.abspath(os.fspath(root)))
+        node = self._tree
+        for part in self._parts(root):
+            node = node.setdefault(part, {})
+        node[self._ROOT] = root
+
+    def remove(self, root) -> None:
+        root = os.path.normpath(os.path.abspath(os.fspath(root)))
+        parts = self._parts(root)
+        path = [self._tree]
+        for part in parts:
+            node = path[-1].get(part)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].pop(self._ROOT, None)
+        # Ukloni prazne čvorove od lista ka korenu
+        for part, parent in zip(reversed(parts), reversed(path[:-1])):
+            if parent[part]:
+                break
+            del parent[part]
+
+    def match(self, path: str) -> Optional[str]:
+        """Vraća koren koji sadrži putanju (najkraći), ili None."""
+        node = self._tree
+        found = node.get(self._ROOT)
+        if found is not None:
+            return found
+        for part in self._parts(path):
+            node = node.get(part)
+            if node is None:
+                return None
+            found = node.get(self._ROOT)
+            if found is not None:
+                return found
+        return None
+
+    def __contains__(self, path: str) -> bool:
+        return self.match(path) is not None
+
+
 class FileManager:
     """
     Bezbedni menadžer fajlova sa ugrađenom zaštitom od Directory Traversal napada.
@@ -36,12 +194,13 @@ class FileManager:
         # SR: Multi-Root podrška
         # Čuvamo listu svih dozvoljenih korena (Project Roots)
         self.roots = [self.BASE_DIR]
+        self._base_str = str(self.BASE_DIR)
+        self._root_trie = RootTrie(self.roots)
         
         # Kreiraj BASE_DIR ako ne postoji
         self.BASE_DIR.mkdir(parents=True, exist_ok=True)
         
-        print(f"[FileManager] Radni direktorijum postavljen na: {self.BASE_DIR}")
-        print(f"[FileManager] Aktivni koreni: {[str(r) for r in self.roots]}")
+        log.info("Radni direktorijum postavljen", base_dir=self.BASE_DIR, roots=len(self.roots))
 
     def add_root(self, path: str) -> bool:
         """Dodaje novi folder u listu dozvoljenih korena."""
@@ -51,7 +210,8 @@ class FileManager:
                 return False
             if p not in self.roots:
                 self.roots.append(p)
-                print(f"[FileManager] Dodat novi koren: {p}")
+                self._root_trie.add(p)
+                log.info("Dodat novi koren", root=p)
             return True
         except:
             return False
@@ -62,7 +222,10 @@ class FileManager:
             p = Path(path).resolve()
             if p in self.roots and p != self.roots[0]:
                 self.roots.remove(p)
-                print(f"[FileManager] Uklonjen koren: {p}")
+                self._root_trie.remove(p)
+                from tools.file_watcher import stop_watcher
+                stop_watcher(p)
+                log.info("Uklonjen koren", root=p)
                 return True
             return False
         except:
@@ -71,31 +234,20 @@ class FileManager:
     def _sanitize_path(self, path: str) -> Path:
         """
         Sanitizuje putanju i proverava da li je unutar BILO KOG dozvoljenog korena.
+        SR: Provera ide kroz RootTrie po komponentama - '/proj-evil' nije unutar '/proj'.
         """
-        p = Path(path)
-        
-        # Ako je apsolutna, proveravamo direktno
-        if p.is_absolute():
-            resolved_path = Path(os.path.abspath(str(p)))
+        path_str = os.fspath(path)
+
+        # Relativne putanje se podrazumevano vezuju za BASE_DIR
+        if os.path.isabs(path_str):
+            full_path = os.path.normpath(path_str)
         else:
-            # Ako je relativna, podrazumevano je vezujemo za BASE_DIR
-            resolved_path = Path(os.path.abspath(str(self.BASE_DIR / p)))
+            full_path = os.path.normpath(os.path.join(self._base_str, path_str))
 
-        # Provera da li je unutar bilo kog korena
-        is_safe = False
-        for root in self.roots:
-            try:
-                if str(resolved_path).startswith(str(root)):
-                    is_safe = True
-                    break
-            except:
-                continue
-        
-        if not is_safe:
-             roots_str = ", ".join([str(r) for r in self.roots])
-             raise SecurityError(f"Pristup odbijen: {path} (Nije u dozvoljenim korenima)")
-             
-        return resolved_path
+        if self._root_trie.match(full_path) is None:
+            raise SecurityError(f"Pristup odbijen: {path} (Nije u dozvoljenim korenima)")
+
+        return Path(full_path)
     
     def safe_write(self, path: str, content: str, encoding: str = 'utf-8') -> bool:
         """
@@ -114,13 +266,11 @@ class FileManager:
         """
         safe_path = self._sanitize_path(path)
         
-        # Kreiraj parent direktorijume ako ne postoje
-        safe_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Upiši sadržaj
-        safe_path.write_text(content, encoding=encoding)
+        # SR: Atomski upis (temp fajl + rename) - čitalac nikad ne vidi polovičan fajl
+        atomic_write_files([(safe_path, content)], encoding)
+        self._notify_change(safe_path)
         
-        print(f"[FileManager] ✓ Fajl uspešno kreiran: {safe_path.relative_to(self.BASE_DIR)}")
+        log.info("Fajl upisan", path=path)
         return True
     
     def safe_read(self, path: str, encoding: str = 'utf-8') -> str:
@@ -144,9 +294,89 @@ class FileManager:
             raise FileNotFoundError(f"Fajl ne postoji: {safe_path.relative_to(self.BASE_DIR)}")
         
         content = safe_path.read_text(encoding=encoding)
-        print(f"[FileManager] ✓ Fajl uspešno pročitan: {safe_path.relative_to(self.BASE_DIR)}")
+        # SR: Čitanja su najčešći događaj - DEBUG nivo i samo svaki 100. zapis
+        log.debug("Fajl pročitan", sample_every=100, path=path)
         return content
     
+    def read_many(self, paths: List[str], encoding: str = 'utf-8',
+                  inline_limit: int = INLINE_READ_LIMIT) -> Dict[str, Dict[str, Any]]:
+        """
+        Čita više fajlova jednim pozivom. Greška jednog fajla ne prekida ostale.
+
+        Args:
+            paths: Putanje fajlova.
+            encoding: Encoding za fajlove (default: utf-8).
+            inline_limit: Fajlovi veći od ovoga se ne čitaju - vraća se samo veličina,
+                a sadržaj se preuzima kao stream (open_for_streaming).
+
+        Returns:
+            {putanja: {'content': str, 'size': int}} ili {'size': int, 'stream': True}
+            ili {'error': str}.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        for path in paths:
+            try:
+                safe_path = self._sanitize_path(path)
+                with open(safe_path, 'rb') as f:
+                    size = os.fstat(f.fileno()).st_size
+                    if size > inline_limit:
+                        results[path] = {"size": size, "stream": True}
+                        continue
+                    data = f.read()
+                results[path] = {"content": data.decode(encoding), "size": size}
+            except FileNotFoundError:
+                results[path] = {"error": f"Fajl ne postoji: {path}"}
+            except IsADirectoryError:
+                results[path] = {"error": f"Putanja nije fajl: {path}"}
+            except (SecurityError, OSError, UnicodeDecodeError) as e:
+                results[path] = {"error": str(e)}
+        return results
+
+    def write_many(self, files: Union[Dict[str, Union[str, bytes]], List[Tuple[str, Union[str, bytes]]]],
+                   encoding: str = 'utf-8') -> List[Path]:
+        """
+        Atomski upisuje više fajlova - ili se upišu svi, ili nijedan.
+
+        Sve putanje se prvo proveravaju, zatim se sadržaj upisuje u temp fajlove pored
+        odredišta, i tek kada su svi temp fajlovi spremni, redom se preimenuju (os.replace).
+
+        Args:
+            files: {putanja: sadržaj} ili lista (putanja, sadržaj); bytes se upisuju bez enkodovanja.
+            encoding: Encoding za string sadržaj (default: utf-8).
+
+        Returns:
+            Lista upisanih (sanitizovanih) putanja.
+
+        Raises:
+            SecurityError: Ako bilo koja putanja nije bezbedna (ništa nije upisano).
+            OSError: Ako priprema nekog fajla ne uspe (ništa nije upisano).
+        """
+        items = list(files.items()) if isinstance(files, dict) else list(files)
+        targets = [(self._sanitize_path(path), content) for path, content in items]
+
+        written = atomic_write_files(targets, encoding)
+        for safe_path in written:
+            self._notify_change(safe_path)
+        log.info("Fajlovi upisani", files=len(written))
+        return written
+
+    def open_for_streaming(self, path: str) -> Tuple[Path, int]:
+        """
+        Proverava putanju za slanje velikog fajla bez učitavanja u memoriju.
+
+        Returns:
+            (sanitizovana putanja, veličina u bajtovima).
+
+        Raises:
+            SecurityError: Ako putanja nije bezbedna.
+            FileNotFoundError: Ako fajl ne postoji ili nije fajl.
+        """
+        safe_path = self._sanitize_path(path)
+        st = os.stat(safe_path)
+        if not os.path.isfile(safe_path):
+            raise FileNotFoundError(f"Putanja nije fajl: {path}")
+        return safe_path, st.st_size
+
     def safe_mkdir(self, path: str) -> bool:
         """
         Bezbedno kreira direktorijum nakon sanitizacije putanje.
@@ -163,7 +393,7 @@ class FileManager:
         safe_path = self._sanitize_path(path)
         safe_path.mkdir(parents=True, exist_ok=True)
         
-        print(f"[FileManager] ✓ Direktorijum kreiran: {safe_path.relative_to(self.BASE_DIR)}")
+        log.info("Direktorijum kreiran", path=path)
         return True
     
     def safe_exists(self, path: str) -> bool:
@@ -191,42 +421,52 @@ class FileManager:
         if safe_path.exists():
             if safe_path.is_file():
                 safe_path.unlink()
-                print(f"[FileManager] ✓ Fajl obrisan: {safe_path.relative_to(self.BASE_DIR)}")
+                self._notify_change(safe_path)
+                log.info("Fajl obrisan", path=path)
             else:
                 raise ValueError(f"Putanja nije fajl: {safe_path.relative_to(self.BASE_DIR)}")
         
         return True
 
+    def _notify_change(self, path: Path) -> None:
+        """Javlja watcher-u korena da se putanja promenila (bez čekanja na sledeći polling)."""
+        from tools.file_watcher import find_watcher
+        for root in self.roots:
+            watcher = find_watcher(root)
+            if watcher:
+                watcher.update_path(path)
+
+    def subscribe(self, callback) -> list:
+        """
+        Pretplaćuje callback na promene u svim aktivnim korenima.
+
+        Returns:
+            Lista funkcija za odjavu (po jedna za svaki koren).
+        """
+        from tools.file_watcher import get_watcher
+        return [get_watcher(root).subscribe(callback) for root in self.roots]
+
     def list_files(self, max_depth: int = 10) -> list[str]:
         """
         Lista fajlove iz svih aktivnih korena.
+        SR: Čita keširani snapshot koji FileWatcher održava u pozadini.
         """
-        exclude_dirs = {'.git', 'node_modules', '__pycache__', '.venv', '.history', '.agent', 'dist', 'build', 'venv', 'env'}
-        files = []
-        
+        from tools.file_watcher import get_watcher
+
         # Ako imamo više korena, vraćamo apsolutne putanje ili prefixovane
-        use_absolute = len(self.roots) > 1
+        if len(self.roots) == 1:
+            return list(get_watcher(self.BASE_DIR).files(max_depth))
 
+        files = set()
         for root in self.roots:
-            def _scan(current_path: Path, current_depth: int):
-                if current_depth > max_depth:
-                    return
-                
-                try:
-                    for item in current_path.iterdir():
-                        if item.is_dir():
-                            if item.name not in exclude_dirs and not item.name.startswith('.'):
-                                _scan(item, current_depth + 1)
-                        elif item.is_file():
-                            # Filtriranje ekstenzija
-                            if item.suffix.lower() in {'.py', '.js', '.jsx', '.ts', '.tsx', '.html', '.css', '.json', '.md', '.txt', '.yaml', '.yml'}:
-                                path_str = str(item) if use_absolute else str(item.relative_to(self.BASE_DIR))
-                                if path_str not in files:
-                                    files.append(path_str)
-
-                except Exception:
-                    pass
-                    
-            _scan(root, 0)
-            
-        return sorted(list(set(files))) # SR: Extra safety set conversion
+            files.update(str(root / rel_path) for rel_path in get_watcher(root).files(max_depth))
+        return sorted(files)
+
+    def files_version(self) -> tuple:
+        """
+        Vraća oznaku stanja stabla fajlova - menja se pri svakoj promeni u bilo kom korenu.
+        SR: Služi kao ključ keša za sve što se izvodi iz list_files().
+        """
+        from tools.file_watcher import get_watcher
+
+        return tuple((str(root), get_watcher(root).version) for root in self.roots)
@@ -0,0 +1,425 @@
+"""
+File Watcher
+Keširano stablo fajlova po korenu projekta koje se održava u pozadini.
+Koristi watchdog (inotify/ReadDirectoryChangesW) ako je instaliran, inače čisti Python polling.
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from core.log import get_logger
+from core.metrics import FILE_WALK
+from tools.file_manager import is_excluded_dir, is_allowed_file
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+log = get_logger("FileWatcher")
+
+@dataclass
+class FileEvent:
+    """Jedna promena u stablu fajlova."""
+    kind: str  # 'created', 'modified', 'deleted'
+    root: str
+    path: str  # Relativna putanja u odnosu na root (separator OS-a)
+
+
+class FileWatcher:
+    """
+    Drži snapshot {relativna_putanja: (mtime, size)} za jedan koren i obaveštava pretplatnike o promenama.
+
+    Pravila filtriranja su ista kao u FileManager.list_files (is_excluded_dir / is_allowed_file),
+    pa je list_files običan read iz keša. Simbolički linkovi ka folderima se prate (kao ranije
+    list_files), osim linka ka folderu iznad sebe (petlja). Native watcher ne vidi promene unutar
+    cilja takvog linka - one stižu kroz update_path (upisi FileManager-a) ili polling.
+
+    Polling (bez watchdog-a) radi pun prolaz kroz stablo, pa je podrazumevani razmak dug -
+    upisi kroz FileManager ionako javljaju promene odmah.
+    """
+
+    def __init__(self, root: Path, poll_interval: float = 30.0, use_native: bool = True):
+        """
+        Args:
+            root: Koren koji se prati.
+            poll_interval: Razmak između dva polling prolaza (u sekundama).
+            use_native: Da li koristiti watchdog ako je dostupan.
+        """
+        self.root = Path(root).resolve()
+        self.poll_interval = poll_interval
+        self.use_native = use_native and WATCHDOG_AVAILABLE
+
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        self._depth_cache: Dict[int, List[str]] = {}
+        self._subscribers: List[Callable[[FileEvent], None]] = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self.version = 0
+        # SR: Broji SVE promene ispod korena (i fajlove/foldere koje snapshot ne prati).
+        # Puni ga samo native watcher - polling vidi samo fajlove koji prolaze filter.
+        self.tree_version = 0
+
+    # ------------------------------------------------------------------
+    # Životni ciklus
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Radi inicijalno skeniranje i pokreće praćenje."""
+        with self._lock:
+            if self._thread or self._observer:
+                return
+            self._stop.clear()
+            self._rescan(emit=False)
+
+            if self.use_native:
+                try:
+                    self._observer = Observer()
+                    self._observer.schedule(_WatchdogHandler(self), str(self.root), recursive=True)
+                    self._observer.daemon = True
+                    self._observer.start()
+                    return
+                except Exception as e:
+                    log.warning("Native watcher nije dostupan, prelazim na polling", root=self.root, error=e)
+                    self._observer = None
+
+            self._thread = threading.Thread(target=self._poll_loop, name=f"FileWatcher:{self.root.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Zaustavlja praćenje."""
+        self._stop.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer = None
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return (self._thread is not None or self._observer is not None) and not self._stop.is_set()
+
+    @property
+    def sees_all_changes(self) -> bool:
+        """Da li tree_version pouzdano prati svaku promenu u stablu (samo native watcher)."""
+        return self._observer is not None and not self._stop.is_set()
+
+    def touch(self, path) -> None:
+        """Beleži promenu bilo koje putanje (bez obzira na filtere), osim unutar .git foldera."""
+        try:
+            rel_path = os.path.relpath(Path(path), self.root)
+        except ValueError:
+            return
+        if rel_path.split(os.sep, 1)[0] == '.git':
+            return
+        with self._lock:
+            self.tree_version += 1
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._rescan()
+            except Exception as e:
+                log.warning("Greška pri skeniranju", root=self.root, error=e)
+
+    # ------------------------------------------------------------------
+    # Pretplata na promene
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[FileEvent], None]) -> Callable[[], None]:
+        """
+        Registruje callback koji se poziva za svaku promenu (iz pozadinske niti).
+
+        Returns:
+            Funkcija koja odjavljuje pretplatu.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _emit(self, events: List[FileEvent]) -> None:
+        if not events:
+            return
+        with self._lock:
+            self.version += 1
+            self._depth_cache.clear()
+            subscribers = list(self._subscribers)
+        for event in events:
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception as e:
+                    log.warning("Greška u pretplatniku", root=self.root, error=e)
+
+    # ------------------------------------------------------------------
+    # Skeniranje
+    # ------------------------------------------------------------------
+
+    def _ancestor_ids(self, path: Path) -> Optional[FrozenSet[Tuple[int, int]]]:
+        """
+        (dev, inode) foldera od korena do path, za prepoznavanje petlji preko simboličkih linkova.
+        Vraća None ako je path već unutar takve petlje.
+        """
+        chain = [self.root]
+        for part in Path(os.path.relpath(path, self.root)).parts:
+            chain.append(chain[-1] / part)
+        ids = set()
+        for directory in chain:
+            try:
+                st = os.stat(directory)
+            except OSError:
+                continue
+            ident = (st.st_dev, st.st_ino)
+            if ident in ids:
+                return None
+            ids.add(ident)
+        return frozenset(ids)
+
+    def _walk(self, start: Path, ancestors: Optional[FrozenSet[Tuple[int, int]]] = None) -> Dict[str, Tuple[float, int]]:
+        found = {}
+        if ancestors is None:
+            ancestors = self._ancestor_ids(start)
+            if ancestors is None:
+                return found
+        stack = [(start, ancestors)]
+        while stack:
+            current, chain = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                if not is_excluded_dir(entry.name):
+                                    st = entry.stat()
+                                    ident = (st.st_dev, st.st_ino)
+                                    if ident not in chain:
+                                        stack.append((Path(entry.path), chain | {ident}))
+                            elif entry.is_file() and is_allowed_file(entry.name):
+                                st = entry.stat()
+                                found[os.path.relpath(entry.path, self.root)] = (st.st_mtime, st.st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return found
+
+    def _rescan(self, emit: bool = True) -> None:
+        """Kompletan prolaz kroz stablo i diff sa snapshot-om."""
+        with FILE_WALK.time(source='watcher'):
+            current = self._walk(self.root)
+        events = []
+        with self._lock:
+            previous = self._entries
+            for path in previous.keys() - current.keys():
+                events.append(FileEvent('deleted', str(self.root), path))
+            for path, stat in current.items():
+                old = previous.get(path)
+                if old is None:
+                    events.append(FileEvent('created', str(self.root), path))
+                elif old != stat:
+                    events.append(FileEvent('modified', str(self.root), path))
+            self._entries = current
+            if not emit:
+                self.version += 1
+                self._depth_cache.clear()
+        if emit:
+            self._emit(events)
+
+    def _is_tracked(self, rel_path: str) -> bool:
+        parts = rel_path.split(os.sep)
+        if any(is_excluded_dir(part) for part in parts[:-1]):
+            return False
+        return is_allowed_file(parts[-1])
+
+    def update_path(self, path) -> None:
+        """Osvežava jednu putanju (fajl ili folder) bez punog skeniranja."""
+        full_path = Path(path)
+        try:
+            rel_path = os.path.relpath(full_path, self.root)
+        except ValueError:
+            return
+        if rel_path == '.' or rel_path.startswith('..'):
+            return
+
+        if not full_path.exists():
+            with self._lock:
+                known = rel_path in self._entries
+            if not known:
+                # Nepoznata putanja koja više ne postoji - verovatno obrisan folder
+                self.remove_prefix(full_path)
+                return
+        elif full_path.is_dir():
+            if not any(is_excluded_dir(p) for p in rel_path.split(os.sep)):
+                self._refresh_dir(full_path, rel_path)
+            return
+        if not self._is_tracked(rel_path):
+            return
+
+        try:
+            st = full_path.stat()
+            stat = (st.st_mtime, st.st_size)
+        except OSError:
+            stat = None
+
+        events = []
+        with self._lock:
+            old = self._entries.get(rel_path)
+            if stat is None:
+                if old is not None:
+                    del self._entries[rel_path]
+                    events.append(FileEvent('deleted', str(self.root), rel_path))
+            elif old is None:
+                self._entries[rel_path] = stat
+                events.append(FileEvent('created', str(self.root), rel_path))
+            elif old != stat:
+                self._entries[rel_path] = stat
+                events.append(FileEvent('modified', str(self.root), rel_path))
+        self._emit(events)
+
+    def _refresh_dir(self, full_path: Path, rel_path: str) -> None:
+        """
+        Osvežava jedan folder umesto celog stabla. Watchdog šalje DirModifiedEvent roditelju za
+        svaki kreiran/obrisan fajl, pa se čitaju samo direktni unosi foldera; podfolderi koje
+        snapshot ne poznaje (novi ili premešteni) se prolaze rekurzivno, a poznati ostaju kakvi jesu.
+        """
+        prefix = rel_path + os.sep
+        current: Dict[str, Tuple[float, int]] = {}
+        subdirs: List[Tuple[str, Path, FrozenSet[Tuple[int, int]]]] = []
+        ancestors = self._ancestor_ids(full_path)
+        if ancestors is None:
+            return
+        try:
+            with os.scandir(full_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            if not is_excluded_dir(entry.name):
+                                st = entry.stat()
+                                ident = (st.st_dev, st.st_ino)
+                                if ident not in ancestors:
+                                    subdirs.append((entry.name, Path(entry.path), ancestors | {ident}))
+                        elif entry.is_file() and is_allowed_file(entry.name):
+                            st = entry.stat()
+                            current[prefix + entry.name] = (st.st_mtime, st.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            return
+
+        with self._lock:
+            previous = {p: stat for p, stat in self._entries.items() if p.startswith(prefix)}
+        known_dirs = {p[len(prefix):].split(os.sep, 1)[0] for p in previous if os.sep in p[len(prefix):]}
+        for name, sub_path, chain in subdirs:
+            if name in known_dirs:
+                sub_prefix = prefix + name + os.sep
+                current.update((p, stat) for p, stat in previous.items() if p.startswith(sub_prefix))
+            else:
+                with FILE_WALK.time(source='watcher'):
+                    current.update(self._walk(sub_path, chain))
+
+        events = []
+        with self._lock:
+            for path in previous.keys() - current.keys():
+                if self._entries.pop(path, None) is not None:
+                    events.append(FileEvent('deleted', str(self.root), path))
+            for path, stat in current.items():
+                old = self._entries.get(path)
+                if old is None:
+                    events.append(FileEvent('created', str(self.root), path))
+                elif old != stat:
+                    events.append(FileEvent('modified', str(self.root), path))
+                self._entries[path] = stat
+        self._emit(events)
+
+    def remove_prefix(self, path) -> None:
+        """Uklanja sve unose ispod obrisanog foldera."""
+        rel_prefix = os.path.relpath(Path(path), self.root) + os.sep
+        events = []
+        with self._lock:
+            for rel_path in [p for p in self._entries if p.startswith(rel_prefix)]:
+                del self._entries[rel_path]
+                events.append(FileEvent('deleted', str(self.root), rel_path))
+        self._emit(events)
+
+    # ------------------------------------------------------------------
+    # Čitanje snapshot-a
+    # ------------------------------------------------------------------
+
+    def files(self, max_depth: int = 10) -> List[str]:
+        """Vraća sortiranu listu relativnih putanja do dubine max_depth (keširano do sledeće promene)."""
+        with self._lock:
+            cached = self._depth_cache.get(max_depth)
+            if cached is None:
+                cached = sorted(p for p in self._entries if p.count(os.sep) <= max_depth)
+                self._depth_cache[max_depth] = cached
+            return cached
+
+    def stat(self, rel_path: str) -> Optional[Tuple[float, int]]:
+        """Vraća (mtime, size) iz snapshot-a ili None."""
+        with self._lock:
+            return self._entries.get(rel_path)
+
+
+if WATCHDOG_AVAILABLE:
+    class _WatchdogHandler(FileSystemEventHandler):
+        """Prevodi watchdog događaje u update_path pozive."""
+
+        def __init__(self, watcher: FileWatcher):
+            super().__init__()
+            self.watcher = watcher
+
+        def on_any_event(self, event):
+            if event.event_type in ('opened', 'closed_no_write'):
+                return
+            paths = [event.src_path]
+            if getattr(event, 'dest_path', None):
+                paths.append(event.dest_path)
+            for path in paths:
+                self.watcher.touch(path)
+                if event.is_directory and event.event_type in ('deleted', 'moved') and path == event.src_path:
+                    self.watcher.remove_prefix(path)
+                else:
+                    self.watcher.update_path(path)
+
+
+# SR: Jedan watcher po korenu, deljen između svih FileManager instanci i indeksa pretrage
+_watchers: Dict[str, FileWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def get_watcher(root, start: bool = True) -> FileWatcher:
+    """Vraća (i po potrebi pokreće) deljeni watcher za dati koren."""
+    key = str(Path(root).resolve())
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is None:
+            watcher = FileWatcher(Path(key))
+            _watchers[key] = watcher
+    if start:
+        watcher.start()
+    return watcher
+
+
+def find_watcher(root) -> Optional[FileWatcher]:
+    """Vraća watcher za koren samo ako je već pokrenut."""
+    watcher = _watchers.get(str(Path(root).resolve()))
+    return watcher if watcher and watcher.running else None
+
+
+def stop_watcher(root) -> None:
+    """Zaustavlja i uklanja watcher za dati koren."""
+    with _watchers_lock:
+        watcher = _watchers.pop(str(Path(root).resolve()), None)
+    if watcher:
+        watcher.stop()
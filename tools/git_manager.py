@@ -1,32 +1,72 @@
 """
 Git Manager
 Alat za upravljanje Git operacijama (init, status, add, commit, push).
+Status se kešira i poništava promenom indeksa, HEAD-a ili stabla fajlova; za čitanje
+se opciono koristi pygit2 u procesu umesto git subprocesa.
 """
 
 import subprocess
 import os
+import threading
+import time
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 
+from core.log import get_logger
+from core.metrics import SUBPROCESS, SUBPROCESS_FAILURES
+
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
+
+log = get_logger("GitManager")
+
+
 class GitManager:
-    def __init__(self, project_root: str):
+    # Keširan status važi najduže ovoliko sekundi (sigurnosna mreža ako watcher propusti događaj)
+    STATUS_TTL_WATCHED = 30.0
+    STATUS_TTL_UNWATCHED = 2.0
+    # Iznad ovoliko fajlova u indeksu git CLI je brži od libgit2 (paralelni lstat, untracked cache)
+    PYGIT2_MAX_INDEX_ENTRIES = 10000
+    
+    def __init__(self, project_root: str, backend: Optional[str] = None):
+        """
+        Args:
+            project_root: Koren git repozitorijuma.
+            backend: 'pygit2', 'cli' ili 'auto' (podrazumevano iz GIT_BACKEND, inače 'auto').
+                'auto' koristi pygit2 (ako je instaliran) za repozitorijume do
+                PYGIT2_MAX_INDEX_ENTRIES fajlova, a git CLI za veće.
+        """
         self.project_root = Path(project_root).resolve()
+        backend = (backend or os.getenv('GIT_BACKEND', 'auto')).lower()
+        if backend == 'pygit2' and not PYGIT2_AVAILABLE:
+            log.warning("pygit2 nije instaliran - koristim git CLI")
+        self.backend = backend if backend in ('auto', 'pygit2') and PYGIT2_AVAILABLE else 'cli'
+        self._repo = None
+        self._status_cache = None  # (ključ stanja, vreme, rezultat)
+        self._lock = threading.Lock()
     
-    def _run_git(self, args: List[str]) -> Tuple[bool, str]:
+    def _run_git(self, args: List[str], strip: bool = True) -> Tuple[bool, str]:
         """Izvršava git komandu u project_root direktorijumu."""
+        command = args[0] if args else ''
         try:
             # Provera da li git postoji
-            result = subprocess.run(
-                ['git'] + args,
-                cwd=str(self.project_root),
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace'
-            )
+            with SUBPROCESS.time(tool='git', command=command):
+                result = subprocess.run(
+                    ['git'] + args,
+                    cwd=str(self.project_root),
+                    capture_output=True,
+                    text=True,
+                    encoding='utf-8',
+                    errors='replace'
+                )
             
+            if result.returncode != 0:
+                SUBPROCESS_FAILURES.inc(tool='git', command=command)
             if result.returncode == 0:
-                return True, result.stdout.strip()
+                return True, result.stdout.strip() if strip else result.stdout.rstrip('\n')
             else:
                 return False, result.stderr.strip()
         except FileNotFoundError:
@@ -40,14 +80,115 @@ class GitManager:
     
     def init(self) -> Tuple[bool, str]:
         """Inicijalizuje git repozitorijum."""
+        self.invalidate()
         return self._run_git(['init'])
     
+    def invalidate(self) -> None:
+        """Briše keširan status (poziva se posle operacija koje menjaju repozitorijum)."""
+        with self._lock:
+            self._status_cache = None
+            self._repo = None
+    
+    def _state_key(self) -> tuple:
+        """
+        Otisak stanja od kog zavisi status: stat indeksa, HEAD-a i grane na koju HEAD pokazuje,
+        plus brojač svih promena u stablu iz FileWatcher-a. Koristi se samo kod native watcher-a:
+        polling i snapshot prate samo fajlove koje list_files prikazuje, a git vidi i run.sh,
+        Dockerfile, dist/... - bez native watcher-a važi kratak TTL.
+        """
+        from tools.file_watcher import find_watcher
+        
+        git_dir = self.project_root / '.git'
+        paths = [git_dir / 'index', git_dir / 'HEAD']
+        try:
+            head = (git_dir / 'HEAD').read_text(encoding='utf-8').strip()
+            if head.startswith('ref: '):
+                paths.append(git_dir / head[5:])
+        except OSError:
+            pass
+        
+        key = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                key.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                key.append(None)
+        watcher = find_watcher(self.project_root)
+        key.append(watcher.tree_version if watcher and watcher.sees_all_changes else None)
+        return tuple(key)
+    
     def status(self) -> Dict[str, List[str]]:
         """
         Vraća status fajlova (modified, staged, untracked).
         Vraca dict sa listama fajlova.
+        SR: Rezultat se kešira dok se indeks, HEAD i stablo fajlova ne promene.
         """
-        success, output = self._run_git(['status', '--porcelain'])
+        with self._lock:
+            if self._status_cache:
+                key, created, result = self._status_cache
+                ttl = self.STATUS_TTL_WATCHED if key[-1] is not None else self.STATUS_TTL_UNWATCHED
+                if time.monotonic() - created < ttl and key == self._state_key():
+                    return result
+        
+        result = self._status_pygit2() if self._use_pygit2() else self._status_cli()
+        
+        if "error" not in result:
+            # Ključ se uzima POSLE statusa - git tokom statusa sme da osveži indeks
+            with self._lock:
+                self._status_cache = (self._state_key(), time.monotonic(), result)
+        return result
+    
+    def _use_pygit2(self) -> bool:
+        if self.backend != 'auto':
+            return self.backend == 'pygit2'
+        try:
+            # Zaglavlje indeksa: 'DIRC', verzija (4 bajta), broj unosa (4 bajta)
+            with open(self.project_root / '.git' / 'index', 'rb') as f:
+                header = f.read(12)
+            entries = int.from_bytes(header[8:12], 'big') if header[:4] == b'DIRC' else 0
+        except OSError:
+            entries = 0
+        return entries <= self.PYGIT2_MAX_INDEX_ENTRIES
+    
+    def _status_pygit2(self) -> Dict[str, List[str]]:
+        """Status preko libgit2 u procesu (bez fork-a git procesa)."""
+        try:
+            if self._repo is None:
+                self._repo = pygit2.Repository(str(self.project_root))
+            try:
+                # 'normal' - neispraćeni folder kao jedan unos, isto kao 'git status --porcelain'
+                entries = self._repo.status(untracked_files='normal')
+            except TypeError:
+                entries = self._repo.status()
+        except Exception as e:
+            # Npr. oštećen ili nepodržan repozitorijum - CLI kao rezerva
+            log.warning("pygit2 status nije uspeo, koristim git CLI", error=e)
+            self._repo = None
+            return self._status_cli()
+        
+        staged = []
+        modified = []
+        untracked = []
+        for path, flags in sorted(entries.items()):
+            if flags & pygit2.GIT_STATUS_IGNORED:
+                continue
+            if flags & (pygit2.GIT_STATUS_INDEX_NEW | pygit2.GIT_STATUS_INDEX_MODIFIED):
+                staged.append(path)
+            if flags & pygit2.GIT_STATUS_WT_MODIFIED:
+                modified.append(path)
+            if flags & pygit2.GIT_STATUS_WT_NEW:
+                untracked.append(path)
+        
+        return {
+            "staged": staged,
+            "modified": modified,
+            "untracked": untracked
+        }
+    
+    def _status_cli(self) -> Dict[str, List[str]]:
+        # Bez strip-a - vodeći razmak je deo XY koda (' M' = izmenjen, nije staged)
+        success, output = self._run_git(['status', '--porcelain'], strip=False)
         
         if not success:
             return {"error": output}
@@ -79,10 +220,12 @@ class GitManager:
     
     def add(self, files: List[str]) -> Tuple[bool, str]:
         """Dodaje fajlove u staging area."""
+        self.invalidate()
         return self._run_git(['add'] + files)
     
     def commit(self, message: str) -> Tuple[bool, str]:
         """Kreira commit sa datom porukom."""
+        self.invalidate()
         return self._run_git(['commit', '-m', message])
     
     def push(self, remote: str = 'origin', branch: str = 'main') -> Tuple[bool, str]:
@@ -1,29 +1,145 @@
 import os
-import shutil
+import difflib
+import hashlib
+import json
+import sqlite3
+import threading
 import time
-import logging
+import uuid
+import zlib
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, Set
+
+from core.log import get_logger
+from core.metrics import HISTORY_BACKUP
+from tools.file_manager import RootTrie, atomic_write_files
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# SR: Isti neblokirajući logger kao ostatak fabrike (bez basicConfig-a na root logger-u)
+logger = get_logger("HistoryManager")
+
+# Prvi bajt blob-a označava kompresiju
+CODEC_ZLIB = b'Z'
+CODEC_ZSTD = b'S'
+
+
+def _make_delta(base: bytes, target: bytes) -> bytes:
+    """
+    Pravi linijsku deltu koja od base rekonstruiše target.
+    Format: JSON lista operacija ["c", i1, i2] (kopiraj linije base[i1:i2]) i ["i", tekst].
+    Tekst je latin-1 dekodiran, pa je enkodovanje bez gubitaka i za binarne fajlove.
+    """
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(["c", i1, i2])
+        elif tag in ('replace', 'insert'):
+            ops.append(["i", b"".join(target_lines[j1:j2]).decode('latin-1')])
+    return json.dumps(ops, separators=(",", ":")).encode('utf-8')
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Primenjuje deltu iz _make_delta na base."""
+    base_lines = base.splitlines(keepends=True)
+    out = []
+    for op in json.loads(delta.decode('utf-8')):
+        if op[0] == "c":
+            out.extend(base_lines[op[1]:op[2]])
+        else:
+            out.append(op[1].encode('latin-1'))
+    return b"".join(out)
 
-# Konfiguracija logging-a
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logger = logging.getLogger("HistoryManager")
 
 class HistoryManager:
-    def __init__(self, base_dir: str, max_backups: int = 10):
+    """
+    Istorija verzija fajlova nad content-addressed skladištem.
+
+    Sadržaj se čuva kao kompresovani blob imenovan po SHA-256 hešu
+    (.history/objects/ab/cdef...). Najnovija verzija je uvek cela, a starije su
+    obrnute delte u odnosu na prvu noviju verziju. Svakih keyframe_interval verzija
+    jedna ostaje cela, pa rekonstrukcija bilo koje verzije ima ograničen trošak.
+    Indeks verzija po fajlu je u .history/history.sqlite.
+
+    Verzije na koje se poziva neki changeset ne brišu se pri čišćenju (GC koreni) dok se
+    sam changeset ne izbaci - čuva se max_changesets najnovijih.
+
+    Dozvoljene putanje određuje root_trie - uz FileManager se prosleđuje njegov, pa istorija
+    važi i za sekundarne korene. Fajlovi van base_dir se u indeksu vode po apsolutnoj putanji.
+    on_change se poziva za svaki fajl koji istorija prepiše ili obriše (watcher, indeks pretrage).
+    """
+
+    def __init__(self, base_dir: str, max_backups: int = 200, keyframe_interval: int = 16,
+                 max_changesets: int = 100, root_trie: Optional[RootTrie] = None,
+                 on_change: Optional[Callable[[Path], None]] = None):
         self.base_dir = Path(base_dir).resolve()
+        self._root_trie = root_trie if root_trie is not None else RootTrie([self.base_dir])
+        self._on_change = on_change
         self.history_dir = self.base_dir / ".history"
+        self.objects_dir = self.history_dir / "objects"
+        self.db_path = self.history_dir / "history.sqlite"
         self.max_backups = max_backups
+        self.keyframe_interval = keyframe_interval
+        self.max_changesets = max_changesets
+        self._lock = threading.RLock()
+        # Blob-ovi koji su možda postali nepotrebni u tekućoj transakciji (briše ih _collect_garbage)
+        self._gc_pending: Set[str] = set()
         self._ensure_history_dir()
+        self._sweep_orphan_blobs()
 
     def _ensure_history_dir(self):
         if not self.history_dir.exists():
             self.history_dir.mkdir(parents=True, exist_ok=True)
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS versions ("
+                    "path TEXT NOT NULL, version_id TEXT NOT NULL, timestamp INTEGER NOT NULL, "
+                    "hash TEXT NOT NULL, size INTEGER NOT NULL, PRIMARY KEY (path, version_id))"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_versions_hash ON versions (hash)")
+                conn.execute("CREATE TABLE IF NOT EXISTS migrated (path TEXT PRIMARY KEY)")
+
+                # Delta kolone: storage = heš blob-a na disku (ceo sadržaj ili delta),
+                # base_version = novija verzija od koje se delta primenjuje (NULL za cele verzije)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(versions)")}
+                if "storage" not in columns:
+                    conn.execute("ALTER TABLE versions ADD COLUMN storage TEXT")
+                    conn.execute("ALTER TABLE versions ADD COLUMN base_version TEXT")
+                    conn.execute("UPDATE versions SET storage = hash WHERE storage IS NULL")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_versions_storage ON versions (storage)")
+
+                # Changeset = grupa fajlova snimljena zajedno pre jedne višefajlne izmene.
+                # version_id NULL znači da fajl pre izmene nije postojao (rollback ga briše).
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS changesets ("
+                    "id TEXT PRIMARY KEY, timestamp INTEGER NOT NULL, message TEXT, status TEXT NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS changeset_files ("
+                    "changeset_id TEXT NOT NULL, path TEXT NOT NULL, version_id TEXT, hash TEXT, "
+                    "PRIMARY KEY (changeset_id, path))"
+                )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), timeout=10)
 
     def _safe_path(self, path: str) -> Optional[Path]:
         """
-        Bezbedno razrešava putanju i osigurava da je unutar base_dir.
+        Bezbedno razrešava putanju i osigurava da je unutar nekog dozvoljenog korena.
         Štiti od Path Traversal napada.
         """
         try:
@@ -32,8 +148,8 @@ class HistoryManager:
                 full_path = Path(path).resolve()
             else:
                 full_path = (self.base_dir / path).resolve()
-            
-            if not str(full_path).startswith(str(self.base_dir)):
+
+            if self._root_trie.match(str(full_path)) is None:
                 logger.warning(f"Pokušaj pristupa van dozvoljenog direktorijuma: {path}")
                 return None
             return full_path
@@ -41,114 +157,584 @@ class HistoryManager:
             logger.error(f"Greška pri validaciji putanje {path}: {str(e)}")
             return None
 
-    def _cleanup_old_versions(self, backup_subdir: Path, filename_prefix: str):
-        """Održava samo max_backups najnovijih verzija."""
+    def _rel_key(self, full_path: Path) -> str:
+        """
+        Ključ fajla u indeksu - relativna putanja sa '/' separatorom, a za fajlove
+        sekundarnih korena apsolutna (i _safe_path je prihvata nazad).
+        """
         try:
-            # Traži fajlove koji počinju sa imenom originalnog fajla + "_"
-            backups = sorted(backup_subdir.glob(f"{filename_prefix}_*.bak"), key=os.path.getmtime)
-            
-            while len(backups) > self.max_backups:
-                oldest = backups.pop(0)
-                os.remove(oldest)
-                logger.info(f"Obrisan stari backup: {oldest.name}")
+            return full_path.relative_to(self.base_dir).as_posix()
+        except ValueError:
+            return full_path.as_posix()
+
+    def _notify(self, full_path: Path) -> None:
+        if self._on_change is not None:
+            self._on_change(full_path)
+
+    # ------------------------------------------------------------------
+    # Blob skladište
+    # ------------------------------------------------------------------
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def _compress(self, data: bytes) -> bytes:
+        if ZSTD_AVAILABLE:
+            return CODEC_ZSTD + zstandard.ZstdCompressor(level=3).compress(data)
+        return CODEC_ZLIB + zlib.compress(data, 6)
+
+    def _decompress(self, blob: bytes) -> bytes:
+        codec, payload = blob[:1], blob[1:]
+        if codec == CODEC_ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Verzija je kompresovana zstd-om, a 'zstandard' nije instaliran")
+            return zstandard.ZstdDecompressor().decompress(payload)
+        return zlib.decompress(payload)
+
+    def _store_blob(self, data: bytes) -> str:
+        """Upisuje sadržaj u skladište (ako već ne postoji) i vraća njegov heš."""
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = blob_path.with_name(blob_path.name + ".tmp")
+            tmp_path.write_bytes(self._compress(data))
+            os.replace(tmp_path, blob_path)
+        return digest
+
+    def _read_blob(self, digest: str) -> bytes:
+        return self._decompress(self._blob_path(digest).read_bytes())
+
+    def _gc_blobs(self, conn: sqlite3.Connection, digests: List[str]) -> None:
+        """
+        Označava blob-ove za brisanje. Fajlovi se ne brišu unutar transakcije - ako se ona
+        poništi, vraćeni redovi u versions bi pokazivali na obrisane blob-ove.
+        """
+        self._gc_pending.update(digests)
+
+    def _collect_garbage(self, conn: sqlite3.Connection) -> None:
+        """
+        Briše označene blob-ove na koje više ne pokazuje nijedna verzija. Poziva se pod lock-om,
+        posle commit-a ili rollback-a transakcije, pa se proverava samo trajno stanje indeksa.
+        """
+        pending, self._gc_pending = self._gc_pending, set()
+        for digest in pending:
+            in_use = conn.execute("SELECT 1 FROM versions WHERE storage = ? LIMIT 1", (digest,)).fetchone()
+            if not in_use:
+                try:
+                    self._blob_path(digest).unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _sweep_orphan_blobs(self) -> None:
+        """
+        Pri pokretanju briše blob-ove bez verzije (pad procesa između commit-a i GC-a, ili
+        blob-ovi upisani u transakciji koja je poništena) i zaostale .tmp fajlove.
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                in_use = {row[0] for row in conn.execute("SELECT DISTINCT storage FROM versions")}
+            finally:
+                conn.close()
+            removed = 0
+            for blob_path in self.objects_dir.glob("??/*"):
+                digest = blob_path.parent.name + blob_path.name
+                if blob_path.suffix == ".tmp" or digest not in in_use:
+                    try:
+                        blob_path.unlink()
+                        removed += 1
+                    except OSError as e:
+                        logger.warning("Neuspelo brisanje blob-a", blob=str(blob_path), error=e)
+            if removed:
+                logger.info("Obrisani blob-ovi bez verzije", count=removed)
+
+    # ------------------------------------------------------------------
+    # Migracija starih .bak fajlova
+    # ------------------------------------------------------------------
+
+    def _migrate_legacy(self, conn: sqlite3.Connection, full_path: Path) -> None:
+        """Jednokratno prebacuje stare 'ime_timestamp.bak' backup-e fajla u skladište."""
+        key = self._rel_key(full_path)
+        if conn.execute("SELECT 1 FROM migrated WHERE path = ?", (key,)).fetchone():
+            return
+        if not full_path.is_relative_to(self.base_dir):
+            return  # .bak fajlovi su postojali samo za base_dir
+
+        rel_path = full_path.relative_to(self.base_dir)
+        backup_subdir = self.history_dir / rel_path.parent
+        prefix = rel_path.name + "_"
+        if backup_subdir.exists():
+            for backup_file in backup_subdir.glob(f"{prefix}*.bak"):
+                timestamp_str = backup_file.name[len(prefix):-4]
+                if not timestamp_str.isdigit():
+                    continue
+                try:
+                    data = backup_file.read_bytes()
+                    digest = self._store_blob(data)
+                    conn.execute(
+                        "INSERT OR IGNORE INTO versions (path, version_id, timestamp, hash, size, storage) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, timestamp_str, int(timestamp_str), digest, len(data), digest)
+                    )
+                    backup_file.unlink()
+                    logger.info(f"Migriran stari backup: {backup_file.name}")
+                except Exception as e:
+                    logger.warning(f"Greška pri migraciji backup fajla {backup_file.name}: {e}")
+        conn.execute("INSERT OR IGNORE INTO migrated (path) VALUES (?)", (key,))
+
+    # ------------------------------------------------------------------
+    # Lanci delti
+    # ------------------------------------------------------------------
+
+    def _load_version(self, conn: sqlite3.Connection, key: str, version_id: str) -> Optional[bytes]:
+        """Rekonstruiše sadržaj verzije prateći lanac delti do prve cele verzije."""
+        chain = []
+        current = version_id
+        while current is not None:
+            row = conn.execute(
+                "SELECT storage, base_version FROM versions WHERE path = ? AND version_id = ?", (key, current)
+            ).fetchone()
+            if not row:
+                return None
+            chain.append(row[0])
+            current = row[1]
+            if len(chain) > self.max_backups + 1:
+                raise RuntimeError(f"Ciklus u lancu verzija za {key}")
+
+        data = self._read_blob(chain[-1])
+        for delta_digest in reversed(chain[:-1]):
+            data = _apply_delta(data, self._read_blob(delta_digest))
+        return data
+
+    def _materialize(self, conn: sqlite3.Connection, key: str, version_id: str) -> None:
+        """Pretvara deltu u celu verziju (kada njena baza treba da nestane ili se promeni)."""
+        data = self._load_version(conn, key, version_id)
+        if data is None:
+            return
+        old_storage = conn.execute(
+            "SELECT storage FROM versions WHERE path = ? AND version_id = ?", (key, version_id)
+        ).fetchone()[0]
+        digest = self._store_blob(data)
+        conn.execute(
+            "UPDATE versions SET storage = ?, base_version = NULL WHERE path = ? AND version_id = ?",
+            (digest, key, version_id)
+        )
+        self._gc_blobs(conn, [old_storage])
+
+    def _deltify_previous(self, conn: sqlite3.Connection, key: str, new_version_id: str, new_data: bytes) -> None:
+        """
+        Prethodnu najnoviju verziju (do sada celu) čuva kao deltu u odnosu na novu,
+        osim ako bi time lanac delti ispod nje postao duži od keyframe_interval.
+        """
+        rows = conn.execute(
+            "SELECT version_id, storage, base_version FROM versions WHERE path = ? AND version_id != ? "
+            "ORDER BY timestamp DESC, version_id DESC LIMIT ?",
+            (key, new_version_id, self.keyframe_interval)
+        ).fetchall()
+        if not rows or rows[0][2] is not None:
+            return
+
+        prev_id, prev_storage, _ = rows[0]
+        # Broj uzastopnih delti odmah ispod prethodne verzije
+        run = 0
+        for _, _, base_version in rows[1:]:
+            if base_version is None:
+                break
+            run += 1
+        if run + 1 >= self.keyframe_interval:
+            return  # Prethodna verzija ostaje keyframe
+
+        prev_data = self._read_blob(prev_storage)
+        delta = _make_delta(new_data, prev_data)
+        if len(delta) >= len(prev_data):
+            return  # Delta se ne isplati - zadrži celu verziju
+
+        delta_digest = self._store_blob(delta)
+        conn.execute(
+            "UPDATE versions SET storage = ?, base_version = ? WHERE path = ? AND version_id = ?",
+            (delta_digest, new_version_id, key, prev_id)
+        )
+        self._gc_blobs(conn, [prev_storage])
+
+    # ------------------------------------------------------------------
+    # Javni API
+    # ------------------------------------------------------------------
+
+    def _cleanup_old_versions(self, conn: sqlite3.Connection, key: str):
+        """Održava max_backups najnovijih verzija, plus starije na koje se poziva neki changeset."""
+        try:
+            old = conn.execute(
+                "SELECT version_id, storage FROM versions v WHERE path = ? AND NOT EXISTS ("
+                "SELECT 1 FROM changeset_files c WHERE c.path = v.path AND c.version_id = v.version_id) "
+                "ORDER BY timestamp DESC, version_id DESC LIMIT -1 OFFSET ?",
+                (key, self.max_backups)
+            ).fetchall()
+            if not old:
+                return
+            # Sačuvana (changeset) verzija može biti delta nad novijom koja se briše - prvo postaje cela.
+            # Lanci su još netaknuti, jer se ništa ne briše pre materijalizacije.
+            doomed = {version_id for version_id, _ in old}
+            for version_id in doomed:
+                for (dependent,) in conn.execute(
+                    "SELECT version_id FROM versions WHERE path = ? AND base_version = ?", (key, version_id)
+                ).fetchall():
+                    if dependent not in doomed:
+                        self._materialize(conn, key, dependent)
+            for version_id, _ in old:
+                conn.execute("DELETE FROM versions WHERE path = ? AND version_id = ?", (key, version_id))
+                logger.info("Obrisana stara verzija", path=key, version=version_id)
+            self._gc_blobs(conn, [digest for _, digest in old])
         except Exception as e:
             logger.error(f"Greška pri čišćenju starih verzija: {str(e)}")
 
     def create_backup(self, file_path: str) -> Optional[str]:
         """
         Kreira backup fajla pre izmene.
-        Vraća putanju do backup fajla ili None ako fajl ne postoji.
+        Vraća version_id verzije (za read_version/restore_version) ili None ako fajl ne postoji.
+        Ako je sadržaj isti kao u poslednjoj verziji, nova verzija se ne pravi (vraća se postojeća).
         """
         full_path = self._safe_path(file_path)
         if not full_path or not full_path.exists() or not full_path.is_file():
             return None
 
         timestamp = int(time.time())
-        rel_path = full_path.relative_to(self.base_dir)
-        backup_subdir = self.history_dir / rel_path.parent
-        backup_subdir.mkdir(parents=True, exist_ok=True)
-
-        # Koristimo "_" kao separator za bolju kompatibilnost
-        backup_filename = f"{rel_path.name}_{timestamp}.bak"
-        backup_path = backup_subdir / backup_filename
+        key = self._rel_key(full_path)
 
         try:
-            shutil.copy2(full_path, backup_path)
-            logger.info(f"Backup kreiran: {backup_path}")
-            
-            # Očisti stare verzije
-            self._cleanup_old_versions(backup_subdir, rel_path.name)
-            
-            return str(backup_path)
+            data = full_path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+
+            with HISTORY_BACKUP.time(operation='backup'), self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        version_id = self._backup_locked(conn, full_path, data, digest, timestamp)
+                finally:
+                    self._collect_garbage(conn)
+                    conn.close()
+
+            if version_id == str(timestamp):
+                logger.info("Backup kreiran", path=key, version=timestamp)
+            # Blob na disku je kompresovan (ili delta) i GC ga može obrisati - nije putanja za čitanje
+            return version_id
         except Exception as e:
             logger.error(f"Greška pri kreiranju backup-a: {str(e)}")
             return None
 
-    def get_history(self, file_path: str) -> List[Dict[str, str]]:
-        """Vraća listu dostupnih verzija za dati fajl."""
+    def _backup_locked(self, conn: sqlite3.Connection, full_path: Path, data: bytes, digest: str,
+                       timestamp: int, replace_same_second: bool = True) -> str:
+        """
+        Upisuje novu verziju fajla (poziva se pod lock-om, unutar transakcije).
+
+        Args:
+            replace_same_second: Da li verzija iz iste sekunde biva zamenjena. Snapshot-ovi
+                changeset-a je ne zamenjuju (dobijaju sufiks), jer se changeset poziva na nju;
+                isto važi za verziju na koju se već poziva neki changeset.
+
+        Returns:
+            version_id verzije koja sadrži data.
+        """
+        key = self._rel_key(full_path)
+        self._migrate_legacy(conn, full_path)
+
+        latest = conn.execute(
+            "SELECT hash, version_id FROM versions WHERE path = ? ORDER BY timestamp DESC, version_id DESC LIMIT 1",
+            (key,)
+        ).fetchone()
+        if latest and latest[0] == digest:
+            logger.debug("Backup preskočen (sadržaj nepromenjen)", path=key)
+            return latest[1]
+
+        version_id = str(timestamp)
+        # Isti version_id u istoj sekundi zamenjuje prethodni (kao ranije prepisivanje .bak fajla).
+        # Delte koje se oslanjaju na zamenjenu verziju prvo postaju cele.
+        replaced = conn.execute(
+            "SELECT storage FROM versions WHERE path = ? AND version_id = ?", (key, version_id)
+        ).fetchone()
+        if replaced and replace_same_second and conn.execute(
+            "SELECT 1 FROM changeset_files WHERE path = ? AND version_id = ? LIMIT 1", (key, version_id)
+        ).fetchone():
+            # Na verziju se poziva changeset - ne sme biti zamenjena
+            replace_same_second = False
+        if replaced and not replace_same_second:
+            suffix = 1
+            while conn.execute("SELECT 1 FROM versions WHERE path = ? AND version_id = ?",
+                               (key, f"{timestamp}-{suffix:03d}")).fetchone():
+                suffix += 1
+            version_id = f"{timestamp}-{suffix:03d}"
+            replaced = None
+        if replaced:
+            for (dependent,) in conn.execute(
+                "SELECT version_id FROM versions WHERE path = ? AND base_version = ?", (key, version_id)
+            ).fetchall():
+                self._materialize(conn, key, dependent)
+
+        self._store_blob(data)
+        conn.execute(
+            "INSERT OR REPLACE INTO versions (path, version_id, timestamp, hash, size, storage, base_version) "
+            "VALUES (?, ?, ?, ?, ?, ?, NULL)",
+            (key, version_id, timestamp, digest, len(data), digest)
+        )
+        if replaced:
+            self._gc_blobs(conn, [replaced[0]])
+
+        self._deltify_previous(conn, key, version_id, data)
+
+        # Očisti stare verzije
+        self._cleanup_old_versions(conn, key)
+        return version_id
+
+    # ------------------------------------------------------------------
+    # Changeset-ovi (grupne izmene više fajlova)
+    # ------------------------------------------------------------------
+
+    def create_snapshot(self, file_paths: List[str], message: str = "") -> str:
+        """
+        Snima trenutno stanje više fajlova kao jedan changeset (jedna transakcija).
+        Fajlovi koji još ne postoje se beleže kao novi - rollback ih briše.
+
+        Returns:
+            ID changeset-a.
+
+        Raises:
+            ValueError: Ako je neka putanja van dozvoljenih korena.
+        """
+        full_paths = []
+        for file_path in file_paths:
+            full_path = self._safe_path(file_path)
+            if not full_path:
+                raise ValueError(f"Putanja van projekta: {file_path}")
+            full_paths.append(full_path)
+
+        timestamp = int(time.time())
+        changeset_id = f"{timestamp}-{uuid.uuid4().hex[:8]}"
+        # Čitanje je van lock-a; u transakciji su samo upisi u skladište i indeks
+        contents = []
+        for full_path in dict.fromkeys(full_paths):
+            if full_path.is_dir():
+                raise ValueError(f"Putanja je folder, a ne fajl: {self._rel_key(full_path)}")
+            try:
+                data = full_path.read_bytes()
+            except FileNotFoundError:
+                data = None
+            contents.append((full_path, data))
+
+        with HISTORY_BACKUP.time(operation='snapshot'), self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT INTO changesets (id, timestamp, message, status) VALUES (?, ?, ?, 'applied')",
+                        (changeset_id, timestamp, message)
+                    )
+                    for full_path, data in contents:
+                        version_id = digest = None
+                        if data is not None:
+                            digest = hashlib.sha256(data).hexdigest()
+                            version_id = self._backup_locked(conn, full_path, data, digest, timestamp,
+                                                             replace_same_second=False)
+                        conn.execute(
+                            "INSERT INTO changeset_files (changeset_id, path, version_id, hash) VALUES (?, ?, ?, ?)",
+                            (changeset_id, self._rel_key(full_path), version_id, digest)
+                        )
+                    self._prune_changesets(conn)
+            finally:
+                self._collect_garbage(conn)
+                conn.close()
+
+        logger.info("Changeset snimljen", changeset=changeset_id, files=len(contents))
+        return changeset_id
+
+    def _prune_changesets(self, conn: sqlite3.Connection) -> None:
+        """
+        Izbacuje changeset-ove starije od max_changesets najnovijih. Njihove verzije prestaju
+        da budu GC koreni i brišu se pri sledećem čišćenju tog fajla (ako su van max_backups).
+        """
+        old = [row[0] for row in conn.execute(
+            "SELECT id FROM changesets ORDER BY timestamp DESC, id DESC LIMIT -1 OFFSET ?", (self.max_changesets,)
+        ).fetchall()]
+        for changeset_id in old:
+            conn.execute("DELETE FROM changeset_files WHERE changeset_id = ?", (changeset_id,))
+            conn.execute("DELETE FROM changesets WHERE id = ?", (changeset_id,))
+        if old:
+            logger.info("Obrisani stari changeset-ovi", count=len(old))
+
+    def list_changesets(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Vraća poslednje changeset-ove (od najnovijeg) sa listom fajlova."""
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT id, timestamp, message, status FROM changesets ORDER BY timestamp DESC, id DESC LIMIT ?",
+                    (limit,)
+                ).fetchall()
+                result = []
+                for changeset_id, timestamp, message, status in rows:
+                    files = conn.execute(
+                        "SELECT path, version_id FROM changeset_files WHERE changeset_id = ? ORDER BY path",
+                        (changeset_id,)
+                    ).fetchall()
+                    result.append({
+                        "id": changeset_id,
+                        "timestamp": timestamp,
+                        "date": datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+                        "message": message,
+                        "status": status,
+                        "files": [{"path": path, "new": version_id is None} for path, version_id in files],
+                    })
+                return result
+            finally:
+                conn.close()
+
+    def rollback_changeset(self, changeset_id: str) -> Dict[str, Any]:
+        """
+        Vraća sve fajlove changeset-a na stanje pre izmene, jednom atomskom operacijom.
+        Pre toga se trenutno stanje snima kao novi changeset, pa se i rollback može poništiti.
+
+        Returns:
+            {'success', 'message', 'restored', 'deleted', 'undo_changeset'}.
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT status FROM changesets WHERE id = ?", (changeset_id,)).fetchone()
+                if not row:
+                    return {"success": False, "message": f"Changeset {changeset_id} ne postoji"}
+                entries = conn.execute(
+                    "SELECT path, version_id, hash FROM changeset_files WHERE changeset_id = ?", (changeset_id,)
+                ).fetchall()
+
+                # Sve verzije se učitavaju PRE bilo kakvog upisa - ili se vraćaju svi fajlovi, ili nijedan
+                restore: List[tuple] = []
+                delete: List[Path] = []
+                for path, version_id, digest in entries:
+                    full_path = self._safe_path(path)
+                    if not full_path:
+                        return {"success": False, "message": f"Putanja van projekta: {path}"}
+                    if version_id is None:
+                        delete.append(full_path)
+                        continue
+                    data = self._load_version(conn, path, version_id)
+                    if data is None or hashlib.sha256(data).hexdigest() != digest:
+                        return {"success": False,
+                                "message": f"Verzija {version_id} fajla {path} više nije dostupna ili je oštećena"}
+                    restore.append((full_path, data))
+            finally:
+                conn.close()
+
+        try:
+            undo_id = self.create_snapshot([str(p) for p, _ in restore] + [str(p) for p in delete],
+                                           message=f"Pre rollback-a {changeset_id}")
+            with HISTORY_BACKUP.time(operation='rollback'):
+                atomic_write_files(restore)
+                for full_path in delete:
+                    try:
+                        full_path.unlink()
+                    except FileNotFoundError:
+                        pass
+            for full_path in [p for p, _ in restore] + delete:
+                self._notify(full_path)
+        except Exception as e:
+            logger.error(f"Greška pri rollback-u changeset-a {changeset_id}: {str(e)}")
+            return {"success": False, "message": f"Greška pri rollback-u: {str(e)}"}
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("UPDATE changesets SET status = 'rolled_back' WHERE id = ?", (changeset_id,))
+            finally:
+                conn.close()
+
+        logger.info("Changeset vraćen", changeset=changeset_id, restored=len(restore), deleted=len(delete))
+        return {
+            "success": True,
+            "message": f"Changeset {changeset_id} poništen",
+            "restored": [self._rel_key(p) for p, _ in restore],
+            "deleted": [self._rel_key(p) for p in delete],
+            "undo_changeset": undo_id,
+        }
+
+    def get_history(self, file_path: str) -> List[Dict[str, Any]]:
+        """Vraća listu dostupnih verzija za dati fajl (sadržaj se čita preko read_version(version_id))."""
         full_path = self._safe_path(file_path)
         if not full_path:
             return []
-            
-        rel_path = full_path.relative_to(self.base_dir)
-        backup_subdir = self.history_dir / rel_path.parent
-        if not backup_subdir.exists():
-            return []
 
-        backups = []
-        prefix = rel_path.name + "_"
-        
-        for backup_file in backup_subdir.glob(f"{prefix}*.bak"):
+        key = self._rel_key(full_path)
+        with self._lock:
+            conn = self._connect()
             try:
-                # Format: filename_timestamp.bak
-                # Izdvajamo timestamp sa kraja (pre .bak, posle zadnjeg underscore-a)
-                name_without_ext = backup_file.name[:-4] # skini .bak
-                timestamp_str = name_without_ext.split('_')[-1]
-                
-                if not timestamp_str.isdigit():
-                    continue
-                    
-                timestamp = int(timestamp_str)
-                date_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                
-                backups.append({
-                    "version_id": str(timestamp),
-                    "timestamp": timestamp,
-                    "date": date_str,
-                    "path": str(backup_file),
-                    "filename": backup_file.name
-                })
-            except Exception as e:
-                logger.warning(f"Greška pri parsiranju backup fajla {backup_file.name}: {e}")
-                continue
-                
-        # Sortiraj od najnovijeg ka najstarijem
-        return sorted(backups, key=lambda x: x['timestamp'], reverse=True)
+                with conn:
+                    self._migrate_legacy(conn, full_path)
+                    rows = conn.execute(
+                        "SELECT version_id, timestamp, size, base_version FROM versions WHERE path = ? "
+                        "ORDER BY timestamp DESC, version_id DESC",
+                        (key,)
+                    ).fetchall()
+            finally:
+                conn.close()
+
+        # Sortirano od najnovijeg ka najstarijem
+        return [{
+            "version_id": version_id,
+            "timestamp": timestamp,
+            "date": datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+            "filename": f"{full_path.name}_{version_id}.bak",
+            "size": size,
+            "is_delta": base_version is not None
+        } for version_id, timestamp, size, base_version in rows]
+
+    def read_version(self, file_path: str, version_id: str) -> Optional[bytes]:
+        """Vraća sadržaj određene verzije ili None ako ne postoji."""
+        full_path = self._safe_path(file_path)
+        if not full_path:
+            return None
+
+        key = self._rel_key(full_path)
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    self._migrate_legacy(conn, full_path)
+                    row = conn.execute(
+                        "SELECT hash FROM versions WHERE path = ? AND version_id = ?", (key, str(version_id))
+                    ).fetchone()
+                    if not row:
+                        return None
+                    data = self._load_version(conn, key, str(version_id))
+            finally:
+                conn.close()
+
+        if data is None or hashlib.sha256(data).hexdigest() != row[0]:
+            raise RuntimeError(f"Verzija {version_id} fajla {key} je oštećena (heš se ne poklapa)")
+        return data
 
     def restore_version(self, file_path: str, version_id: str) -> bool:
         """Vraća fajl na određenu verziju."""
         full_path = self._safe_path(file_path)
         if not full_path:
             return False
-            
-        rel_path = full_path.relative_to(self.base_dir)
-        backup_subdir = self.history_dir / rel_path.parent
-        
-        # Rekonstruišemo ime backup fajla sa novim formatom
-        backup_filename = f"{rel_path.name}_{version_id}.bak"
-        backup_path = backup_subdir / backup_filename
-        
-        if not backup_path.exists():
-            logger.error(f"Backup verzija {version_id} ne postoji: {backup_path}")
+
+        try:
+            data = self.read_version(file_path, version_id)
+        except Exception as e:
+            logger.error(f"Greška pri čitanju verzije {version_id}: {str(e)}")
+            return False
+
+        if data is None:
+            logger.error(f"Backup verzija {version_id} ne postoji za {file_path}")
             return False
 
         try:
             # Pre restore-a, napravimo backup trenutnog stanja (Snapshot pre Undo-a)
-            self.create_backup(str(rel_path))
-            
-            shutil.copy2(backup_path, full_path)
+            self.create_backup(str(full_path))
+
+            atomic_write_files([(full_path, data)])
+            self._notify(full_path)
             logger.info(f"Fajl {file_path} vraćen na verziju {version_id}")
             return True
         except Exception as e:
             logger.error(f"Greška pri vraćanju verzije: {str(e)}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,151 @@
+"""
+Install Queue
+Red instalacija paketa: zahtevi koji čekaju se spajaju u jedan pip/npm poziv,
+okruženje se instalira serijski, a napredak se šalje kao tok događaja.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from core.executor import run_blocking
+from core.log import get_logger
+from tools.package_manager import PackageManager
+
+log = get_logger("InstallQueue")
+
+
+class InstallJob:
+    """Jedan zahtev za instalaciju; događaji stižu u sopstveni red."""
+
+    def __init__(self, kind: str, packages: List[str], dev: bool = False):
+        loop = asyncio.get_running_loop()
+        self.kind = kind
+        self.packages = packages
+        self.dev = dev
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.results: Dict[str, Tuple[bool, str]] = {}
+        self.finished = loop.create_future()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        self.events.put_nowait(event)
+
+    def set_result(self, package: str, success: bool, message: str) -> None:
+        self.results[package] = (success, message)
+        self.emit({"type": "result", "kind": self.kind, "package": package, "success": success, "message": message})
+        if len(self.results) == len(self.packages) and not self.finished.done():
+            self.finished.set_result(self.results)
+            self.emit({"type": "done", "kind": self.kind,
+                       "success": all(ok for ok, _ in self.results.values())})
+            self.events.put_nowait(None)
+
+    async def wait(self) -> Dict[str, Tuple[bool, str]]:
+        """Čeka kraj instalacije i vraća {paket: (success, message)}."""
+        return await asyncio.shield(self.finished)
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        """Događaji: queued, started, output, retry, result, done."""
+        while True:
+            event = await self.events.get()
+            if event is None:
+                return
+            yield event
+
+
+class InstallQueue:
+    """
+    Red instalacija po okruženju (Python interpreter ili node projekat).
+
+    Dok jedna instalacija traje, novi zahtevi čekaju; kada okruženje postane slobodno,
+    svi zahtevi koji čekaju (sa istim dev flagom) idu u JEDAN pip/npm poziv. Ako zajednička
+    instalacija ne uspe, paketi se instaliraju pojedinačno da bi se znalo koji je problem.
+    """
+
+    def __init__(self, package_manager: PackageManager, pool: str = 'install'):
+        self.package_manager = package_manager
+        self.pool = pool
+        self._pending: Dict[str, List[InstallJob]] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+
+    def submit(self, kind: str, packages: List[str], dev: bool = False) -> InstallJob:
+        """Dodaje zahtev u red i odmah vraća posao (instalacija teče u pozadini)."""
+        if kind not in ('python', 'node'):
+            raise ValueError(f"Nepoznata vrsta paketa: {kind}")
+        packages = list(dict.fromkeys(p.strip() for p in packages if p and p.strip()))
+        job = InstallJob(kind, packages, dev)
+        if not packages:
+            job.finished.set_result({})
+            job.events.put_nowait(None)
+            return job
+
+        valid = []
+        for package in packages:
+            error = self.package_manager.validate_package(package)
+            if error:
+                job.set_result(package, False, error)
+            else:
+                valid.append(package)
+        if not valid:
+            return job
+
+        key = self.package_manager.env_key(kind)
+        pending = self._pending.setdefault(key, [])
+        pending.append(job)
+        job.emit({"type": "queued", "kind": kind, "packages": valid, "position": len(pending)})
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._worker(key, kind))
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        return {key: len(jobs) for key, jobs in self._pending.items() if jobs}
+
+    async def _worker(self, key: str, kind: str) -> None:
+        try:
+            while self._pending.get(key):
+                pending = self._pending[key]
+                dev = pending[0].dev
+                batch = [job for job in pending if job.dev == dev]
+                self._pending[key] = [job for job in pending if job.dev != dev]
+                await self._run_batch(kind, dev, batch)
+        finally:
+            del self._workers[key]
+
+    async def _run_batch(self, kind: str, dev: bool, batch: List[InstallJob]) -> None:
+        packages = list(dict.fromkeys(p for job in batch for p in job.packages if p not in job.results))
+
+        def broadcast(event: Dict[str, Any]) -> None:
+            for job in batch:
+                job.emit(event)
+
+        success, message = await self._install(kind, packages, dev, broadcast)
+        if success or len(packages) == 1:
+            results = {package: (success, message) for package in packages}
+        else:
+            # Zajednička instalacija nije uspela - pojedinačno, da se zna koji paket pravi problem
+            results = {}
+            for package in packages:
+                broadcast({"type": "retry", "kind": kind, "package": package})
+                results[package] = await self._install(kind, [package], dev, broadcast)
+
+        for job in batch:
+            for package in job.packages:
+                if package in results and package not in job.results:
+                    ok, output = results[package]
+                    text = f"Uspešno instaliran: {package}\n{output}" if ok else f"Greška pri instalaciji: {output}"
+                    job.set_result(package, ok, text)
+
+    async def _install(self, kind: str, packages: List[str], dev: bool, broadcast) -> Tuple[bool, str]:
+        loop = asyncio.get_running_loop()
+        command = self.package_manager.install_command(kind, packages, dev)
+        broadcast({"type": "started", "kind": kind, "packages": packages, "command": " ".join(command)})
+        log.info("Instaliranje", kind=kind, packages=", ".join(packages))
+
+        def on_output(line: str) -> None:
+            # Poziva se iz radne niti - događaj prebacujemo na event loop
+            loop.call_soon_threadsafe(broadcast, {"type": "output", "kind": kind, "line": line})
+
+        try:
+            return await run_blocking(self.pool, self.package_manager.run_install, kind, packages, dev, on_output)
+        except FileNotFoundError:
+            return False, "npm nije pronađen - instalirajte Node.js" if kind == 'node' else "pip nije pronađen"
+        except Exception as e:
+            return False, f"Greška: {str(e)}"
@@ -0,0 +1,173 @@
+"""
+Package Inventory
+Spisak instaliranih Python paketa preko importlib.metadata - bez pip subprocesa.
+Keš se poništava kada se promeni neki site-packages folder (instalacija/deinstalacija).
+"""
+
+import importlib.metadata
+import os
+import re
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_name(name: str) -> str:
+    """Normalizuje ime distribucije po PEP 503 ('PyYAML' -> 'pyyaml', 'typing_extensions' -> 'typing-extensions')."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class PackageInventory:
+    """
+    Keširan inventar distribucija aktivnog Python okruženja.
+
+    Pored imena i verzija drži i mapu top-level modul -> distribucije, pa se
+    'import yaml' razrešava u PyYAML, a 'import cv2' u opencv-python.
+    """
+
+    def __init__(self, paths: Optional[List[str]] = None):
+        """
+        Args:
+            paths: Putanje koje se pretražuju (podrazumevano sys.path).
+        """
+        self.paths = paths
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        # normalizovano ime -> (ime, verzija)
+        self._distributions: Dict[str, Tuple[str, str]] = {}
+        # top-level modul -> lista normalizovanih imena distribucija
+        self._modules: Dict[str, List[str]] = {}
+
+    def _search_paths(self) -> List[str]:
+        return [p for p in (self.paths if self.paths is not None else sys.path) if p and os.path.isdir(p)]
+
+    def _current_fingerprint(self) -> tuple:
+        """mtime foldera iz putanje - menja se kada pip doda ili ukloni *.dist-info folder."""
+        fingerprint = []
+        for path in self._search_paths():
+            try:
+                fingerprint.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                continue
+        return tuple(fingerprint)
+
+    def _refresh(self) -> None:
+        fingerprint = self._current_fingerprint()
+        if fingerprint == self._fingerprint:
+            return
+
+        distributions: Dict[str, Tuple[str, str]] = {}
+        modules: Dict[str, List[str]] = {}
+        for dist in importlib.metadata.distributions(path=self._search_paths()):
+            name = dist.metadata["Name"]
+            if not name:
+                continue
+            key = normalize_name(name)
+            # Prva pojava na putanji je ona koja se importuje (isto kao pip)
+            if key in distributions:
+                continue
+            distributions[key] = (name, dist.version)
+            for module in self._top_level_modules(dist, key):
+                owners = modules.setdefault(module, [])
+                if key not in owners:
+                    owners.append(key)
+
+        self._distributions = distributions
+        self._modules = modules
+        self._fingerprint = fingerprint
+
+    @staticmethod
+    def _top_level_modules(dist: importlib.metadata.Distribution, key: str) -> List[str]:
+        """Top-level moduli distribucije: top_level.txt, a bez njega iz liste fajlova."""
+        top_level = dist.read_text("top_level.txt")
+        if top_level:
+            return [line.strip() for line in top_level.splitlines() if line.strip()]
+
+        names = set()
+        for file in dist.files or ():
+            parts = file.parts
+            if not parts or parts[0].endswith((".dist-info", ".egg-info")) or parts[0] in ("..", "__pycache__"):
+                continue
+            first = parts[0]
+            if len(parts) == 1:
+                if first.endswith(".py"):
+                    names.add(first[:-3])
+                elif first.endswith((".so", ".pyd")):
+                    names.add(first.split(".", 1)[0])
+            elif "." not in first:
+                names.add(first)
+        # Bez informacija o fajlovima pretpostavi da se modul zove kao distribucija
+        return sorted(names) or [key.replace("-", "_")]
+
+    # ------------------------------------------------------------------
+    # Upiti
+    # ------------------------------------------------------------------
+
+    def packages(self) -> List[Dict[str, str]]:
+        """Lista svih distribucija u formatu 'pip list --format=json' ([{'name', 'version'}])."""
+        with self._lock:
+            self._refresh()
+            return [{"name": name, "version": version}
+                    for name, version in sorted(self._distributions.values(), key=lambda d: d[0].lower())]
+
+    def module_map(self) -> Dict[str, List[str]]:
+        """Mapa top-level modul -> imena distribucija koje ga obezbeđuju."""
+        with self._lock:
+            self._refresh()
+            return {module: [self._distributions[key][0] for key in keys] for module, keys in self._modules.items()}
+
+    def resolve(self, name: str) -> Optional[Tuple[str, str]]:
+        """
+        Razrešava ime distribucije ili import ime u (ime distribucije, verzija).
+
+        Returns:
+            None ako paket nije instaliran.
+        """
+        with self._lock:
+            self._refresh()
+            return self._resolve(name)
+
+    def _resolve(self, name: str) -> Optional[Tuple[str, str]]:
+        # Zahtevi tipa 'pandas==1.5.0' ili 'requests[socks]' - proverava se samo ime
+        base = re.split(r"[\s\[<>=!~;@]", name.strip(), maxsplit=1)[0]
+        found = self._distributions.get(normalize_name(base))
+        if found:
+            return found
+        owners = self._modules.get(base.split(".")[0])
+        if owners:
+            return self._distributions[owners[0]]
+        return None
+
+    def check(self, names: List[str]) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Proverava više paketa jednim pozivom.
+
+        Returns:
+            {ime: {'installed': bool, 'version': str|None, 'distribution': str|None}}
+        """
+        with self._lock:
+            self._refresh()
+            result = {}
+            for name in names:
+                found = self._resolve(name)
+                result[name] = {
+                    "installed": found is not None,
+                    "version": found[1] if found else None,
+                    "distribution": found[0] if found else None,
+                }
+            return result
+
+    def installed_names(self) -> set:
+        """Sva imena pod kojima je nešto instalirano: distribucije (lowercase) i top-level moduli."""
+        with self._lock:
+            self._refresh()
+            return {name.lower() for name, _ in self._distributions.values()} | set(self._distributions) | set(self._modules)
+
+    def invalidate(self) -> None:
+        """Prisiljava ponovno čitanje metapodataka pri sledećem upitu."""
+        with self._lock:
+            self._fingerprint = None
+
+
+# SR: Deljena instanca za aktivno Python okruženje
+package_inventory = PackageInventory()
@@ -6,12 +6,106 @@ Omogućava AI agentu da automatski instalira Python i Node.js zavisnosti.
 import subprocess
 import sys
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Tuple, List, Dict
+from typing import Callable, Tuple, List, Dict, Optional
+
+from core.metrics import SUBPROCESS, SUBPROCESS_FAILURES
+from tools.package_inventory import package_inventory
+
+# SR: Jedno okruženje (python interpreter / node projekat) - jedna instalacija u isto vreme
+_ENV_LOCKS: Dict[str, threading.Lock] = {}
+_ENV_LOCKS_GUARD = threading.Lock()
+
+DANGEROUS_CHARS = [';', '&', '|', '`', '$', '(', ')']
+
+
+def environment_lock(env_key: str) -> threading.Lock:
+    """Vraća lock koji serijalizuje instalacije u jednom okruženju."""
+    with _ENV_LOCKS_GUARD:
+        lock = _ENV_LOCKS.get(env_key)
+        if lock is None:
+            lock = _ENV_LOCKS[env_key] = threading.Lock()
+        return lock
+
 
 class PackageManager:
+    # Prekid ako instalacija ovoliko sekundi ne ispiše ništa
+    IDLE_TIMEOUTS = {'python': 120, 'node': 180}
+    
     def __init__(self, project_root: str = "."):
         self.project_root = Path(project_root).resolve()
+    
+    @staticmethod
+    def validate_package(package: str) -> Optional[str]:
+        """Vraća poruku o grešci ako ime paketa nije bezbedno, inače None."""
+        # Bezbednosna provera - sprečava izvršavanje proizvoljnih komandi
+        if not package or package.startswith('-') or any(char in package for char in DANGEROUS_CHARS):
+            return "Nevažeće ime paketa - detektovani opasni karakteri"
+        return None
+    
+    def env_key(self, kind: str) -> str:
+        """Ključ okruženja: Python interpreter ili node projekat."""
+        return f"python:{sys.executable}" if kind == 'python' else f"node:{self.project_root}"
+    
+    def install_command(self, kind: str, packages: List[str], dev: bool = False) -> List[str]:
+        if kind == 'python':
+            # Koristi sys.executable da osigura da instalira u ispravan Python environment
+            return [sys.executable, '-m', 'pip', 'install', *packages]
+        cmd = ['npm', 'install', *packages]
+        if dev:
+            cmd.append('--save-dev')
+        return cmd
+    
+    def run_install(self, kind: str, packages: List[str], dev: bool = False,
+                    on_output: Optional[Callable[[str], None]] = None) -> Tuple[bool, str]:
+        """
+        Pokreće jednu pip/npm instalaciju za više paketa i vraća (success, izlaz).
+        
+        Izlaz se čita liniju po liniju i prosleđuje on_output (za streaming napretka).
+        Instalacija se prekida tek ako proces duže od IDLE_TIMEOUTS ne ispiše ništa.
+        
+        Raises:
+            FileNotFoundError: Ako pip/npm nije dostupan.
+        """
+        idle_timeout = self.IDLE_TIMEOUTS[kind]
+        tool = 'pip' if kind == 'python' else 'npm'
+        with environment_lock(self.env_key(kind)), SUBPROCESS.time(tool=tool, command='install'):
+            proc = subprocess.Popen(
+                self.install_command(kind, packages, dev),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                cwd=self.project_root
+            )
+            last_output = [time.monotonic()]
+            timed_out = [False]
+            
+            def watchdog():
+                while proc.poll() is None:
+                    if time.monotonic() - last_output[0] > idle_timeout:
+                        timed_out[0] = True
+                        proc.kill()
+                        return
+                    time.sleep(0.5)
+            
+            threading.Thread(target=watchdog, daemon=True).start()
+            lines = []
+            for line in proc.stdout:
+                last_output[0] = time.monotonic()
+                lines.append(line)
+                if on_output:
+                    on_output(line.rstrip())
+            proc.wait()
+        
+        output = "".join(lines)
+        if timed_out[0] or proc.returncode != 0:
+            SUBPROCESS_FAILURES.inc(tool=tool, command='install')
+        if timed_out[0]:
+            return False, f"Instalacija prekinuta - bez izlaza {idle_timeout}s\n{output}"
+        return proc.returncode == 0, output
         
     def install_python(self, package: str) -> Tuple[bool, str]:
         """
@@ -24,28 +118,18 @@ class PackageManager:
             (success, message)
         """
         try:
-            # Bezbednosna provera - sprečava izvršavanje proizvoljnih komandi
-            if any(char in package for char in [';', '&', '|', '`', '$', '(', ')']):
-                return False, "Nevažeće ime paketa - detektovani opasni karakteri"
+            error = self.validate_package(package)
+            if error:
+                return False, error
             
             print(f"[PackageManager] Instaliranje Python paketa: {package}")
             
-            # Koristi sys.executable da osigura da instalira u ispravan Python environment
-            result = subprocess.run(
-                [sys.executable, '-m', 'pip', 'install', package],
-                capture_output=True,
-                text=True,
-                timeout=120,
-                cwd=self.project_root
-            )
-            
-            if result.returncode == 0:
-                return True, f"Uspešno instaliran: {package}\n{result.stdout}"
+            success, output = self.run_install('python', [package])
+            if success:
+                return True, f"Uspešno instaliran: {package}\n{output}"
             else:
-                return False, f"Greška pri instalaciji: {result.stderr}"
+                return False, f"Greška pri instalaciji: {output}"
                 
-        except subprocess.TimeoutExpired:
-            return False, "Instalacija prekinuta - timeout (120s)"
         except Exception as e:
             return False, f"Greška: {str(e)}"
     
@@ -61,33 +145,20 @@ class PackageManager:
             (success, message)
         """
         try:
-            # Bezbednosna provera
-            if any(char in package for char in [';', '&', '|', '`', '$', '(', ')']):
-                return False, "Nevažeće ime paketa - detektovani opasni karakteri"
+            error = self.validate_package(package)
+            if error:
+                return False, error
             
             print(f"[PackageManager] Instaliranje Node paketa: {package}")
             
-            cmd = ['npm', 'install', package]
-            if dev:
-                cmd.append('--save-dev')
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=180,
-                cwd=self.project_root
-            )
-            
-            if result.returncode == 0:
-                return True, f"Uspešno instaliran: {package}\n{result.stdout}"
+            success, output = self.run_install('node', [package], dev)
+            if success:
+                return True, f"Uspešno instaliran: {package}\n{output}"
             else:
-                return False, f"Greška pri instalaciji: {result.stderr}"
+                return False, f"Greška pri instalaciji: {output}"
                 
         except FileNotFoundError:
             return False, "npm nije pronađen - instalirajte Node.js"
-        except subprocess.TimeoutExpired:
-            return False, "Instalacija prekinuta - timeout (180s)"
         except Exception as e:
             return False, f"Greška: {str(e)}"
     
@@ -102,26 +173,27 @@ class PackageManager:
             (installed, version_or_message)
         """
         try:
-            result = subprocess.run(
-                [sys.executable, '-m', 'pip', 'show', package],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if result.returncode == 0:
-                # Izvuci verziju iz output-a
-                for line in result.stdout.split('\n'):
-                    if line.startswith('Version:'):
-                        version = line.split(':', 1)[1].strip()
-                        return True, version
-                return True, "Instaliran (verzija nepoznata)"
-            else:
-                return False, "Nije instaliran"
+            # SR: Čita metapodatke u procesu umesto 'pip show' subprocesa
+            found = package_inventory.resolve(package)
+            if found:
+                return True, found[1] or "Instaliran (verzija nepoznata)"
+            return False, "Nije instaliran"
                 
         except Exception as e:
             return False, f"Greška pri proveri: {str(e)}"
     
+    def check_python_packages(self, packages: List[str]) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Proverava više Python paketa odjednom (imena distribucija ili import imena).
+        
+        Args:
+            packages: Lista imena (npr. ['requests', 'yaml', 'pandas==1.5.0'])
+            
+        Returns:
+            {ime: {'installed', 'version', 'distribution'}}
+        """
+        return package_inventory.check(packages)
+    
     def check_node_package(self, package: str) -> Tuple[bool, str]:
         """
         Proverava da li je Node.js paket instaliran.
@@ -164,18 +236,7 @@ class PackageManager:
             Lista dict-ova sa 'name' i 'version'
         """
         try:
-            result = subprocess.run(
-                [sys.executable, '-m', 'pip', 'list', '--format=json'],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                import json
-                return json.loads(result.stdout)
-            else:
-                return []
+            return package_inventory.packages()
                 
         except Exception as e:
             print(f"[PackageManager] Greška pri listanju paketa: {e}")
@@ -0,0 +1,458 @@
+"""
+Search Index
+Perzistentni trigram indeks za pretragu sadržaja fajlova projekta.
+Indeks se gradi jednom po korenu projekta, čuva u SQLite bazi i osvežava inkrementalno.
+Na disku se čuvaju trigrami po fajlu, pa izmena jednog fajla prepisuje samo njegove redove.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from core.log import get_logger
+from tools.file_manager import is_excluded_dir, is_allowed_file
+
+log = get_logger("SearchIndex")
+
+# Fajlovi veći od ovoga se ne indeksiraju (generisani bundle-ovi, dump-ovi...) - pretražuju se direktno
+MAX_INDEXED_FILE_SIZE = 2 * 1024 * 1024
+
+# Verzija šeme na disku; indeks u drugom formatu se gradi ponovo
+INDEX_FORMAT = "2"
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Vraća skup svih trigrama u (već lowercase) tekstu."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _contains(ids: array, file_id: int) -> bool:
+    """Binarna pretraga u sortiranoj posting listi."""
+    i = bisect_left(ids, file_id)
+    return i < len(ids) and ids[i] == file_id
+
+
+class SearchIndex:
+    """
+    Trigram indeks nad jednim korenom projekta.
+
+    Za svaki trigram čuva sortiran niz ID-eva fajlova koji ga sadrže (array('I'), 4 bajta
+    po unosu - skup int objekata bi bio desetak puta veći). ID-evi se samo povećavaju, pa
+    dodavanje na kraj čuva sortiranost. Upit se razlaže na trigrame, preseca posting liste
+    i tek onda čita kandidatske fajlove, tako da se disk dodiruje samo za fajlove koji
+    sigurno mogu sadržati traženi tekst.
+
+    Upit ne prolazi kroz stablo - promene stižu od FileWatcher-a (start), a pun prolaz
+    kao sigurnosna mreža radi pozadinska nit na svakih refresh_interval sekundi.
+    """
+
+    def __init__(self, root: Path, index_path: Path, refresh_interval: float = 30.0):
+        """
+        Args:
+            root: Koren projekta koji se indeksira.
+            index_path: Putanja do SQLite fajla u kome se čuva indeks.
+            refresh_interval: Razmak (u sekundama) između dva pozadinska osvežavanja i upisa na disk.
+        """
+        self.root = Path(root).resolve()
+        self.index_path = Path(index_path)
+        self.refresh_interval = refresh_interval
+
+        # path -> (file_id, mtime, size)
+        self.files: Dict[str, Tuple[int, float, int]] = {}
+        self.postings: Dict[str, array] = {}
+        # Kandidati za upit, održavani uz files: živi ID -> putanja i fajlovi bez trigrama
+        self._paths_by_id: Dict[int, str] = {}
+        self._oversized: Set[str] = set()
+        self._next_id = 0
+        self._stale_ids = 0
+        self._last_refresh = 0.0
+        self._dirty = False
+        # Nesačuvane izmene: trigrami novih ID-eva, ID-evi za brisanje i putanje za prepis
+        self._pending: Dict[int, Set[str]] = {}
+        self._dropped: Set[int] = set()
+        self._dirty_paths: Set[str] = set()
+        self._full_save = False
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._unsubscribe: Optional[Callable[[], None]] = None
+
+        if not self._load():
+            self.build()
+
+    # ------------------------------------------------------------------
+    # Skeniranje i indeksiranje
+    # ------------------------------------------------------------------
+
+    def _walk(self) -> Dict[str, Tuple[float, int]]:
+        """
+        Vraća {relativna_putanja: (mtime, size)} za sve fajlove po pravilima FileManager-a.
+        Simbolički linkovi ka folderima se prate kao u FileWatcher-u (osim petlji).
+        """
+        found = {}
+        try:
+            st = os.stat(self.root)
+        except OSError:
+            return found
+        stack = [(self.root, frozenset({(st.st_dev, st.st_ino)}))]
+        while stack:
+            current, chain = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                if not is_excluded_dir(entry.name):
+                                    st = entry.stat()
+                                    ident = (st.st_dev, st.st_ino)
+                                    if ident not in chain:
+                                        stack.append((Path(entry.path), chain | {ident}))
+                            elif entry.is_file() and is_allowed_file(entry.name):
+                                st = entry.stat()
+                                rel = os.path.relpath(entry.path, self.root).replace("\\", "/")
+                                found[rel] = (st.st_mtime, st.st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return found
+
+    def _drop_id(self, rel_path: str, file_id: int) -> None:
+        """Beleži da ID više nije živ (u posting listama ostaje do kompakcije, sa diska se briše pri save)."""
+        self._paths_by_id.pop(file_id, None)
+        self._oversized.discard(rel_path)
+        self._stale_ids += 1
+        if self._pending.pop(file_id, None) is None:
+            self._dropped.add(file_id)
+
+    def _index_file(self, rel_path: str, mtime: float, size: int) -> None:
+        """(Re)indeksira jedan fajl. Stari ID postaje zastareo i filtrira se pri upitu."""
+        known = self.files.get(rel_path)
+        if known is not None:
+            self._drop_id(rel_path, known[0])
+
+        file_id = self._next_id
+        self._next_id += 1
+        self.files[rel_path] = (file_id, mtime, size)
+        self._dirty = True
+        self._dirty_paths.add(rel_path)
+
+        trigrams: Set[str] = set()
+        if size <= MAX_INDEXED_FILE_SIZE:
+            self._paths_by_id[file_id] = rel_path
+            try:
+                with open(self.root / rel_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    trigrams = _trigrams(f.read().lower())
+            except OSError:
+                pass
+        else:
+            self._oversized.add(rel_path)
+        if not self._full_save:
+            self._pending[file_id] = trigrams
+
+        # file_id je najveći do sada, pa append čuva posting liste sortiranim
+        for tri in trigrams:
+            bucket = self.postings.get(tri)
+            if bucket is None:
+                self.postings[tri] = array('I', (file_id,))
+            else:
+                bucket.append(file_id)
+
+    def _reset(self) -> None:
+        """Prazni indeks u memoriji; sledeći save() prepisuje celu bazu."""
+        self.files = {}
+        self.postings = {}
+        self._paths_by_id = {}
+        self._oversized = set()
+        self._next_id = 0
+        self._stale_ids = 0
+        self._pending.clear()
+        self._dropped.clear()
+        self._dirty_paths.clear()
+        self._full_save = True
+        self._dirty = True
+
+    def build(self) -> None:
+        """Gradi indeks od nule i čuva ga na disk."""
+        with self._lock:
+            self._reset()
+            for rel_path, (mtime, size) in self._walk().items():
+                self._index_file(rel_path, mtime, size)
+            self._last_refresh = time.monotonic()
+            self.save()
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Poredi mtime/size svih fajlova sa indeksom i reindeksira samo izmenjene.
+        Prolaz kroz stablo ide van lock-a, pa upiti za to vreme nisu blokirani.
+
+        Returns:
+            Broj dodatih, izmenjenih ili obrisanih fajlova.
+        """
+        if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return 0
+
+        current = self._walk()
+        with self._lock:
+            changed = 0
+            for rel_path in list(self.files):
+                if rel_path not in current:
+                    self.remove_file(rel_path)
+                    changed += 1
+            for rel_path, (mtime, size) in current.items():
+                known = self.files.get(rel_path)
+                if known is None or known[1] != mtime or known[2] != size:
+                    self._index_file(rel_path, mtime, size)
+                    changed += 1
+
+            self._last_refresh = time.monotonic()
+            self._compact_if_needed()
+            if self._dirty:
+                self.save()
+            return changed
+
+    def update_file(self, rel_path: str) -> None:
+        """Reindeksira jedan fajl (npr. odmah nakon upisa kroz FileManager)."""
+        rel_path = rel_path.replace("\\", "/")
+        with self._lock:
+            full_path = self.root / rel_path
+            try:
+                st = full_path.stat()
+            except OSError:
+                self.remove_file(rel_path)
+                return
+            if not is_allowed_file(full_path.name):
+                return
+            known = self.files.get(rel_path)
+            if known and known[1] == st.st_mtime and known[2] == st.st_size:
+                return
+            self._index_file(rel_path, st.st_mtime, st.st_size)
+
+    def remove_file(self, rel_path: str) -> None:
+        """Uklanja fajl iz indeksa (posting liste se čiste lenjo)."""
+        rel_path = rel_path.replace("\\", "/")
+        with self._lock:
+            known = self.files.pop(rel_path, None)
+            if known is not None:
+                self._drop_id(rel_path, known[0])
+                self._dirty_paths.add(rel_path)
+                self._dirty = True
+
+    def on_file_event(self, event) -> None:
+        """Callback za FileWatcher - održava indeks bez punog osvežavanja."""
+        if event.kind == 'deleted':
+            self.remove_file(event.path)
+        else:
+            self.update_file(event.path)
+
+    def start(self, watcher=None) -> None:
+        """
+        Pretplaćuje indeks na watcher (ako je dat) i pokreće pozadinsku nit koja na svakih
+        refresh_interval sekundi radi pun refresh (sigurnosna mreža) i upisuje izmene na disk.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            if watcher is not None:
+                self._unsubscribe = watcher.subscribe(self.on_file_event)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop,
+                                            name=f"SearchIndex:{self.root.name}", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Odjavljuje indeks sa watcher-a i zaustavlja pozadinsko osvežavanje."""
+        self._stop.set()
+        with self._lock:
+            if self._unsubscribe is not None:
+                self._unsubscribe()
+                self._unsubscribe = None
+            self._thread = None
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh(force=True)
+            except Exception as e:
+                log.warning("Greška pri osvežavanju indeksa", root=self.root, error=e)
+
+    def _compact_if_needed(self) -> None:
+        """Kada zastarelih ID-eva ima više od živih, posting liste se grade iznova."""
+        if self._stale_ids > max(len(self.files), 1000):
+            live = {path: (mtime, size) for path, (_, mtime, size) in self.files.items()}
+            self._reset()
+            for rel_path, (mtime, size) in live.items():
+                self._index_file(rel_path, mtime, size)
+
+    # ------------------------------------------------------------------
+    # Perzistencija
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.index_path))
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, id INTEGER, mtime REAL, size INTEGER)")
+        # Trigrami fajla kao spojen tekst (svaki trigram su tačno 3 karaktera)
+        conn.execute("CREATE TABLE IF NOT EXISTS file_trigrams (id INTEGER PRIMARY KEY, trigrams TEXT)")
+        return conn
+
+    def _forward_index(self) -> Dict[int, List[str]]:
+        """Obrće posting liste u {file_id: trigrami} za žive fajlove (za pun upis)."""
+        live = {fid for fid, _, _ in self.files.values()}
+        forward: Dict[int, List[str]] = {fid: [] for fid in live}
+        for tri, ids in self.postings.items():
+            for fid in ids:
+                if fid in live:
+                    forward[fid].append(tri)
+        return forward
+
+    def save(self) -> None:
+        """
+        Upisuje izmene u SQLite u jednoj transakciji: posle build()/kompakcije ceo indeks,
+        inače samo redove fajlova koji su dodati, izmenjeni ili obrisani od prošlog upisa.
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    if self._full_save:
+                        conn.execute("DROP TABLE IF EXISTS postings")  # šema pre INDEX_FORMAT 2
+                        conn.execute("DELETE FROM files")
+                        conn.execute("DELETE FROM file_trigrams")
+                        conn.executemany(
+                            "INSERT INTO files (path, id, mtime, size) VALUES (?, ?, ?, ?)",
+                            [(p, fid, m, s) for p, (fid, m, s) in self.files.items()]
+                        )
+                        conn.executemany(
+                            "INSERT INTO file_trigrams (id, trigrams) VALUES (?, ?)",
+                            [(fid, "".join(tris)) for fid, tris in self._forward_index().items()]
+                        )
+                    else:
+                        conn.executemany("DELETE FROM file_trigrams WHERE id = ?",
+                                         [(fid,) for fid in self._dropped])
+                        conn.executemany("DELETE FROM files WHERE path = ?",
+                                         [(p,) for p in self._dirty_paths])
+                        conn.executemany(
+                            "INSERT INTO files (path, id, mtime, size) VALUES (?, ?, ?, ?)",
+                            [(p,) + self.files[p] for p in self._dirty_paths if p in self.files]
+                        )
+                        conn.executemany(
+                            "INSERT INTO file_trigrams (id, trigrams) VALUES (?, ?)",
+                            [(fid, "".join(tris)) for fid, tris in self._pending.items()]
+                        )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                        [("root", str(self.root)), ("format", INDEX_FORMAT), ("next_id", str(self._next_id))]
+                    )
+                self._pending.clear()
+                self._dropped.clear()
+                self._dirty_paths.clear()
+                self._full_save = False
+                self._dirty = False
+            finally:
+                conn.close()
+
+    def _load(self) -> bool:
+        """Učitava indeks sa diska. Vraća False ako indeks ne postoji ili je za drugi koren."""
+        if not self.index_path.exists():
+            return False
+        try:
+            conn = self._connect()
+            try:
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+                if meta.get("root") != str(self.root) or meta.get("format") != INDEX_FORMAT:
+                    return False
+                self.files = {p: (fid, m, s) for p, fid, m, s in conn.execute("SELECT path, id, mtime, size FROM files")}
+                self._paths_by_id = {fid: p for p, (fid, _, s) in self.files.items() if s <= MAX_INDEXED_FILE_SIZE}
+                self._oversized = {p for p, (_, _, s) in self.files.items() if s > MAX_INDEXED_FILE_SIZE}
+                postings: Dict[str, array] = {}
+                # Redosled po ID-u - posting liste nastaju već sortirane
+                for fid, text in conn.execute("SELECT id, trigrams FROM file_trigrams ORDER BY id"):
+                    if fid not in self._paths_by_id:
+                        continue
+                    for i in range(0, len(text), 3):
+                        bucket = postings.get(text[i:i + 3])
+                        if bucket is None:
+                            postings[text[i:i + 3]] = array('I', (fid,))
+                        else:
+                            bucket.append(fid)
+                self.postings = postings
+                self._next_id = int(meta.get("next_id", 0))
+                # Na disku su samo živi fajlovi - posle učitavanja nema zastarelih ID-eva
+                self._stale_ids = 0
+            finally:
+                conn.close()
+        except (sqlite3.Error, ValueError) as e:
+            log.warning("Oštećen indeks, gradim ponovo", path=self.index_path, error=e)
+            return False
+
+        # Indeks sa diska može biti star - prvo osvežavanje ide odmah
+        self._last_refresh = 0.0
+        self.refresh()
+        return True
+
+    # ------------------------------------------------------------------
+    # Upiti
+    # ------------------------------------------------------------------
+
+    def _candidates(self, needle: str) -> List[str]:
+        """
+        Vraća sortiranu listu fajlova koji mogu sadržati needle (već lowercase).
+        Fajlovi preko MAX_INDEXED_FILE_SIZE nemaju trigrame, pa su uvek kandidati (direktno čitanje).
+        """
+        live = self._paths_by_id
+        if len(needle) < 3:
+            return sorted([*live.values(), *self._oversized])
+
+        buckets = sorted((self.postings.get(tri, ()) for tri in _trigrams(needle)), key=len)
+        ids = set(buckets[0])
+        for bucket in buckets[1:]:
+            if not ids:
+                break
+            if len(ids) * 16 < len(bucket):
+                # Malo kandidata, duga lista - binarna pretraga umesto prolaza kroz celu listu
+                ids = {fid for fid in ids if _contains(bucket, fid)}
+            else:
+                ids.intersection_update(bucket)
+        return sorted([live[fid] for fid in ids if fid in live] + list(self._oversized))
+
+    def search(self, query: str, offset: int = 0, limit: int = 100) -> Dict[str, object]:
+        """
+        Pretražuje indeks i vraća stranicu rezultata.
+
+        Args:
+            query: Tekst koji se traži (case-insensitive).
+            offset: Broj pogodaka koji se preskače (za straničenje).
+            limit: Maksimalan broj pogodaka u odgovoru.
+
+        Returns:
+            Dict sa 'results' listom i 'next_offset' (None ako nema više pogodaka).
+        """
+        needle = query.lower()
+        results = []
+        seen = 0
+
+        with self._lock:
+            candidates = self._candidates(needle)
+
+        for rel_path in candidates:
+            try:
+                with open(self.root / rel_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    for line_no, line in enumerate(f, start=1):
+                        if needle not in line.lower():
+                            continue
+                        if seen >= offset:
+                            if len(results) >= limit:
+                                return {"results": results, "next_offset": seen}
+                            results.append({"file": rel_path, "line": line_no, "content": line.strip()})
+                        seen += 1
+            except OSError:
+                continue
+
+        return {"results": results, "next_offset": None}
@@ -426,12 +426,95 @@ function App() {
   }, [globalMessages, openFiles, activeFile]); // SR: Reaguj na promene bilo kog bafere poruka
 
   useEffect(() => {
-    fetchStatus();
     fetchModels();
-    const interval = setInterval(fetchStatus, 5000);
-    return () => clearInterval(interval);
+
+    // SR: Jedna NDJSON konekcija (/status/stream) umesto pollinga - server šalje samo razlike
+    let cancelled = false;
+    let retryTimer = null;
+    const controller = new AbortController();
+
+    const connect = async () => {
+      try {
+        const response = await fetch(`${API_BASE}/status/stream`, {
+          headers: { 'X-API-Key': API_TOKEN },
+          signal: controller.signal
+        });
+        if (!response.ok) throw new Error("Status stream nije dostupan");
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+
+          buffer += decoder.decode(value, { stream: true });
+          const lines = buffer.split('\n');
+          buffer = lines.pop(); // Poslednja linija može biti nekompletna
+
+          for (const line of lines) {
+            if (!line.trim()) continue;
+            try {
+              applyStatusEvent(JSON.parse(line));
+            } catch (e) {
+              console.error("Greška pri parsiranju status stream-a", e);
+            }
+          }
+        }
+      } catch (err) {
+        if (cancelled) return;
+        console.error('Status stream prekinut', err);
+      }
+      if (!cancelled) {
+        // Ponovno povezivanje; u međuvremenu jedan klasičan /status poziv
+        fetchStatus();
+        retryTimer = setTimeout(connect, 5000);
+      }
+    };
+
+    connect();
+    return () => {
+      cancelled = true;
+      clearTimeout(retryTimer);
+      controller.abort();
+    };
   }, []);
 
+  const applyListDelta = (list, delta) => {
+    if (!delta) return list;
+    const removed = new Set(delta.removed || []);
+    return [...(list || []).filter(item => !removed.has(item)), ...(delta.added || [])].sort();
+  };
+
+  const applyStatusEvent = (data) => {
+    if (data.type === 'snapshot') {
+      const { type, git, ...rest } = data;
+      setStatus(rest);
+      setFiles(rest.files);
+      if (rest.roots) setRoots(rest.roots);
+      setCurrentPath(prev => prev || rest.project_dir);
+      if (git) setGitStatus({ modified: [], staged: [], untracked: [], ...git });
+    } else if (data.type === 'files') {
+      setFiles(prev => applyListDelta(prev, data));
+      setStatus(prev => prev ? { ...prev, files: applyListDelta(prev.files, data) } : prev);
+    } else if (data.type === 'git') {
+      const { type, full, ...rest } = data;
+      setGitStatus(prev => {
+        if (full) return { modified: [], staged: [], untracked: [], ...rest };
+        const next = { ...prev };
+        for (const key of ['staged', 'modified', 'untracked']) {
+          if (rest[key]) next[key] = applyListDelta(prev[key], rest[key]);
+        }
+        return next;
+      });
+    } else if (data.type === 'tokens' || data.type === 'project') {
+      const { type, ...rest } = data;
+      setStatus(prev => ({ ...(prev || {}), ...rest }));
+      if (rest.roots) setRoots(rest.roots);
+    }
+  };
+
   useEffect(() => {
     const handleMouseMove = (e) => {
       if (isResizingLeft) {
@@ -956,15 +1039,14 @@ function App() {
               addLog(`✋ Agent traži odobrenje za izmene`, 'warning');
               updateMessages(prev => prev.map(m => {
                 // const dataAgentId = data.agent_id || data.agentId; // No longer needed for single agent
+                // SR: Preview stiže čim se blok koda zatvori - stream se nastavlja, tekst ostaje
                 return m.isStreaming ? {
                   ...m,
-                  text: data.explanation,
                   preview: {
                     code: data.code,
                     filename: data.filename,
                     originalMessage: data.explanation
-                  },
-                  isStreaming: false
+                  }
                 } : m;
               }));
             } else if (data.type === 'security_warning') {